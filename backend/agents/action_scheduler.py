@@ -0,0 +1,101 @@
+"""
+Action Scheduler - Runs an intent's actions concurrently where they are independent
+Producers (transcription, vision) start together; consumers (summary,
+reports) wait only for the producers scheduled in the same request.
+"""
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Context key each action writes
+ACTION_OUTPUTS: Dict[str, str] = {
+    "transcribe": "transcription",
+    "detect_objects": "vision_results",
+    "describe_scenes": "vision_results",
+    "summarize": "summary",
+    "generate_pdf": "pdf",
+    "generate_pptx": "pptx",
+}
+
+# Context keys each action reads
+ACTION_INPUTS: Dict[str, List[str]] = {
+    "summarize": ["transcription", "vision_results"],
+    "generate_pdf": ["transcription", "vision_results", "summary"],
+    "generate_pptx": ["transcription", "vision_results", "summary"],
+}
+
+
+class ActionScheduler:
+    """
+    Derives dependencies between the actions of one request:
+    - an action waits for every scheduled action producing one of its inputs
+    - actions writing the same output keep their requested order
+    Everything else runs concurrently.
+    """
+
+    def __init__(self, outputs: Dict[str, str] = None, inputs: Dict[str, List[str]] = None):
+        self.outputs = outputs or ACTION_OUTPUTS
+        self.inputs = inputs or ACTION_INPUTS
+
+    def dependencies(self, actions: List[str]) -> Dict[str, List[str]]:
+        """Map each action to the scheduled actions it must wait for"""
+        depends = {}
+        for index, action in enumerate(actions):
+            wanted = set(self.inputs.get(action, []))
+            output = self.outputs.get(action)
+            depends[action] = [
+                other for position, other in enumerate(actions)
+                if other != action and (
+                    self.outputs.get(other) in wanted
+                    or (output is not None and position < index and self.outputs.get(other) == output)
+                )
+            ]
+        return depends
+
+    def order(self, actions: Iterable[str]) -> List[List[str]]:
+        """Group actions into stages that can run together (for logging and tests)"""
+        actions = list(dict.fromkeys(actions))
+        depends = self.dependencies(actions)
+        stages, placed = [], set()
+        while len(placed) < len(actions):
+            stage = [a for a in actions if a not in placed and set(depends[a]) <= placed]
+            if not stage:
+                raise ValueError(f"Circular action dependencies: {depends}")
+            stages.append(stage)
+            placed.update(stage)
+        return stages
+
+    async def run(self, actions: Iterable[str],
+                  execute: Callable[[str], Awaitable[Any]]) -> Dict[str, Any]:
+        """
+        Run execute(action) for each action once its dependencies have finished
+
+        A failed dependency does not block its dependents; they run with
+        whatever the context holds. Returns {action: result or exception}.
+        """
+        actions = list(dict.fromkeys(actions))
+        depends = self.dependencies(actions)
+        logger.info(f"Action stages: {self.order(actions)}")
+
+        tasks: Dict[str, asyncio.Future] = {}
+
+        async def run_after(action: str, waits: List[asyncio.Future]):
+            if waits:
+                await asyncio.gather(*waits, return_exceptions=True)
+            return await execute(action)
+
+        # Stages are in dependency order, so every dependency task exists already
+        for stage in self.order(actions):
+            for action in stage:
+                tasks[action] = asyncio.ensure_future(
+                    run_after(action, [tasks[d] for d in depends[action]])
+                )
+
+        try:
+            outcomes = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+        return dict(zip(tasks.keys(), outcomes))
@@ -0,0 +1,169 @@
+"""
+Audio extraction - Streams 16 kHz mono PCM from ffmpeg into a numpy buffer
+Replaces writing a full-length temporary WAV with MoviePy; long inputs go
+into an anonymous memory-mapped file instead of resident memory. Also plans
+silence-aligned chunks for long-form transcription.
+"""
+from typing import Optional
+import logging
+import os
+import subprocess
+import tempfile
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+def probe_duration(path: str) -> float:
+    """Container duration in seconds via ffprobe (0.0 if unknown)"""
+    try:
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", path],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        return float(output)
+    except (subprocess.CalledProcessError, ValueError):
+        return 0.0
+
+
+def _allocate(samples: int, memmap: bool, memmap_dir: Optional[str]) -> np.ndarray:
+    if not memmap:
+        return np.empty(samples, dtype=np.float32)
+    # Unlinked right away: the mapping keeps the space until the array is freed
+    with tempfile.NamedTemporaryFile(suffix=".pcm", dir=memmap_dir, delete=False) as f:
+        path = f.name
+    try:
+        return np.memmap(path, dtype=np.float32, mode="w+", shape=(samples,))
+    finally:
+        os.unlink(path)
+
+
+def load_audio(path: str, sample_rate: int = SAMPLE_RATE,
+               memmap_threshold_seconds: float = 1800.0,
+               memmap_dir: Optional[str] = None) -> np.ndarray:
+    """
+    Decode the audio track of a media file to float32 mono PCM in [-1, 1]
+
+    Args:
+        path: Video or audio file
+        sample_rate: Output sample rate (Whisper expects 16 kHz)
+        memmap_threshold_seconds: Inputs longer than this are decoded into a
+            memory-mapped temp file rather than an in-memory array
+        memmap_dir: Directory for the memory-mapped file (default: system temp)
+
+    Returns:
+        1-D float32 array, directly usable by whisper_model.transcribe
+    """
+    duration = probe_duration(path)
+    use_memmap = duration > memmap_threshold_seconds
+    # Preallocate from the container duration, with a little slack
+    capacity = int(duration * sample_rate * 1.01) + sample_rate
+    buffer = _allocate(capacity, use_memmap, memmap_dir)
+
+    # stderr goes to a file: a pipe read only after stdout's EOF would fill up
+    # and stall ffmpeg if it logs a lot of warnings
+    stderr_file = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        ["ffmpeg", "-nostdin", "-v", "error", "-threads", "0", "-i", path,
+         "-vn", "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le",
+         "-ar", str(sample_rate), "pipe:1"],
+        stdout=subprocess.PIPE, stderr=stderr_file
+    )
+
+    position = 0
+    leftover = b""
+    try:
+        while True:
+            raw = process.stdout.read(READ_CHUNK_BYTES)
+            if not raw:
+                break
+            raw = leftover + raw
+            usable = len(raw) - (len(raw) % 2)
+            leftover = raw[usable:]
+            pcm = np.frombuffer(raw[:usable], dtype=np.int16)
+
+            if position + len(pcm) > len(buffer):
+                # Duration was under-reported; grow the buffer
+                grown = _allocate(max(len(buffer) * 2, position + len(pcm)), use_memmap, memmap_dir)
+                grown[:position] = buffer[:position]
+                buffer = grown
+
+            np.multiply(pcm, 1.0 / 32768.0, out=buffer[position:position + len(pcm)], casting="unsafe")
+            position += len(pcm)
+    finally:
+        process.stdout.close()
+        returncode = process.wait()
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode(errors="replace")
+        stderr_file.close()
+
+    if returncode != 0 and position == 0:
+        raise RuntimeError(f"ffmpeg audio extraction failed: {stderr.strip() or returncode}")
+
+    logger.info(f"Decoded {position / sample_rate:.1f}s of audio"
+                f"{' (memory-mapped)' if use_memmap else ''}")
+    return buffer[:position]
+
+
+def _frame_energy(audio: np.ndarray, sample_rate: int, frame_seconds: float) -> np.ndarray:
+    """RMS energy per fixed-size frame"""
+    frame = max(1, int(sample_rate * frame_seconds))
+    usable = len(audio) - len(audio) % frame
+    energy = np.empty(usable // frame, dtype=np.float32)
+    # Work in blocks so memory-mapped inputs are never fully resident
+    block = frame * 4096
+    for start in range(0, usable, block):
+        chunk = np.asarray(audio[start:min(start + block, usable)], dtype=np.float32)
+        frames = chunk.reshape(-1, frame)
+        energy[start // frame:start // frame + len(frames)] = np.sqrt(np.mean(frames ** 2, axis=1))
+    return energy
+
+
+def split_on_silence(audio: np.ndarray, sample_rate: int = SAMPLE_RATE,
+                     target_seconds: float = 300.0, search_seconds: float = 60.0,
+                     overlap_seconds: float = 1.0, frame_seconds: float = 0.03,
+                     min_silence_seconds: float = 0.5):
+    """
+    Plan chunks for long-form transcription, cutting in the quietest stretch
+    near every target_seconds (a simple energy VAD)
+
+    Returns:
+        List of dicts with "start"/"end" (the samples a chunk owns) and
+        "window_start"/"window_end" (owned range plus overlap on each side)
+    """
+    total = len(audio)
+    if total <= int((target_seconds + search_seconds) * sample_rate):
+        return [{"start": 0, "end": total, "window_start": 0, "window_end": total}]
+
+    energy = _frame_energy(audio, sample_rate, frame_seconds)
+    # Smooth over the minimum silence length so single quiet frames don't win
+    width = max(1, int(min_silence_seconds / frame_seconds))
+    smoothed = np.convolve(energy, np.ones(width, dtype=np.float32) / width, mode="same")
+    frame = int(sample_rate * frame_seconds)
+
+    cuts = [0]
+    while True:
+        target = cuts[-1] + int(target_seconds * sample_rate)
+        if target + int(search_seconds * sample_rate) >= total:
+            break
+        lo = (target - int(search_seconds * sample_rate)) // frame
+        hi = min((target + int(search_seconds * sample_rate)) // frame, len(smoothed))
+        quietest = lo + int(np.argmin(smoothed[lo:hi]))
+        cuts.append(quietest * frame + frame // 2)
+    cuts.append(total)
+
+    overlap = int(overlap_seconds * sample_rate)
+    return [
+        {
+            "start": start,
+            "end": end,
+            "window_start": max(0, start - overlap),
+            "window_end": min(total, end + overlap)
+        }
+        for start, end in zip(cuts[:-1], cuts[1:])
+    ]
@@ -2,19 +2,24 @@
 Base Agent class for all AI agents
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable
 import logging
 
+from .executor import InferenceExecutor
+
 logger = logging.getLogger(__name__)
 
 
 class BaseAgent(ABC):
     """Base class for all AI agents in the system"""
     
-    def __init__(self, name: str, model_path: Optional[str] = None):
+    def __init__(self, name: str, model_path: Optional[str] = None,
+                 max_workers: int = 1, max_queue: int = 8):
         self.name = name
         self.model_path = model_path
         self.model = None
+        # Blocking inference runs here instead of on the event loop
+        self.executor = InferenceExecutor(name, max_workers=max_workers, max_queue=max_queue)
         logger.info(f"Initializing {name}")
         
     @abstractmethod
@@ -27,9 +32,19 @@ class BaseAgent(ABC):
         """Process input and return results"""
         pass
     
+    async def run_blocking(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call (model inference, decoding) on this agent's executor"""
+        return await self.executor.run(fn, *args, **kwargs)
+    
+    @property
+    def model_version(self) -> str:
+        """Identifier of the loaded model, used to key cached results"""
+        return str(self.model_path or "")
+    
     async def cleanup(self):
         """Cleanup resources"""
         logger.info(f"Cleaning up {self.name}")
+        self.executor.shutdown()
         if self.model:
             del self.model
             self.model = None
@@ -0,0 +1,113 @@
+"""
+Micro-batching - Groups items from concurrent callers into one model call
+Used by the vision agent so frames from several requests share a single
+YOLO / BLIP forward pass.
+"""
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+import asyncio
+import contextvars
+import logging
+
+from .executor import current_priority, work_priority
+
+logger = logging.getLogger(__name__)
+
+
+class _BatchPriority:
+    """Background while every item in the batch is background"""
+
+    def __init__(self, priorities: List[Any]):
+        self.priorities = priorities
+
+    @property
+    def background(self) -> bool:
+        return all(priority.background for priority in self.priorities)
+
+
+class MicroBatcher:
+    """
+    Collects submitted items and flushes them as a batch once max_batch_size
+    items are waiting or max_wait seconds have passed since the first one.
+
+    batch_fn is blocking and maps a list of items to a list of results of the
+    same length; run is the coroutine used to execute it (an agent executor).
+    """
+
+    def __init__(self, name: str, batch_fn: Callable[[List[Any]], List[Any]],
+                 run: Callable[..., Awaitable[Any]], max_batch_size: int = 8,
+                 max_wait: float = 0.01):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.run = run
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self._pending: List[Tuple[Any, asyncio.Future, Any]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, current_priority()))
+
+        # Flush outside the caller's context: a batch is shared, so one
+        # caller's request deadline must not apply to the others
+        if len(self._pending) >= self.max_batch_size:
+            loop.call_soon(self._flush_now, context=contextvars.Context())
+        elif self._timer is None:
+            self._timer = loop.call_later(
+                self.max_wait, self._flush_now, context=contextvars.Context()
+            )
+
+        return await future
+
+    async def submit_many(self, items: List[Any]) -> List[Any]:
+        """Queue several items (e.g. one request's frames) and wait for all results"""
+        return list(await asyncio.gather(*(self.submit(item) for item in items)))
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            asyncio.ensure_future(self._execute(batch))
+
+    async def _execute(self, batch: List[Tuple[Any, asyncio.Future, Any]]):
+        # Skip items whose callers have gone away
+        batch = [(item, future, priority) for item, future, priority in batch if not future.done()]
+        if not batch:
+            return
+
+        # A batch is background work only while all of its items are
+        priorities = [priority for _, _, priority in batch]
+        priority = _BatchPriority(priorities) if all(p is not None for p in priorities) else None
+
+        try:
+            with work_priority(priority):
+                results = await self.run(self.batch_fn, [item for item, _, _ in batch])
+        except BaseException as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return
+
+        self.batches += 1
+        self.items += len(batch)
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def get_stats(self) -> dict:
+        """Return batch counters"""
+        return {
+            "name": self.name,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0
+        }
@@ -0,0 +1,210 @@
+"""
+Context Index - Per-video embedding index over transcript and caption chunks
+Built once per video content hash and persisted next to the uploads, so
+prompts carry only the chunks relevant to a query instead of a truncated
+prefix of the transcript.
+"""
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from collections import OrderedDict
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .embeddings import TextEmbedder
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for prompt budgeting"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def transcript_chunks(transcription: Optional[Dict[str, Any]],
+                      max_words: int = 60) -> List[Dict[str, Any]]:
+    """Group consecutive transcript segments into chunks of about max_words"""
+    if not transcription or transcription.get("error"):
+        return []
+    segments = transcription.get("segments") or []
+    if not segments and transcription.get("transcription"):
+        segments = [{"start": 0.0, "end": 0.0, "text": transcription["transcription"]}]
+
+    chunks, current, words = [], [], 0
+    for segment in segments:
+        current.append(segment)
+        words += len(segment["text"].split())
+        if words >= max_words:
+            chunks.append(current)
+            current, words = [], 0
+    if current:
+        chunks.append(current)
+
+    return [
+        {
+            "source": "transcript",
+            "start": group[0]["start"],
+            "end": group[-1]["end"],
+            "text": f"[{group[0]['start']:.0f}s] " + " ".join(s["text"].strip() for s in group)
+        }
+        for group in chunks
+    ]
+
+
+def caption_chunks(vision_results: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One chunk per analyzed frame: caption plus detected object classes"""
+    if not vision_results or vision_results.get("error"):
+        return []
+    chunks = []
+    for frame in vision_results.get("results", []):
+        parts = []
+        if frame.get("caption"):
+            parts.append(frame["caption"])
+        classes = sorted({obj["class"] for obj in frame.get("objects", []) if "class" in obj})
+        if classes:
+            parts.append("objects: " + ", ".join(classes))
+        if parts:
+            chunks.append({
+                "source": "captions",
+                "start": frame.get("timestamp", 0.0),
+                "end": frame.get("timestamp", 0.0),
+                "text": f"[{frame.get('timestamp', 0.0):.0f}s] Frame: " + "; ".join(parts)
+            })
+    return chunks
+
+
+class ContextIndex:
+    """
+    Embedding index of one video's chunks, one file pair per source:
+    {index_dir}/{video_hash}/{source}.json (chunks + fingerprint) and
+    {source}.npy (vectors). A source is re-embedded only when its chunks change.
+    At most max_videos indexes are kept in memory, least recently used
+    dropped first; they are reloaded from disk on their next query.
+    """
+
+    def __init__(self, embedder: TextEmbedder, video_hash: Callable[[str], str],
+                 index_dir: str = "uploads/context_index", max_videos: int = 32):
+        self.embedder = embedder
+        self.video_hash = video_hash
+        self.index_dir = Path(index_dir)
+        self.max_videos = max_videos
+        # video hash -> {source: (chunks, vectors, fingerprint)}, least recently used first
+        self._loaded: "OrderedDict[str, Dict[str, tuple]]" = OrderedDict()
+        self.builds = 0
+        self.loads = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _fingerprint(chunks: List[Dict[str, Any]]) -> str:
+        return hashlib.sha256(
+            json.dumps([c["text"] for c in chunks]).encode()
+        ).hexdigest()
+
+    def _read(self, directory: Path, source: str, fingerprint: str) -> Optional[tuple]:
+        meta_path = directory / f"{source}.json"
+        if not meta_path.exists():
+            return None
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        if meta.get("fingerprint") != fingerprint:
+            return None
+        return meta["chunks"], np.load(directory / f"{source}.npy")
+
+    def _write(self, directory: Path, source: str, fingerprint: str,
+               chunks: List[Dict[str, Any]], vectors: np.ndarray):
+        directory.mkdir(parents=True, exist_ok=True)
+        # Vectors first: a meta file always points at complete vectors
+        tmp_vectors = directory / f"{source}.tmp.npy"
+        np.save(tmp_vectors, vectors)
+        os.replace(tmp_vectors, directory / f"{source}.npy")
+        tmp_meta = directory / f"{source}.json.tmp"
+        with open(tmp_meta, 'w') as f:
+            json.dump({"fingerprint": fingerprint, "model": self.embedder.model_name,
+                       "chunks": chunks}, f)
+        os.replace(tmp_meta, directory / f"{source}.json")
+
+    def _touch(self, digest: str) -> Dict[str, tuple]:
+        """Return a video's loaded sources, marking it most recently used"""
+        sources = self._loaded.setdefault(digest, {})
+        self._loaded.move_to_end(digest)
+        while len(self._loaded) > self.max_videos:
+            self._loaded.popitem(last=False)
+            self.evictions += 1
+        return sources
+
+    async def ensure(self, video_path: str, context: Dict[str, Any]) -> str:
+        """Load or build the index for the chunks the context currently holds"""
+        digest, _ = await self._ensure(video_path, context)
+        return digest
+
+    async def _ensure(self, video_path: str,
+                      context: Dict[str, Any]) -> Tuple[str, Dict[str, tuple]]:
+        digest = await asyncio.to_thread(self.video_hash, video_path)
+        directory = self.index_dir / digest
+        sources = self._touch(digest)
+
+        for source, chunks in (("transcript", transcript_chunks(context.get("transcription"))),
+                               ("captions", caption_chunks(context.get("vision_results")))):
+            if not chunks:
+                continue
+            fingerprint = self._fingerprint(chunks)
+            if source in sources and sources[source][2] == fingerprint:
+                continue
+            stored = await asyncio.to_thread(self._read, directory, source, fingerprint)
+            if stored is not None:
+                self.loads += 1
+            else:
+                vectors = await self.embedder.embed([c["text"] for c in chunks])
+                await asyncio.to_thread(self._write, directory, source, fingerprint, chunks, vectors)
+                stored = (chunks, vectors)
+                self.builds += 1
+                logger.info(f"Indexed {len(chunks)} {source} chunks for video {digest[:12]}")
+            sources[source] = (stored[0], stored[1], fingerprint)
+        return digest, sources
+
+    async def retrieve(self, video_path: str, context: Dict[str, Any], query: str,
+                       budget_tokens: int = 1200, top_k: int = 8) -> str:
+        """
+        Pack the chunks most similar to the query into budget_tokens, topped up
+        with chunks spread over the timeline so broad questions keep coverage.
+        Returned in timeline order, one chunk per line.
+        """
+        # Keep our own reference: other queries may evict the video meanwhile
+        _, sources = await self._ensure(video_path, context)
+        chunks = [c for chunks, _, _ in sources.values() for c in chunks]
+        if not chunks:
+            return ""
+        vectors = np.concatenate([v for _, v, _ in sources.values()])
+
+        query_vector = (await self.embedder.embed([query]))[0]
+        ranked = list(np.argsort(-(vectors @ query_vector))[:top_k])
+        spread = list(np.linspace(0, len(chunks) - 1, num=min(len(chunks), 32), dtype=int))
+
+        selected, used = set(), 0
+        for index in ranked + spread:
+            index = int(index)
+            if index in selected:
+                continue
+            cost = estimate_tokens(chunks[index]["text"])
+            if used + cost > budget_tokens:
+                continue
+            selected.add(index)
+            used += cost
+
+        ordered = sorted(selected, key=lambda i: (chunks[i]["start"], chunks[i]["source"]))
+        return "\n".join(chunks[i]["text"] for i in ordered)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return build/load counters"""
+        return {
+            "videos": len(self._loaded),
+            "builds": self.builds,
+            "loads": self.loads,
+            "evictions": self.evictions
+        }
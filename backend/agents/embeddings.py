@@ -0,0 +1,45 @@
+"""
+Text Embedder - Sentence-transformers embeddings on a dedicated executor
+Kept off the orchestrator executor so a query embedding is never queued
+behind a running LLM completion.
+"""
+from typing import List
+import logging
+
+import numpy as np
+
+from .executor import InferenceExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class TextEmbedder:
+    """Encodes text into L2-normalized vectors (dot product = cosine similarity)"""
+
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+        self.model_name = model_name
+        self.model = None
+        self.executor = InferenceExecutor("Embedder", max_workers=1, max_queue=32)
+
+    async def initialize(self):
+        """Load the sentence-transformers model"""
+        from sentence_transformers import SentenceTransformer
+
+        logger.info(f"Loading embedding model: {self.model_name}")
+        self.model = await self.executor.run(SentenceTransformer, self.model_name, device="cpu")
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Blocking: embed texts as a (len(texts), dim) float32 matrix"""
+        vectors = self.model.encode(
+            texts, batch_size=32, convert_to_numpy=True,
+            normalize_embeddings=True, show_progress_bar=False
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts on the embedder executor"""
+        return await self.executor.run(self.encode, texts)
+
+    def cleanup(self):
+        self.executor.shutdown()
+        self.model = None
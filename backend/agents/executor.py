@@ -0,0 +1,245 @@
+"""
+Inference Executor - Runs blocking model calls off the asyncio event loop
+Each agent owns one executor so a long Whisper run cannot starve vision or
+LLM work, and none of them block the gRPC loop.
+"""
+from typing import Any, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import contextmanager
+import asyncio
+import contextvars
+import functools
+import logging
+import multiprocessing
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Absolute (monotonic) deadline of the request being served, if any
+_request_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "request_deadline", default=None
+)
+
+
+class WorkPriority:
+    """
+    Priority of the work started in a context. Mutable so background work
+    can be promoted when an interactive request starts waiting on it.
+    """
+
+    def __init__(self, background: bool = False):
+        self.background = background
+
+
+_work_priority: contextvars.ContextVar[Optional[WorkPriority]] = contextvars.ContextVar(
+    "work_priority", default=None
+)
+
+
+class ExecutorBusyError(RuntimeError):
+    """Raised when an executor's queue is full"""
+    pass
+
+
+@contextmanager
+def request_deadline(seconds: Optional[float]):
+    """
+    Bound all executor work started in this context by a deadline,
+    typically the remaining time of the gRPC call being served
+    """
+    if seconds is None:
+        yield
+        return
+    token = _request_deadline.set(time.monotonic() + max(seconds, 0.0))
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+@contextmanager
+def no_deadline():
+    """
+    Start work without the current request's deadline, e.g. work shared by
+    several requests that is cancelled explicitly instead
+    """
+    token = _request_deadline.set(None)
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+@contextmanager
+def work_priority(priority: Optional[WorkPriority]):
+    """Apply a priority to executor work started in this context"""
+    token = _work_priority.set(priority)
+    try:
+        yield priority
+    finally:
+        _work_priority.reset(token)
+
+
+def background_priority():
+    """Run executor work started in this context only while no interactive work is waiting"""
+    return work_priority(WorkPriority(background=True))
+
+
+def current_priority() -> Optional[WorkPriority]:
+    """Priority object of the current context (None means interactive)"""
+    return _work_priority.get()
+
+
+def is_background() -> bool:
+    priority = _work_priority.get()
+    return priority is not None and priority.background
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current request deadline, or None if unbounded"""
+    deadline = _request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+class InferenceExecutor:
+    """
+    Dedicated worker pool with a bounded queue for one agent's blocking calls.
+
+    Work that is still queued when its caller is cancelled (client disconnect,
+    gRPC deadline) is dropped before it starts; work already running finishes
+    in the background but its result is discarded.
+
+    Background work (see background_priority) is held back while interactive
+    jobs are in flight, so requests preempt it between jobs.
+    """
+
+    def __init__(self, name: str, max_workers: int = 1, max_queue: int = 8,
+                 use_processes: bool = False, initializer: Optional[Callable] = None,
+                 initargs: tuple = ()):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.use_processes = use_processes
+        if use_processes:
+            # Spawn rather than fork: the server process already runs gRPC and
+            # torch/OpenMP threads, whose locks a forked child would inherit
+            self._pool = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer, initargs=initargs
+            )
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix=name.lower().replace(" ", "-"),
+                initializer=initializer,
+                initargs=initargs
+            )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._interactive = 0
+        self.background_poll = 0.05
+        self.completed = 0
+        self.deferred = 0
+        self.cancelled = 0
+        self.rejected = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Jobs currently running or waiting for a worker"""
+        return self._in_flight
+
+    def _release(self, future):
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled():
+                self.cancelled += 1
+            else:
+                self.completed += 1
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None,
+                  **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) on the pool and await its result
+
+        Args:
+            fn: Blocking callable
+            timeout: Optional limit in seconds; the request deadline applies too
+
+        Raises:
+            ExecutorBusyError: queue depth exceeded
+            asyncio.TimeoutError: deadline reached before the result was ready
+        """
+        priority = _work_priority.get()
+        if priority is not None and priority.background and self._interactive:
+            self.deferred += 1
+            while priority.background and self._interactive:
+                await asyncio.sleep(self.background_poll)
+        interactive = not (priority is not None and priority.background)
+        
+        remaining = remaining_time()
+        if remaining is not None:
+            if remaining <= 0:
+                raise asyncio.TimeoutError(f"{self.name}: request deadline already passed")
+            timeout = remaining if timeout is None else min(timeout, remaining)
+
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorBusyError(
+                    f"{self.name} is busy ({self._in_flight} jobs in flight)"
+                )
+            self._in_flight += 1
+
+        if self.use_processes:
+            call = functools.partial(fn, *args, **kwargs)
+        else:
+            # Threads inherit the caller's context (deadline, progress channel)
+            call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+
+        future = self._pool.submit(call)
+        future.add_done_callback(self._release)
+
+        if interactive:
+            self._interactive += 1
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            if future.cancel():
+                logger.info(f"{self.name}: dropped queued job after cancellation")
+            raise
+        finally:
+            if interactive:
+                self._interactive -= 1
+
+    def submit_cleanup(self, fn: Callable, *args):
+        """
+        Schedule cleanup (closing decoders, releasing files) without waiting.
+        Bypasses the queue bound and the request deadline, and runs after any
+        job already executing so it cannot race it on a single-worker pool.
+        """
+        try:
+            self._pool.submit(fn, *args)
+        except RuntimeError:
+            # Pool already shut down; run inline
+            fn(*args)
+
+    def get_stats(self) -> dict:
+        """Return queue depth and job counters"""
+        return {
+            "name": self.name,
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "interactive": self._interactive,
+            "background_deferred": self.deferred,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected
+        }
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting work and cancel anything still queued"""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
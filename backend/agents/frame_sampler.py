@@ -0,0 +1,359 @@
+"""
+Frame Sampler - Decodes sampled video frames with the cheapest strategy
+Seeking before every read makes long-GOP H.264 decode from the previous
+keyframe for each sample, so the sampler picks per file between:
+- sequential: grab() through the file, retrieve() only sampled frames
+- keyframe: decode keyframes only (ffmpeg -skip_frame nokey), snap samples
+  to the nearest keyframe
+- seek: cv2 seek per sample, only when samples are very far apart
+
+It can also pick samples adaptively at scene changes, using histogram and
+perceptual-hash differences of 64x36 frames. The scan runs through an
+ffmpeg pipe: every frame is still decoded (on ffmpeg's decoder threads),
+but only scan_fps frames are scaled, colour-converted and piped out. The
+few selected frames are then decoded exactly, at full resolution, with
+the sequential or seek strategy (keyframe mode would move them).
+"""
+from typing import Dict, Any, Iterator, List, Optional
+import logging
+import shutil
+import subprocess
+import time
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SEQUENTIAL = "sequential"
+KEYFRAME = "keyframe"
+SEEK = "seek"
+
+# Resolution of the frames compared by the scene-change scan
+SCAN_WIDTH = 64
+SCAN_HEIGHT = 36
+
+
+class FrameSampler:
+    """
+    Chooses and runs a decode strategy for a set of target frame indices.
+
+    With g the GOP length in frames and d the gap between samples:
+    - d <= sequential_gap_gops * g: decoding straight through is no more
+      work than decoding forward from a keyframe after each seek
+    - d <= seek_gap_gops * g: decoding only keyframes is cheaper than
+      n seeks that each decode about g/2 frames
+    - otherwise seek per sample
+    """
+
+    def __init__(self, sequential_gap_gops: float = 2.0, seek_gap_gops: float = 30.0,
+                 probe_seconds: int = 30, scan_fps: float = 2.0,
+                 hist_threshold: float = 0.3, hash_threshold: float = 0.2):
+        self.sequential_gap_gops = sequential_gap_gops
+        self.seek_gap_gops = seek_gap_gops
+        self.probe_seconds = probe_seconds
+        self.scan_fps = scan_fps
+        self.hist_threshold = hist_threshold
+        self.hash_threshold = hash_threshold
+        self.has_ffmpeg = bool(shutil.which("ffmpeg") and shutil.which("ffprobe"))
+
+    def estimate_gop(self, video_path: str, fps: float) -> float:
+        """Estimate frames per keyframe from the keyframes in the first few seconds"""
+        fallback = max(fps * 2, 1.0)
+        if not self.has_ffmpeg:
+            return fallback
+        try:
+            times = self._keyframe_times(video_path, read_seconds=self.probe_seconds)
+        except Exception as e:
+            logger.debug(f"GOP probe failed for {video_path}: {e}")
+            return fallback
+        if len(times) < 2:
+            # At most one keyframe in the probe window: GOP spans the whole window
+            return max(fps * self.probe_seconds, fallback)
+        return max(float(np.median(np.diff(times))) * fps, 1.0)
+
+    def choose_strategy(self, indices: List[int], gop: float, exact: bool = False) -> str:
+        """
+        Pick the cheapest strategy for the median gap between samples;
+        exact rules out keyframe mode, which moves samples to keyframes
+        """
+        if len(indices) < 2:
+            return SEEK
+        gap = float(np.median(np.diff(indices)))
+        if gap <= self.sequential_gap_gops * gop:
+            return SEQUENTIAL
+        if gap <= self.seek_gap_gops * gop and self.has_ffmpeg and not exact:
+            return KEYFRAME
+        return SEEK
+
+    def iter_frames(self, video_path: str, indices: List[int],
+                    stats: Optional[Dict[str, Any]] = None,
+                    strategy: Optional[str] = None,
+                    exact: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Yield {"sequence", "frame_number", "timestamp", "frame"} for each sample
+
+        Args:
+            video_path: Video file
+            indices: Target frame indices (keyframe mode snaps to the nearest keyframe)
+            stats: Optional dict filled with the chosen strategy and decode time
+            strategy: Force a strategy instead of choosing one
+            exact: Decode exactly the given frames (never snap to keyframes),
+                e.g. for scene changes that a nearby keyframe may not show
+        """
+        stats = stats if stats is not None else {}
+        indices = sorted({int(i) for i in indices if i >= 0})
+
+        cap = cv2.VideoCapture(video_path)
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            started = time.perf_counter()
+            gop = self.estimate_gop(video_path, fps) if strategy is None else 0.0
+            strategy = strategy or self.choose_strategy(indices, gop, exact)
+
+            stats.update({
+                "strategy": strategy,
+                "gop_estimate": round(gop, 1),
+                "frames_requested": len(indices),
+                "frames_decoded": 0,
+                "decode_seconds": round(time.perf_counter() - started, 3)
+            })
+            logger.info(f"Frame sampling: {strategy} for {len(indices)} frames (GOP ~{gop:.0f})")
+
+            if strategy == SEQUENTIAL:
+                frames = self._iter_sequential(cap, indices)
+            elif strategy == KEYFRAME:
+                cap.release()
+                frames = self._iter_keyframes(video_path, indices, fps)
+            else:
+                frames = self._iter_seek(cap, indices)
+
+            sequence = 0
+            while True:
+                resumed = time.perf_counter()
+                item = next(frames, None)
+                stats["decode_seconds"] = round(
+                    stats["decode_seconds"] + time.perf_counter() - resumed, 3
+                )
+                if item is None:
+                    break
+                frame_number, frame = item
+                stats["frames_decoded"] += 1
+                yield {
+                    "sequence": sequence,
+                    "frame_number": int(frame_number),
+                    "timestamp": round(frame_number / fps, 2) if fps > 0 else 0,
+                    "frame": frame
+                }
+                sequence += 1
+        finally:
+            cap.release()
+
+    @staticmethod
+    def _signature(small: np.ndarray):
+        """HSV colour histogram and 64-bit difference hash of a downscaled frame"""
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+        hist = cv2.calcHist([hsv], [0, 1], None, [16, 8], [0, 180, 0, 256])
+        cv2.normalize(hist, hist)
+        gray = cv2.cvtColor(cv2.resize(small, (9, 8), interpolation=cv2.INTER_AREA),
+                            cv2.COLOR_BGR2GRAY)
+        dhash = gray[:, 1:] > gray[:, :-1]
+        return hist, dhash
+
+    def select_scene_changes(self, video_path: str, budget: int,
+                             stats: Optional[Dict[str, Any]] = None) -> List[int]:
+        """
+        Scan downscaled frames and return the indices of up to budget frames
+        that start visually distinct scenes
+
+        Frames closer than the thresholds to the last selected frame are
+        treated as duplicates; stats["deduplicated"] lists, for each
+        selected frame, the range of scanned frames it stands in for.
+        """
+        stats = stats if stats is not None else {}
+        started = time.perf_counter()
+
+        cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        cap.release()
+
+        scanned: List[int] = []
+        candidates: List[tuple] = []  # (frame_number, score)
+        last_hist = last_hash = None
+        for position, small in self._iter_scan(video_path, fps):
+            hist, dhash = self._signature(small)
+            if last_hist is None:
+                score = float("inf")  # always keep the opening frame
+            else:
+                hist_distance = cv2.compareHist(last_hist, hist, cv2.HISTCMP_BHATTACHARYYA)
+                hash_distance = np.count_nonzero(last_hash != dhash) / dhash.size
+                score = max(hist_distance / self.hist_threshold,
+                            hash_distance / self.hash_threshold)
+            if score >= 1.0:
+                candidates.append((position, score))
+                last_hist, last_hash = hist, dhash
+            scanned.append(position)
+
+        # Over budget: keep the strongest scene changes
+        if len(candidates) > budget:
+            candidates = sorted(candidates, key=lambda c: c[1], reverse=True)[:max(budget, 1)]
+        selected = sorted(frame_number for frame_number, _ in candidates)
+
+        # Each scanned frame is represented by the last selected frame before it
+        ranges = []
+        owner = 0
+        for frame_number in scanned:
+            while owner + 1 < len(selected) and selected[owner + 1] <= frame_number:
+                owner += 1
+            if not selected or frame_number < selected[0]:
+                continue
+            if not ranges or ranges[-1]["frame_number"] != selected[owner]:
+                ranges.append({
+                    "frame_number": selected[owner],
+                    "start_frame": frame_number,
+                    "end_frame": frame_number,
+                    "duplicates": 0
+                })
+            else:
+                ranges[-1]["end_frame"] = frame_number
+                ranges[-1]["duplicates"] += 1
+
+        stats.update({
+            "mode": "adaptive",
+            "frames_scanned": len(scanned),
+            "scene_changes": len(selected),
+            "deduplicated_count": len(scanned) - len(selected),
+            "deduplicated": ranges,
+            "scan_seconds": round(time.perf_counter() - started, 3)
+        })
+        logger.info(f"Adaptive sampling: {len(selected)} distinct frames out of {len(scanned)} scanned")
+        return selected
+
+    def _iter_scan(self, video_path: str, fps: float):
+        """
+        Yield (frame_number, 64x36 BGR frame) at scan_fps
+
+        ffmpeg's fps and scale filters drop and shrink frames right after
+        decoding, so only SCAN_WIDTH x SCAN_HEIGHT frames are converted to
+        BGR and piped; without ffmpeg, cv2 grab()s every frame and retrieves
+        and downscales the scanned ones.
+        """
+        if self.has_ffmpeg and fps > 0:
+            frame_bytes = SCAN_WIDTH * SCAN_HEIGHT * 3
+            process = subprocess.Popen(
+                ["ffmpeg", "-v", "error", "-i", video_path, "-map", "0:v:0", "-an", "-sn",
+                 "-vf", f"fps={self.scan_fps},scale={SCAN_WIDTH}:{SCAN_HEIGHT}:flags=area",
+                 "-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1"],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+            try:
+                sample = 0
+                while True:
+                    raw = process.stdout.read(frame_bytes)
+                    if len(raw) < frame_bytes:
+                        break
+                    frame = np.frombuffer(raw, dtype=np.uint8).reshape(SCAN_HEIGHT, SCAN_WIDTH, 3)
+                    yield int(round(sample * fps / self.scan_fps)), frame
+                    sample += 1
+            finally:
+                process.stdout.close()
+                process.kill()
+                process.wait()
+            return
+
+        cap = cv2.VideoCapture(video_path)
+        step = max(1, int(round(fps / self.scan_fps))) if fps > 0 else 1
+        position = 0
+        try:
+            while cap.grab():
+                if position % step == 0:
+                    ret, frame = cap.retrieve()
+                    if ret:
+                        yield position, cv2.resize(frame, (SCAN_WIDTH, SCAN_HEIGHT),
+                                                   interpolation=cv2.INTER_AREA)
+                position += 1
+        finally:
+            cap.release()
+
+    def _iter_sequential(self, cap, indices: List[int]):
+        """Grab every frame, decode to BGR only the sampled ones"""
+        position = 0
+        for target in indices:
+            while position < target:
+                if not cap.grab():
+                    return
+                position += 1
+            if not cap.grab():
+                return
+            ret, frame = cap.retrieve()
+            position += 1
+            if ret:
+                yield target, frame
+
+    def _iter_seek(self, cap, indices: List[int]):
+        """Seek to each sample (decodes forward from the preceding keyframe)"""
+        for target in indices:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+            ret, frame = cap.read()
+            if ret:
+                yield target, frame
+
+    def _keyframe_times(self, video_path: str, read_seconds: Optional[int] = None) -> List[float]:
+        """List keyframe presentation times using ffprobe (decodes keyframes only)"""
+        cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0", "-skip_frame", "nokey"]
+        if read_seconds:
+            cmd += ["-read_intervals", f"%+{read_seconds}"]
+        cmd += ["-show_entries", "frame=best_effort_timestamp_time", "-of", "csv=p=0", video_path]
+        output = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+        times = []
+        for line in output.splitlines():
+            value = line.strip().rstrip(",")
+            if value and value != "N/A":
+                times.append(float(value))
+        return times
+
+    def _stream_size(self, video_path: str):
+        """Coded width and height of the first video stream"""
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-select_streams", "v:0",
+             "-show_entries", "stream=width,height", "-of", "csv=p=0:s=x", video_path],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        width, height = output.split("x")[:2]
+        return int(width), int(height)
+
+    def _iter_keyframes(self, video_path: str, indices: List[int], fps: float):
+        """Decode only keyframes with ffmpeg and keep those nearest the samples"""
+        times = self._keyframe_times(video_path)
+        if not times or fps <= 0:
+            return
+        keyframe_numbers = np.round(np.asarray(times) * fps).astype(int)
+
+        # Nearest keyframe for each target, each keyframe used once
+        wanted = set()
+        for target in indices:
+            wanted.add(int(np.abs(keyframe_numbers - target).argmin()))
+
+        width, height = self._stream_size(video_path)
+        frame_bytes = width * height * 3
+        process = subprocess.Popen(
+            ["ffmpeg", "-v", "error", "-noautorotate", "-skip_frame", "nokey",
+             "-i", video_path, "-map", "0:v:0", "-vsync", "passthrough",
+             "-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        try:
+            last_wanted = max(wanted)
+            for position in range(len(times)):
+                raw = process.stdout.read(frame_bytes)
+                if len(raw) < frame_bytes:
+                    break
+                if position in wanted:
+                    frame = np.frombuffer(raw, dtype=np.uint8).reshape(height, width, 3)
+                    yield int(keyframe_numbers[position]), frame
+                if position >= last_wanted:
+                    break
+        finally:
+            process.stdout.close()
+            process.kill()
+            process.wait()
@@ -0,0 +1,69 @@
+"""
+Intent Grammar - GBNF grammar constraining the orchestrator's intent JSON
+llama.cpp can only sample tokens the grammar allows, so the output is
+always one well-formed intent object and generation ends when it closes.
+"""
+from typing import Dict, Any, List, Optional
+import json
+import re
+
+INTENT_ACTIONS = [
+    "transcribe",
+    "detect_objects",
+    "describe_scenes",
+    "analyze_graphs",
+    "generate_pdf",
+    "generate_pptx",
+    "summarize",
+    "respond",
+]
+
+# Stop string for fast mode: the closing quote and comma after primary_action
+FAST_STOP = '",'
+
+_PRIMARY_ACTION = re.compile(r'"primary_action"\s*:\s*"(\w+)')
+
+
+def build_intent_grammar(actions: Optional[List[str]] = None) -> str:
+    """
+    GBNF for the intent object; keys are fixed in order, primary_action first
+
+    String characters exclude raw control characters (U+0000-U+001F), which
+    strict json.loads rejects inside strings.
+    """
+    actions = actions or INTENT_ACTIONS
+    action_rule = " | ".join(f'"\\"{action}\\""' for action in actions)
+    return f"""
+root ::= "{{" ws "\\"primary_action\\":" ws action "," ws "\\"additional_actions\\":" ws actions "," ws "\\"needs_clarification\\":" ws boolean "," ws "\\"clarification_question\\":" ws question "," ws "\\"reasoning\\":" ws reasoning ws "}}"
+action ::= {action_rule}
+actions ::= "[" ( action ( "," ws action ){{0,3}} )? "]"
+boolean ::= "true" | "false"
+question ::= "\\"" char{{0,200}} "\\""
+reasoning ::= "\\"" char{{0,120}} "\\""
+char ::= [^"\\\\\\x00-\\x1f] | "\\\\" ["\\\\/nt]
+ws ::= [ \\n]{{0,2}} [ ]{{0,4}}
+"""
+
+
+def parse_intent(text: str, fast: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Parse grammar-constrained output
+
+    In fast mode generation stopped right after primary_action was decoded,
+    so the remaining fields get their defaults.
+    """
+    if fast:
+        match = _PRIMARY_ACTION.search(text)
+        if not match:
+            return None
+        return {
+            "primary_action": match.group(1),
+            "additional_actions": [],
+            "needs_clarification": False,
+            "clarification_question": "",
+            "reasoning": "grammar fast mode"
+        }
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
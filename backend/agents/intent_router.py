@@ -0,0 +1,157 @@
+"""
+Intent Router - Nearest-example intent classification with sentence embeddings
+Answers routine queries in milliseconds; ambiguous ones (small margin
+between the two best actions) are left to the LLM.
+"""
+from typing import Dict, Any, List, Optional
+import logging
+
+import numpy as np
+
+from .embeddings import TextEmbedder
+
+logger = logging.getLogger(__name__)
+
+# Labelled example queries per action. "analyze_graphs" maps to the same
+# actions as the keyword fallback (describe_scenes + detect_objects).
+INTENT_EXAMPLES: Dict[str, List[str]] = {
+    "transcribe": [
+        "transcribe the video",
+        "what was said in the video",
+        "give me the transcript",
+        "what did the speaker say",
+        "convert the speech to text",
+        "what are they talking about",
+        "write down the audio",
+        "what words are spoken",
+    ],
+    "detect_objects": [
+        "what objects are in the video",
+        "detect the objects",
+        "identify the items you can see",
+        "are there any people or cars",
+        "list everything visible in the frames",
+        "is there a laptop in the video",
+        "what things appear on screen",
+    ],
+    "describe_scenes": [
+        "describe the video",
+        "what is happening in the video",
+        "describe the scenes",
+        "what does the video show",
+        "tell me what happens visually",
+        "explain what is going on in the footage",
+    ],
+    "analyze_graphs": [
+        "are there any graphs in the video",
+        "describe the charts shown",
+        "what does the plot show",
+        "explain the diagram on screen",
+        "what data is in the chart",
+    ],
+    "summarize": [
+        "summarize the video",
+        "give me a summary",
+        "what is the overview of this video",
+        "recap the analysis",
+        "sum up the key points",
+        "tl;dr of the video",
+    ],
+    "generate_pdf": [
+        "create a pdf report",
+        "export the analysis as a document",
+        "write a report of the findings",
+    ],
+    "generate_pptx": [
+        "make a powerpoint presentation",
+        "create slides from the analysis",
+        "build a slide deck",
+    ],
+    "respond": [
+        "hello",
+        "thanks",
+        "what can you do",
+        "how does this work",
+        "can you help me",
+    ],
+}
+
+ROUTED_ACTIONS = {
+    "analyze_graphs": ("describe_scenes", ["detect_objects"]),
+}
+
+
+class IntentRouter:
+    """
+    Scores a query against every labelled example and keeps the best score
+    per action. The route is trusted when the best action scores at least
+    min_score and beats the runner-up by at least margin.
+    """
+
+    def __init__(self, embedder: TextEmbedder,
+                 examples: Optional[Dict[str, List[str]]] = None,
+                 min_score: float = 0.45, margin: float = 0.08):
+        self.embedder = embedder
+        self.examples = examples or INTENT_EXAMPLES
+        self.min_score = min_score
+        self.margin = margin
+        self.labels = np.array([])
+        self.matrix = None
+        self.routed = 0
+        self.deferred = 0
+
+    async def initialize(self):
+        """Embed the example queries once"""
+        labels, texts = [], []
+        for action, queries in self.examples.items():
+            labels.extend([action] * len(queries))
+            texts.extend(queries)
+        self.labels = np.array(labels)
+        self.matrix = await self.embedder.embed(texts)
+        logger.info(f"Intent router ready: {len(texts)} examples for {len(self.examples)} actions")
+
+    def score(self, query_vector: np.ndarray) -> List[tuple]:
+        """(action, best similarity) pairs sorted best first"""
+        similarities = self.matrix @ query_vector
+        best = {}
+        for label, similarity in zip(self.labels, similarities):
+            if similarity > best.get(label, -1.0):
+                best[label] = float(similarity)
+        return sorted(best.items(), key=lambda item: item[1], reverse=True)
+
+    async def route(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Return an intent dict for confident matches, or None to defer to the LLM
+        """
+        if self.matrix is None:
+            return None
+
+        query_vector = (await self.embedder.embed([query]))[0]
+        ranked = self.score(query_vector)
+        action, top = ranked[0]
+        runner_up, second = ranked[1] if len(ranked) > 1 else ("", -1.0)
+
+        if top < self.min_score or top - second < self.margin:
+            self.deferred += 1
+            logger.info(f"Intent router deferred: {action} {top:.2f} vs {runner_up} {second:.2f}")
+            return None
+
+        self.routed += 1
+        primary, additional = ROUTED_ACTIONS.get(action, (action, []))
+        logger.info(f"Intent router: {action} ({top:.2f}, margin {top - second:.2f})")
+        return {
+            "primary_action": primary,
+            "additional_actions": list(additional),
+            "needs_clarification": False,
+            "clarification_question": "",
+            "reasoning": f"embedding match {action} ({top:.2f})"
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return routed/deferred counters"""
+        total = self.routed + self.deferred
+        return {
+            "routed": self.routed,
+            "deferred": self.deferred,
+            "routed_ratio": round(self.routed / total, 3) if total else 0.0
+        }
@@ -2,15 +2,64 @@
 Orchestrator Agent - Routes queries to appropriate specialized agents
 Uses Llama 3.1 8B to understand user intent and coordinate agent execution
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator
+import asyncio
 import logging
+import threading
 from pathlib import Path
 import json
 
 from .base_agent import BaseAgent
+from .progress import report_progress
+from .embeddings import TextEmbedder
+from .intent_router import IntentRouter, ROUTED_ACTIONS
+from .intent_grammar import build_intent_grammar, parse_intent, FAST_STOP
+from .prompt_cache import PromptPrefixCache
+from .action_scheduler import ActionScheduler
+from .context_index import ContextIndex
+from .summarizer import (HierarchicalSummarizer, CHUNK_PROMPT_PREFIX,
+                         CHAPTER_PROMPT_PREFIX, VIDEO_PROMPT_PREFIX)
 
 logger = logging.getLogger(__name__)
 
+AVAILABLE_ACTIONS = """
+        - transcribe: Extract speech-to-text from video
+        - detect_objects: Find and identify objects in video frames
+        - describe_scenes: Generate natural language descriptions of video content
+        - analyze_graphs: Detect and describe charts/graphs in video
+        - generate_pdf: Create PDF report from analysis
+        - generate_pptx: Create PowerPoint presentation
+        - summarize: Summarize previous analysis or conversation
+        """
+
+# Static prompt prefixes; the query-specific part always comes after them
+INTENT_PROMPT_PREFIX = f"""You are an AI assistant analyzing user queries about video content.
+Your task is to determine what actions are needed to answer the query.
+
+Available actions:
+{AVAILABLE_ACTIONS}
+
+Based on the user query, respond with a JSON object containing:
+{{
+    "primary_action": "action_name",
+    "additional_actions": ["action1", "action2"],
+    "needs_clarification": false,
+    "clarification_question": "",
+    "reasoning": "brief explanation"
+}}
+
+If the query is ambiguous, set needs_clarification to true and provide a clarification question.
+If no new actions needed (just answering from context), set primary_action to "respond".
+"""
+
+RESPONSE_PROMPT_PREFIX = """Summarize the following video analysis in 2-3 sentences:
+
+"""
+
+SUMMARY_PROMPT_PREFIX = """Provide a concise summary of this video analysis:
+
+"""
+
 
 class OrchestratorAgent(BaseAgent):
     """
@@ -22,18 +71,33 @@ class OrchestratorAgent(BaseAgent):
     """
     
     def __init__(self, model_path: str, transcription_mcp=None, 
-                 vision_mcp=None, generation_mcp=None):
+                 vision_mcp=None, generation_mcp=None, fast_intent: bool = False,
+                 cache=None, context_budget_tokens: int = 1200,
+                 vision_sampling: str = "uniform"):
         super().__init__("Orchestrator", model_path)
         self.llm = None
         self.transcription_mcp = transcription_mcp
         self.vision_mcp = vision_mcp
         self.generation_mcp = generation_mcp
         self.conversation_history = []
+        self.embedder = TextEmbedder()
+        self.intent_router = IntentRouter(self.embedder)
+        # Retrieval needs the analysis cache's content hashes to key the index
+        self.context_index = ContextIndex(self.embedder, cache.video_hash) if cache else None
+        self.summarizer = HierarchicalSummarizer(
+            self._complete_text, cache.video_hash, model_version=str(model_path)
+        ) if cache else None
+        self.context_budget_tokens = context_budget_tokens
+        self.vision_sampling = vision_sampling
+        self.prompt_cache = None
+        self.action_scheduler = ActionScheduler()
+        self.intent_grammar = None
+        self.fast_intent = fast_intent
         
     async def initialize(self):
         """Initialize Llama model for orchestration"""
         try:
-            from llama_cpp import Llama
+            from llama_cpp import Llama, LlamaGrammar
             
             logger.info(f"Loading Llama orchestrator model...")
             self.llm = Llama(
@@ -43,11 +107,26 @@ class OrchestratorAgent(BaseAgent):
                 n_gpu_layers=1,
                 verbose=False
             )
+            self.prompt_cache = PromptPrefixCache(self.llm)
+            self.prompt_cache.register("intent", INTENT_PROMPT_PREFIX)
+            self.prompt_cache.register("response", RESPONSE_PROMPT_PREFIX)
+            self.prompt_cache.register("summary", SUMMARY_PROMPT_PREFIX)
+            self.prompt_cache.register("summary_chunk", CHUNK_PROMPT_PREFIX)
+            self.prompt_cache.register("summary_chapter", CHAPTER_PROMPT_PREFIX)
+            self.prompt_cache.register("summary_video", VIDEO_PROMPT_PREFIX)
+            self.intent_grammar = LlamaGrammar.from_string(build_intent_grammar(), verbose=False)
             logger.info("Orchestrator model loaded successfully")
             
         except Exception as e:
             logger.error(f"Failed to load orchestrator model: {e}")
             raise
+        
+        # The router is an optimization: without it every query goes to the LLM
+        try:
+            await self.embedder.initialize()
+            await self.intent_router.initialize()
+        except Exception as e:
+            logger.warning(f"Intent router unavailable, using LLM intent analysis: {e}")
     
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -74,6 +153,7 @@ class OrchestratorAgent(BaseAgent):
         
         logger.info(f"Processing query: {query[:100]}...")
         
+        report_progress("intent", message="Understanding your query...")
         intent = await self.analyze_intent(query, context)
         
         # Ensure intent has required keys
@@ -94,7 +174,8 @@ class OrchestratorAgent(BaseAgent):
         
         results = await self.execute_actions(intent, video_path, context)
         
-        response = await self.generate_response(query, intent, results, context)
+        report_progress("response", message="Writing the answer...")
+        response = await self.generate_response(query, intent, results, context, video_path)
         
         # Build list of actions actually executed
         actions_executed = []
@@ -140,45 +221,31 @@ class OrchestratorAgent(BaseAgent):
                 "reasoning": "presentation generation keyword match"
             }
         
-        available_actions = """
-        - transcribe: Extract speech-to-text from video
-        - detect_objects: Find and identify objects in video frames
-        - describe_scenes: Generate natural language descriptions of video content
-        - analyze_graphs: Detect and describe charts/graphs in video
-        - generate_pdf: Create PDF report from analysis
-        - generate_pptx: Create PowerPoint presentation
-        - summarize: Summarize previous analysis or conversation
-        """
+        # Confident embedding matches skip the LLM completion
+        try:
+            routed = await self.intent_router.route(query)
+            if routed:
+                return routed
+        except Exception as e:
+            logger.warning(f"Intent routing failed, using LLM: {e}")
         
         has_transcription = bool(context.get("transcription"))
         has_vision = bool(context.get("vision_results"))
         
-        system_prompt = f"""You are an AI assistant analyzing user queries about video content.
-Your task is to determine what actions are needed to answer the query.
-
-Available actions:
-{available_actions}
-
+        # Static instructions first so their KV state is reused across queries
+        system_prompt = f"""{INTENT_PROMPT_PREFIX}
 Current context:
 - Transcription available: {has_transcription}
 - Vision analysis available: {has_vision}
 
-Based on the user query, respond with a JSON object containing:
-{{
-    "primary_action": "action_name",
-    "additional_actions": ["action1", "action2"],
-    "needs_clarification": false,
-    "clarification_question": "",
-    "reasoning": "brief explanation"
-}}
-
-If the query is ambiguous, set needs_clarification to true and provide a clarification question.
-If no new actions needed (just answering from context), set primary_action to "respond".
-
 User query: {query}"""
 
         try:
-            response = self.llm(
+            if self.intent_grammar is not None:
+                return await self._analyze_intent_constrained(system_prompt, query, context)
+            
+            response = await self.run_blocking(
+                self._complete,
                 system_prompt,
                 max_tokens=256,
                 temperature=0.3,
@@ -209,6 +276,35 @@ User query: {query}"""
             logger.warning(f"Intent analysis failed, using fallback: {e}")
             return self._parse_intent_from_text(query, context)
     
+    async def _analyze_intent_constrained(self, system_prompt: str, query: str,
+                                          context: Dict[str, Any]) -> Dict[str, Any]:
+        """Decode the intent under the GBNF grammar; stops when the object closes"""
+        response = await self.run_blocking(
+            self._complete,
+            system_prompt,
+            max_tokens=256,
+            temperature=0.3,
+            grammar=self.intent_grammar,
+            # Fast mode stops as soon as primary_action has been decoded
+            stop=[FAST_STOP] if self.fast_intent else [],
+            echo=False
+        )
+        
+        tokens = response.get('usage', {}).get('completion_tokens', 0)
+        intent = parse_intent(response['choices'][0]['text'], fast=self.fast_intent)
+        if not intent:
+            # Only reachable if max_tokens cut the object short
+            logger.info(f"Constrained intent incomplete after {tokens} tokens, using keyword fallback")
+            return self._parse_intent_from_text(query, context)
+        
+        primary, additional = ROUTED_ACTIONS.get(intent["primary_action"], (intent["primary_action"], []))
+        intent["primary_action"] = primary
+        intent["additional_actions"] = list(additional) + [
+            action for action in intent.get("additional_actions", []) if action != primary
+        ]
+        logger.info(f"LLM intent: {primary} ({tokens} tokens)")
+        return intent
+    
     def _parse_intent_from_text(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Fallback intent parser using simple keyword matching"""
         query_lower = query.lower()
@@ -271,97 +367,126 @@ User query: {query}"""
     async def execute_actions(self, intent: Dict[str, Any], 
                             video_path: Optional[str],
                             context: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute the actions determined by intent analysis"""
+        """Execute the actions determined by intent analysis, independent ones concurrently"""
         results = {}
-        actions = [intent["primary_action"]] + intent.get("additional_actions", [])
-        
-        for action in actions:
-            try:
-                if action == "transcribe" and self.transcription_mcp:
-                    if not video_path:
-                        results["transcribe"] = {"error": "No video provided"}
-                        continue
-                    
-                    logger.info("Executing transcription via MCP...")
-                    transcription_result = await self.transcription_mcp.handle_tool_call(
-                        "transcribe_video",
-                        {"video_path": video_path}
-                    )
-                    results["transcription"] = transcription_result
-                    context["transcription"] = transcription_result
-                    
-                elif action == "detect_objects" and self.vision_mcp:
-                    if not video_path:
-                        results["detect_objects"] = {"error": "No video provided"}
-                        continue
-                    
-                    logger.info("Executing object detection via MCP...")
-                    vision_result = await self.vision_mcp.handle_tool_call(
-                        "detect_objects",
-                        {"video_path": video_path}
-                    )
-                    results["vision"] = vision_result
-                    context["vision_results"] = vision_result
-                    
-                elif action == "describe_scenes" and self.vision_mcp:
-                    if not video_path:
-                        results["describe_scenes"] = {"error": "No video provided"}
-                        continue
-                    
-                    logger.info("Executing scene description via MCP...")
-                    vision_result = await self.vision_mcp.handle_tool_call(
-                        "caption_video",
-                        {"video_path": video_path}
-                    )
-                    results["vision"] = vision_result
-                    context["vision_results"] = vision_result
-                    
-                elif action == "generate_pdf" and self.generation_mcp:
-                    logger.info("Generating PDF report via MCP...")
-                    pdf_result = await self.generation_mcp.handle_tool_call(
-                        "generate_pdf",
-                        {
-                            "content": {
-                                "title": "Video Analysis Report",
-                                "transcription": context.get("transcription"),
-                                "vision_results": context.get("vision_results"),
-                                "summary": context.get("summary", "")
-                            },
-                            "output_path": "tests/results/report"
-                        }
-                    )
-                    results["pdf"] = pdf_result
-                    
-                elif action == "generate_pptx" and self.generation_mcp:
-                    logger.info("Generating PowerPoint presentation via MCP...")
-                    pptx_result = await self.generation_mcp.handle_tool_call(
-                        "generate_pptx",
-                        {
-                            "content": {
-                                "title": "Video Analysis Presentation",
-                                "transcription": context.get("transcription"),
-                                "vision_results": context.get("vision_results"),
-                                "summary": context.get("summary", "")
-                            },
-                            "output_path": "tests/results/report"
-                        }
-                    )
-                    results["pptx"] = pptx_result
-                    
-                elif action == "summarize":
-                    logger.info("Generating summary...")
-                    summary = await self.generate_summary(context)
-                    results["summary"] = summary
-                    context["summary"] = summary
-                    
-            except Exception as e:
-                logger.error(f"Action {action} failed: {e}")
-                results[action] = {"error": str(e)}
-        
+        actions = list(dict.fromkeys([intent["primary_action"]] + intent.get("additional_actions", [])))
+        finished = 0
+        
+        async def run_action(action: str):
+            nonlocal finished
+            report_progress("actions", finished, len(actions), "actions", f"Running {action}...",
+                            action=action)
+            await self._execute_action(action, video_path, context, results)
+            finished += 1
+            report_progress("actions", finished, len(actions), "actions", f"Finished {action}",
+                            action=action)
+        
+        await self.action_scheduler.run(actions, run_action)
         return results
     
+    def analysis_call(self, action: str, video_path: str):
+        """
+        (MCP server, tool, arguments) for an analysis action, or None
+        
+        Background pre-analysis uses the same calls, so its cached results
+        are exactly the ones later queries look up.
+        """
+        if action == "transcribe" and self.transcription_mcp:
+            return self.transcription_mcp, "transcribe_video", {"video_path": video_path}
+        if action == "detect_objects" and self.vision_mcp:
+            return self.vision_mcp, "detect_objects", {
+                "video_path": video_path, "sampling": self.vision_sampling
+            }
+        if action == "describe_scenes" and self.vision_mcp:
+            return self.vision_mcp, "caption_video", {
+                "video_path": video_path, "sampling": self.vision_sampling
+            }
+        return None
+    
+    async def _execute_action(self, action: str, video_path: Optional[str],
+                              context: Dict[str, Any], results: Dict[str, Any]):
+        """Run one action, storing its output in results and context"""
+        try:
+            if action == "transcribe" and self.transcription_mcp:
+                if not video_path:
+                    results["transcribe"] = {"error": "No video provided"}
+                    return
+                
+                logger.info("Executing transcription via MCP...")
+                server, tool, arguments = self.analysis_call(action, video_path)
+                transcription_result = await server.handle_tool_call(tool, arguments)
+                results["transcription"] = transcription_result
+                context["transcription"] = transcription_result
+                
+            elif action == "detect_objects" and self.vision_mcp:
+                if not video_path:
+                    results["detect_objects"] = {"error": "No video provided"}
+                    return
+                
+                logger.info("Executing object detection via MCP...")
+                server, tool, arguments = self.analysis_call(action, video_path)
+                vision_result = await server.handle_tool_call(tool, arguments)
+                results["vision"] = vision_result
+                context["vision_results"] = vision_result
+                
+            elif action == "describe_scenes" and self.vision_mcp:
+                if not video_path:
+                    results["describe_scenes"] = {"error": "No video provided"}
+                    return
+                
+                logger.info("Executing scene description via MCP...")
+                server, tool, arguments = self.analysis_call(action, video_path)
+                vision_result = await server.handle_tool_call(tool, arguments)
+                results["vision"] = vision_result
+                context["vision_results"] = vision_result
+                
+            elif action == "generate_pdf" and self.generation_mcp:
+                await self._load_stored_summary(video_path, context)
+                logger.info("Generating PDF report via MCP...")
+                pdf_result = await self.generation_mcp.handle_tool_call(
+                    "generate_pdf",
+                    {
+                        "content": {
+                            "title": "Video Analysis Report",
+                            "transcription": context.get("transcription"),
+                            "vision_results": context.get("vision_results"),
+                            "summary": context.get("summary", "")
+                        },
+                        "output_path": "tests/results/report"
+                    }
+                )
+                results["pdf"] = pdf_result
+                
+            elif action == "generate_pptx" and self.generation_mcp:
+                await self._load_stored_summary(video_path, context)
+                logger.info("Generating PowerPoint presentation via MCP...")
+                pptx_result = await self.generation_mcp.handle_tool_call(
+                    "generate_pptx",
+                    {
+                        "content": {
+                            "title": "Video Analysis Presentation",
+                            "transcription": context.get("transcription"),
+                            "vision_results": context.get("vision_results"),
+                            "summary": context.get("summary", "")
+                        },
+                        "output_path": "tests/results/report"
+                    }
+                )
+                results["pptx"] = pptx_result
+                
+            elif action == "summarize":
+                logger.info("Generating summary...")
+                summary = await self.generate_summary(context, video_path)
+                results["summary"] = summary
+                context["summary"] = summary
+                
+        except Exception as e:
+            logger.error(f"Action {action} failed: {e}")
+            results[action] = {"error": str(e)}
+    
     async def generate_response(self, query: str, intent: Dict[str, Any], 
-                               results: Dict[str, Any], context: Dict[str, Any]) -> str:
+                               results: Dict[str, Any], context: Dict[str, Any],
+                               video_path: Optional[str] = None) -> str:
         """Generate natural language response based on query and results"""
         
         # For most queries, use the factual fallback response
@@ -370,24 +495,26 @@ User query: {query}"""
         
         # Use LLM only for summary/synthesis queries
         if "summary" in query_lower or "summarize" in query_lower:
-            context_text = self._build_context_text(results, context)
+            tree = context.get("summary_tree")
+            if tree and results.get("summary") == tree.get("summary"):
+                return tree["summary"]
             
-            prompt = f"""Summarize the following video analysis in 2-3 sentences:
-
-{context_text}
+            context_text = (await self._retrieve_context(query, context, video_path)
+                            or self._build_context_text(results, context))
+            
+            prompt = f"""{RESPONSE_PROMPT_PREFIX}{context_text}
 
 Summary (2-3 sentences only):"""
 
             try:
-                response = self.llm(
+                summary = await self._stream_to_progress(
+                    "response",
                     prompt,
                     max_tokens=150,
                     temperature=0.5,
-                    stop=["\n\n", "User:"],
-                    echo=False
+                    stop=["\n\n", "User:"]
                 )
-                
-                summary = response['choices'][0]['text'].strip()
+                summary = summary.strip()
                 # Only take first paragraph to avoid rambling
                 summary = summary.split('\n\n')[0]
                 return summary
@@ -399,6 +526,83 @@ Summary (2-3 sentences only):"""
         # For all other queries, use factual fallback
         return self._generate_fallback_response(query, results, context)
     
+    def _prepare_prompt(self, prompt: str):
+        """Blocking: restore the KV state of the prompt's static prefix"""
+        if self.prompt_cache:
+            try:
+                self.prompt_cache.prepare(prompt)
+            except Exception as e:
+                logger.warning(f"Prompt prefix cache failed, evaluating full prompt: {e}")
+    
+    def _complete(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """Blocking completion that reuses cached prefix state"""
+        self._prepare_prompt(prompt)
+        return self.llm(prompt, **kwargs)
+    
+    async def _complete_text(self, prompt: str, max_tokens: int) -> str:
+        """Completion text for the summarizer's map and reduce steps"""
+        response = await self.run_blocking(
+            self._complete, prompt, max_tokens=max_tokens,
+            temperature=0.3, stop=["\n\n"], echo=False
+        )
+        return response['choices'][0]['text']
+    
+    async def stream_completion(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Yield completion text as llama.cpp produces it
+        
+        Generation runs on the agent executor; tokens are handed to the event
+        loop one by one, so the first one arrives after prompt evaluation
+        rather than after the whole completion. Closing the iterator stops
+        generation at the next token.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        finished = object()
+        
+        def produce():
+            try:
+                self._prepare_prompt(prompt)
+                for chunk in self.llm(prompt, stream=True, echo=False, **kwargs):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk['choices'][0]['text'])
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, finished)
+        
+        task = asyncio.ensure_future(self.run_blocking(produce))
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    item = getter.result()
+                else:
+                    getter.cancel()
+                    # Raises if generation failed or never started
+                    task.result()
+                    item = await queue.get()
+                if item is finished:
+                    break
+                yield item
+            await task
+        finally:
+            stop.set()
+            if not task.done():
+                task.cancel()
+    
+    async def _stream_to_progress(self, stage: str, prompt: str, max_tokens: int, **kwargs) -> str:
+        """Stream a completion, publishing each delta as progress, and return the full text"""
+        text = ""
+        tokens = 0
+        async for delta in self.stream_completion(prompt, max_tokens=max_tokens, **kwargs):
+            text += delta
+            tokens += 1
+            report_progress(stage, tokens, max_tokens, "tokens",
+                            f"Generated {tokens} tokens", delta=delta)
+        return text
+    
     def _build_context_text(self, results: Dict[str, Any], context: Dict[str, Any]) -> str:
         """Build context text from results and stored context"""
         parts = []
@@ -516,12 +720,52 @@ Summary (2-3 sentences only):"""
         
         return "\n".join(response_parts) if response_parts else "Task completed."
     
-    async def generate_summary(self, context: Dict[str, Any]) -> str:
+    async def _load_stored_summary(self, video_path: Optional[str], context: Dict[str, Any]):
+        """Put a previously built summary tree into context for reports (no LLM call)"""
+        transcription = context.get("transcription")
+        if context.get("summary") or not self.summarizer or not video_path or not transcription:
+            return
+        try:
+            tree = await self.summarizer.load(video_path, transcription)
+        except Exception as e:
+            logger.warning(f"Could not load stored summary: {e}")
+            return
+        if tree and tree.get("summary"):
+            context["summary"] = tree["summary"]
+            context["summary_tree"] = tree
+    
+    async def _retrieve_context(self, query: str, context: Dict[str, Any],
+                                video_path: Optional[str]) -> str:
+        """Chunks of this video's transcript and captions relevant to the query, within budget"""
+        if not self.context_index or not video_path or self.embedder.model is None:
+            return ""
+        try:
+            return await self.context_index.retrieve(
+                video_path, context, query, budget_tokens=self.context_budget_tokens
+            )
+        except Exception as e:
+            logger.warning(f"Context retrieval failed, using truncated context: {e}")
+            return ""
+    
+    async def generate_summary(self, context: Dict[str, Any],
+                               video_path: Optional[str] = None) -> str:
         """Generate summary of analysis results"""
         
-        summary_parts = []
+        # Long transcripts: map-reduce summary tree, stored per video
+        transcription = context.get("transcription")
+        if self.summarizer and video_path and transcription and not transcription.get("error"):
+            try:
+                tree = await self.summarizer.summarize(video_path, transcription)
+                if tree.get("summary"):
+                    context["summary_tree"] = tree
+                    return tree["summary"]
+            except Exception as e:
+                logger.warning(f"Hierarchical summary failed, using single prompt: {e}")
+        
+        retrieved = await self._retrieve_context("overview of the whole video", context, video_path)
+        summary_parts = [retrieved] if retrieved else []
         
-        if "transcription" in context:
+        if "transcription" in context and not retrieved:
             trans = context["transcription"]
             if "transcription" in trans:
                 summary_parts.append(f"Audio content: {trans['transcription'][:300]}")
@@ -534,23 +778,35 @@ Summary (2-3 sentences only):"""
         
         summary_text = "\n".join(summary_parts)
         
-        prompt = f"""Provide a concise summary of this video analysis:
-
-{summary_text}
+        prompt = f"""{SUMMARY_PROMPT_PREFIX}{summary_text}
 
 Summary (2-3 sentences):"""
 
         try:
-            response = self.llm(
+            summary = await self._stream_to_progress(
+                "summary",
                 prompt,
                 max_tokens=150,
                 temperature=0.5,
-                stop=["\n\n"],
-                echo=False
+                stop=["\n\n"]
             )
-            
-            return response['choices'][0]['text'].strip()
+            return summary.strip()
             
         except Exception as e:
             logger.warning(f"Summary generation failed: {e}")
             return "Analysis complete. Transcription and visual analysis available."
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Return intent routing and executor counters"""
+        return {
+            "intent_router": self.intent_router.get_stats(),
+            "prompt_cache": self.prompt_cache.get_stats() if self.prompt_cache else {},
+            "context_index": self.context_index.get_stats() if self.context_index else {},
+            "summarizer": self.summarizer.get_stats() if self.summarizer else {},
+            "executor": self.executor.get_stats()
+        }
+    
+    async def cleanup(self):
+        """Stop the embedder executor as well"""
+        self.embedder.cleanup()
+        await super().cleanup()
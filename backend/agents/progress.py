@@ -0,0 +1,106 @@
+"""
+Progress reporting - Async channel carrying incremental events from agents
+Agents call report_progress() wherever they are; events reach whoever runs
+the work through run_with_progress() (e.g. StreamQuery) and are dropped
+when nobody is listening.
+"""
+from typing import Any, AsyncIterator, Awaitable, Dict, Optional
+import asyncio
+import contextvars
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_current_channel: contextvars.ContextVar[Optional["ProgressChannel"]] = contextvars.ContextVar(
+    "progress_channel", default=None
+)
+
+
+class ProgressChannel:
+    """Queue of progress events, safe to publish to from executor threads"""
+
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def publish(self, event: Dict[str, Any]):
+        """Enqueue an event from the event loop or from a worker thread"""
+        if threading.get_ident() == self._loop_thread:
+            self._queue.put_nowait(event)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+
+    async def get(self) -> Dict[str, Any]:
+        return await self._queue.get()
+
+    def drain(self):
+        """Return events already queued without waiting"""
+        events = []
+        while not self._queue.empty():
+            events.append(self._queue.get_nowait())
+        return events
+
+
+def report_progress(stage: str, completed: float = 0, total: float = 0,
+                    unit: str = "", message: str = "", **extra):
+    """
+    Publish a progress event to the current request's channel, if any
+
+    Args:
+        stage: "intent", "transcription", "vision", "generation", "response", ...
+        completed / total: Progress in unit (total 0 when unknown)
+        unit: "seconds", "frames", "tokens", "actions"
+        message: Human-readable status line
+        extra: Stage-specific payload (e.g. partial_text for transcripts)
+    """
+    channel = _current_channel.get()
+    if channel is None:
+        return
+    channel.publish({
+        "type": "progress",
+        "stage": stage,
+        "completed": completed,
+        "total": total,
+        "unit": unit,
+        "fraction": min(completed / total, 1.0) if total else 0.0,
+        "message": message,
+        **extra
+    })
+
+
+async def run_with_progress(work: Awaitable[Any]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run work while yielding its progress events as they arrive
+
+    Yields {"type": "progress", ...} events, then a final
+    {"type": "result", "result": ...}. Exceptions from the work propagate;
+    closing the iterator early cancels the work.
+    """
+    channel = ProgressChannel()
+    token = _current_channel.set(channel)
+    try:
+        # The task copies the current context, so it sees the channel
+        task = asyncio.ensure_future(work)
+    finally:
+        _current_channel.reset(token)
+
+    try:
+        while not task.done():
+            getter = asyncio.ensure_future(channel.get())
+            await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield getter.result()
+            else:
+                getter.cancel()
+
+        # Let callbacks scheduled from worker threads land before draining
+        await asyncio.sleep(0)
+        for event in channel.drain():
+            yield event
+
+        yield {"type": "result", "result": task.result()}
+    finally:
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,87 @@
+"""
+Prompt Prefix Cache - Reuses llama.cpp KV state for static prompt prefixes
+Each registered prefix is evaluated once and its state saved; before a
+completion whose prompt starts with that prefix the state is restored, so
+llama.cpp only evaluates the query-specific suffix.
+"""
+from typing import Dict, Any, Optional
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PromptPrefixCache:
+    """
+    Saved KV states keyed by prefix name. All methods are blocking and must
+    run on the executor that owns the Llama instance, right before the
+    completion they prepare.
+    """
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.prefixes: Dict[str, str] = {}
+        self.states: Dict[str, tuple] = {}  # name -> (prefix tokens, LlamaState, eval seconds)
+        self.hits = 0
+        self.misses = 0
+        self.resident = 0
+        self.saved_seconds = 0.0
+
+    def register(self, name: str, prefix: str):
+        """Declare a static prompt prefix; its state is built on first use"""
+        self.prefixes[name] = prefix
+        self.states.pop(name, None)
+
+    def _tokenize(self, text: str):
+        # Same tokenization create_completion applies to a prompt string
+        return self.llm.tokenize(text.encode("utf-8"), add_bos=True, special=True)
+
+    def _evaluated_prefix(self, tokens) -> int:
+        """Number of leading tokens already in the model's KV cache"""
+        return self.llm.longest_token_prefix(self.llm.eval_tokens, tokens)
+
+    def prepare(self, prompt: str) -> Optional[str]:
+        """
+        Load the KV state for the prefix prompt starts with, if any
+
+        Returns:
+            Name of the matched prefix, or None
+        """
+        name = next((n for n, p in self.prefixes.items() if prompt.startswith(p)), None)
+        if name is None:
+            return None
+
+        entry = self.states.get(name)
+        if entry is None:
+            self.misses += 1
+            started = time.perf_counter()
+            tokens = self._tokenize(self.prefixes[name])
+            self.llm.reset()
+            self.llm.eval(tokens)
+            elapsed = time.perf_counter() - started
+            self.states[name] = (tokens, self.llm.save_state(), elapsed)
+            logger.info(f"Prompt prefix '{name}' cached: {len(tokens)} tokens in {elapsed:.2f}s")
+            return name
+
+        tokens, state, eval_seconds = entry
+        self.hits += 1
+        self.saved_seconds += eval_seconds
+        if self._evaluated_prefix(tokens) >= len(tokens):
+            # Still in the KV cache from the previous completion
+            self.resident += 1
+        else:
+            self.llm.load_state(state)
+        return name
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters"""
+        total = self.hits + self.misses
+        return {
+            "prefixes": len(self.prefixes),
+            "cached": len(self.states),
+            "hits": self.hits,
+            "misses": self.misses,
+            "already_resident": self.resident,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "eval_seconds_saved": round(self.saved_seconds, 2)
+        }
@@ -0,0 +1,202 @@
+"""
+Hierarchical Summarizer - Map-reduce summaries of long transcripts
+Transcript chunks are summarized, chunk summaries reduced into chapter
+summaries, and chapters into one video summary. Every level is persisted
+per video so later summaries and reports reuse it without the LLM.
+"""
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+from .context_index import estimate_tokens
+from .progress import report_progress
+
+logger = logging.getLogger(__name__)
+
+CHUNK_PROMPT_PREFIX = """Summarize this part of a video transcript in 2-3 sentences. Keep names, numbers and decisions.
+
+Transcript:
+"""
+
+CHAPTER_PROMPT_PREFIX = """Combine these consecutive summaries of a video into one short chapter summary (2-3 sentences).
+
+Summaries:
+"""
+
+VIDEO_PROMPT_PREFIX = """Write a concise summary (3-4 sentences) of a whole video from its chapter summaries.
+
+Chapters:
+"""
+
+
+class HierarchicalSummarizer:
+    """
+    complete(prompt, max_tokens) runs one LLM completion and returns its
+    text; it is called with at most max_concurrency prompts outstanding so
+    the map step stays within the LLM executor's queue bound.
+    """
+
+    def __init__(self, complete: Callable[[str, int], Awaitable[str]],
+                 video_hash: Callable[[str], str],
+                 summary_dir: str = "uploads/summaries",
+                 chunk_tokens: int = 700, chapter_size: int = 5,
+                 max_concurrency: int = 4, model_version: str = ""):
+        self.complete = complete
+        self.video_hash = video_hash
+        self.summary_dir = Path(summary_dir)
+        self.chunk_tokens = chunk_tokens
+        self.chapter_size = chapter_size
+        self.max_concurrency = max_concurrency
+        self.model_version = model_version
+        self.builds = 0
+        self.reused = 0
+
+    def chunk_transcript(self, transcription: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Split transcript segments into chunks of about chunk_tokens"""
+        segments = transcription.get("segments") or []
+        if not segments and transcription.get("transcription"):
+            segments = [{"start": 0.0, "end": 0.0, "text": transcription["transcription"]}]
+
+        chunks, current, used = [], [], 0
+        for segment in segments:
+            cost = estimate_tokens(segment["text"])
+            if current and used + cost > self.chunk_tokens:
+                chunks.append(current)
+                current, used = [], 0
+            current.append(segment)
+            used += cost
+        if current:
+            chunks.append(current)
+
+        return [
+            {
+                "start": group[0]["start"],
+                "end": group[-1]["end"],
+                "text": " ".join(s["text"].strip() for s in group)
+            }
+            for group in chunks
+        ]
+
+    def _fingerprint(self, chunks: List[Dict[str, Any]]) -> str:
+        payload = json.dumps({
+            "model": self.model_version,
+            "chunk_tokens": self.chunk_tokens,
+            "chapter_size": self.chapter_size,
+            "texts": [c["text"] for c in chunks]
+        })
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, digest: str) -> Path:
+        return self.summary_dir / f"{digest}.json"
+
+    def _load(self, digest: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        path = self._path(digest)
+        if not path.exists():
+            return None
+        with open(path, 'r') as f:
+            tree = json.load(f)
+        return tree if tree.get("fingerprint") == fingerprint else None
+
+    def _save(self, digest: str, tree: Dict[str, Any]):
+        self.summary_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path(digest).with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(tree, f, indent=2)
+        os.replace(tmp_path, self._path(digest))
+
+    async def _summarize_all(self, prefix: str, texts: List[str], max_tokens: int,
+                             stage: str) -> List[str]:
+        """Summarize texts as one queued batch, keeping max_concurrency in flight"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        done = 0
+
+        async def summarize(text: str) -> str:
+            nonlocal done
+            async with semaphore:
+                summary = (await self.complete(f"{prefix}{text}\n\nSummary:", max_tokens)).strip()
+            done += 1
+            report_progress("summary", done, len(texts), "chunks", f"Summarized {done}/{len(texts)} {stage}")
+            return summary.split("\n\n")[0]
+
+        return list(await asyncio.gather(*(summarize(text) for text in texts)))
+
+    async def load(self, video_path: str, transcription: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the stored tree for this transcript without building one"""
+        chunks = self.chunk_transcript(transcription)
+        if not chunks:
+            return None
+        digest = await asyncio.to_thread(self.video_hash, video_path)
+        return await asyncio.to_thread(self._load, digest, self._fingerprint(chunks))
+
+    async def summarize(self, video_path: str, transcription: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return the summary tree for a video, building it on first request
+
+        Returns:
+            {"summary": str, "chapters": [{"start", "end", "summary"}],
+             "chunks": [{"start", "end", "summary"}], "fingerprint": str}
+        """
+        chunks = self.chunk_transcript(transcription)
+        if not chunks:
+            return {"summary": "", "chapters": [], "chunks": []}
+
+        digest = await asyncio.to_thread(self.video_hash, video_path)
+        fingerprint = self._fingerprint(chunks)
+        tree = await asyncio.to_thread(self._load, digest, fingerprint)
+        if tree is not None:
+            self.reused += 1
+            logger.info(f"Reusing stored summary tree for video {digest[:12]}")
+            return tree
+
+        logger.info(f"Summarizing {len(chunks)} transcript chunks")
+        # Map: one summary per chunk
+        chunk_summaries = await self._summarize_all(
+            CHUNK_PROMPT_PREFIX, [c["text"] for c in chunks], 120, "chunks"
+        )
+        chunk_nodes = [
+            {"start": c["start"], "end": c["end"], "summary": summary}
+            for c, summary in zip(chunks, chunk_summaries)
+        ]
+
+        # Reduce: chunk summaries into chapters, chapters into the video summary
+        groups = [chunk_nodes[i:i + self.chapter_size]
+                  for i in range(0, len(chunk_nodes), self.chapter_size)]
+        if len(groups) > 1:
+            chapter_summaries = await self._summarize_all(
+                CHAPTER_PROMPT_PREFIX,
+                ["\n".join(f"- {n['summary']}" for n in group) for group in groups],
+                150, "chapters"
+            )
+        else:
+            chapter_summaries = ["\n".join(n["summary"] for n in groups[0])]
+        chapters = [
+            {"start": group[0]["start"], "end": group[-1]["end"], "summary": summary}
+            for group, summary in zip(groups, chapter_summaries)
+        ]
+
+        if len(chunk_nodes) == 1:
+            video_summary = chunk_nodes[0]["summary"]
+        else:
+            video_summary = (await self._summarize_all(
+                VIDEO_PROMPT_PREFIX,
+                ["\n".join(f"- [{c['start']:.0f}s] {c['summary']}" for c in chapters)],
+                200, "video"
+            ))[0]
+
+        tree = {
+            "fingerprint": fingerprint,
+            "summary": video_summary,
+            "chapters": chapters,
+            "chunks": chunk_nodes
+        }
+        await asyncio.to_thread(self._save, digest, tree)
+        self.builds += 1
+        return tree
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return build/reuse counters"""
+        return {"builds": self.builds, "reused": self.reused}
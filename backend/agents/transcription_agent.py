@@ -1,24 +1,70 @@
 """
 Transcription Agent - Handles speech-to-text extraction from videos
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, AsyncIterator
+import asyncio
 import logging
-from pathlib import Path
-import tempfile
 import os
+from collections import deque
+from pathlib import Path
+
+import numpy as np
 
 from .base_agent import BaseAgent
+from .executor import InferenceExecutor
+from .audio import load_audio, split_on_silence, SAMPLE_RATE
+from .progress import report_progress
 
 logger = logging.getLogger(__name__)
 
+# Whisper model loaded once per long-form worker process
+_worker_model = None
+
+# Approximate memory one loaded Whisper model needs (GB, per Whisper's model card);
+# every long-form worker holds its own copy
+WHISPER_MODEL_MEMORY_GB = {
+    "tiny": 1, "base": 1, "small": 2, "medium": 5, "large": 10, "turbo": 6
+}
+
+
+def _available_memory_bytes() -> Optional[int]:
+    """Available physical memory, or None where sysconf can't report it"""
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def _init_long_form_worker(model_size: str):
+    """Process pool initializer: load Whisper in the worker"""
+    global _worker_model
+    import whisper
+    _worker_model = whisper.load_model(model_size)
+
+
+def _transcribe_chunk(audio: np.ndarray, options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Transcribe one audio chunk in a worker process (times relative to the chunk)"""
+    result = _worker_model.transcribe(audio, **options)
+    return [
+        {"start": segment["start"], "end": segment["end"], "text": segment["text"].strip()}
+        for segment in result.get("segments", [])
+    ]
+
 
 class TranscriptionAgent(BaseAgent):
     """Agent responsible for transcribing audio from video files"""
     
-    def __init__(self, model_size: str = "medium"):
+    def __init__(self, model_size: str = "medium", long_form_threshold: float = 600.0,
+                 long_form_workers: int = 2, chunk_seconds: float = 300.0):
         super().__init__("Transcription Agent", model_size)
         self.whisper_model = None
         self.model_size = model_size
+        # Audio longer than this is split on silence and transcribed in parallel;
+        # each worker process loads its own Whisper model (see WHISPER_MODEL_MEMORY_GB)
+        self.long_form_threshold = long_form_threshold
+        self.long_form_workers = long_form_workers
+        self.chunk_seconds = chunk_seconds
+        self.long_form_executor = None
         
     async def initialize(self):
         """Initialize Whisper model for transcription"""
@@ -38,7 +84,8 @@ class TranscriptionAgent(BaseAgent):
         Args:
             input_data: {
                 "video_path": str,
-                "language": Optional[str] = None (auto-detect if not specified)
+                "language": Optional[str] = None (auto-detect if not specified),
+                "long_form": Optional[bool] = None (auto when longer than long_form_threshold)
             }
             
         Returns:
@@ -55,16 +102,26 @@ class TranscriptionAgent(BaseAgent):
         logger.info(f"Transcribing video: {video_path}")
         
         try:
-            audio_path = await self.extract_audio(video_path)
+            audio = await self.extract_audio(video_path)
+            duration = round(len(audio) / SAMPLE_RATE, 2)
+            report_progress("transcription", 0, duration, "seconds",
+                            f"Extracted {duration:.0f}s of audio")
             
             language = input_data.get("language", None)
+            long_form = input_data.get("long_form")
+            if long_form is None:
+                long_form = len(audio) / SAMPLE_RATE > self.long_form_threshold
+            if long_form:
+                return await self._transcribe_long_form(audio, language)
+            
             transcribe_options = {}
             if language:
                 transcribe_options["language"] = language
             
-            result = self.whisper_model.transcribe(audio_path, **transcribe_options)
-            
-            os.unlink(audio_path)
+            result = await self.run_blocking(
+                self.whisper_model.transcribe, audio, **transcribe_options
+            )
+            del audio
             
             segments = []
             for segment in result.get("segments", []):
@@ -73,6 +130,8 @@ class TranscriptionAgent(BaseAgent):
                     "end": segment["end"],
                     "text": segment["text"].strip()
                 })
+            report_progress("transcription", duration, duration, "seconds",
+                            "Transcription complete", partial_text=result["text"].strip())
             
             return {
                 "transcription": result["text"].strip(),
@@ -84,21 +143,136 @@ class TranscriptionAgent(BaseAgent):
             logger.error(f"Transcription failed: {e}")
             return {"error": str(e)}
     
-    async def extract_audio(self, video_path: str) -> str:
-        """Extract audio from video file to temporary WAV file"""
+    async def extract_audio(self, video_path: str) -> np.ndarray:
+        """Decode the audio track to 16 kHz mono float32 PCM streamed from ffmpeg"""
         try:
-            from moviepy.editor import VideoFileClip
-            
-            temp_audio = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-            temp_audio_path = temp_audio.name
-            temp_audio.close()
-            
-            video = VideoFileClip(video_path)
-            video.audio.write_audiofile(temp_audio_path, logger=None)
-            video.close()
-            
-            return temp_audio_path
-            
+            return await self.run_blocking(load_audio, video_path, SAMPLE_RATE)
         except Exception as e:
             logger.error(f"Audio extraction failed: {e}")
             raise
+    
+    async def _transcribe_long_form(self, audio: np.ndarray, language: Optional[str]) -> Dict[str, Any]:
+        """Collect all incremental long-form segments into one result"""
+        segments = []
+        detected = language
+        async for update in self.iter_long_form(audio, language):
+            segments.extend(update["segments"])
+            detected = update["language"]
+            report_progress(
+                "transcription", update["transcribed_seconds"], update["duration"], "seconds",
+                f"Transcribed {update['transcribed_seconds']:.0f}s of {update['duration']:.0f}s",
+                partial_text=" ".join(segment["text"] for segment in update["segments"]).strip()
+            )
+        
+        return {
+            "transcription": " ".join(segment["text"] for segment in segments).strip(),
+            "segments": segments,
+            "language": detected or "unknown"
+        }
+    
+    def _fit_long_form_workers(self) -> int:
+        """Cap long-form workers so their model copies fit in available memory"""
+        per_worker = WHISPER_MODEL_MEMORY_GB.get(self.model_size.split(".")[0], 5) * 1024 ** 3
+        available = _available_memory_bytes()
+        if available is None:
+            return self.long_form_workers
+        workers = max(1, min(self.long_form_workers, available // per_worker))
+        if workers < self.long_form_workers:
+            logger.warning(
+                f"Long-form transcription limited to {workers} worker(s): "
+                f"{available / 1024 ** 3:.1f}GB available, ~{per_worker // 1024 ** 3}GB per worker"
+            )
+        return workers
+    
+    async def iter_long_form(self, audio: np.ndarray,
+                             language: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Transcribe long audio as silence-aligned chunks in a process pool
+        
+        Chunks run concurrently; updates are yielded in timeline order as soon
+        as each chunk and all chunks before it are done:
+            {"segments": List[Dict] (absolute timestamps), "language": str,
+             "transcribed_seconds": float, "duration": float}
+        """
+        duration = len(audio) / SAMPLE_RATE
+        plan = await self.run_blocking(
+            split_on_silence, audio, SAMPLE_RATE, self.chunk_seconds
+        )
+        logger.info(f"Long-form transcription: {duration:.0f}s in {len(plan)} chunks")
+        
+        if not language:
+            # Detect once so every chunk is decoded in the same language
+            language = await self.run_blocking(self._detect_language, audio)
+        options = {"language": language}
+        
+        if self.long_form_executor is None:
+            self.long_form_workers = self._fit_long_form_workers()
+            self.long_form_executor = InferenceExecutor(
+                "Transcription Long-Form", max_workers=self.long_form_workers,
+                max_queue=64, use_processes=True,
+                initializer=_init_long_form_worker, initargs=(self.model_size,)
+            )
+        
+        # Keep only a few chunks in flight so at most those are copied out
+        # of the (possibly memory-mapped) audio buffer at once
+        chunks = iter(plan)
+        pending = deque()
+        
+        def submit_next():
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append((chunk, asyncio.ensure_future(self.long_form_executor.run(
+                    _transcribe_chunk,
+                    np.array(audio[chunk["window_start"]:chunk["window_end"]]),
+                    options
+                ))))
+        
+        for _ in range(self.long_form_workers + 1):
+            submit_next()
+        
+        try:
+            while pending:
+                chunk, task = pending.popleft()
+                chunk_segments = await task
+                submit_next()
+                
+                offset = chunk["window_start"] / SAMPLE_RATE
+                owned_start = chunk["start"] / SAMPLE_RATE
+                owned_end = chunk["end"] / SAMPLE_RATE
+                
+                segments = []
+                for segment in chunk_segments:
+                    start = segment["start"] + offset
+                    end = segment["end"] + offset
+                    # Overlap regions are transcribed twice; keep each segment
+                    # only in the chunk that owns its midpoint
+                    if owned_start <= (start + end) / 2 < owned_end:
+                        segments.append({"start": round(start, 2), "end": round(end, 2),
+                                         "text": segment["text"]})
+                
+                yield {
+                    "segments": segments,
+                    "language": language,
+                    "transcribed_seconds": round(owned_end, 2),
+                    "duration": round(duration, 2)
+                }
+        finally:
+            for _, task in pending:
+                task.cancel()
+    
+    def _detect_language(self, audio: np.ndarray) -> str:
+        """Detect the spoken language from the first 30 seconds"""
+        import whisper
+        
+        clip = whisper.pad_or_trim(np.array(audio[:whisper.audio.N_SAMPLES]))
+        mel = whisper.log_mel_spectrogram(
+            clip, n_mels=self.whisper_model.dims.n_mels
+        ).to(self.whisper_model.device)
+        _, probs = self.whisper_model.detect_language(mel)
+        return max(probs, key=probs.get)
+    
+    async def cleanup(self):
+        """Stop the long-form worker processes as well"""
+        if self.long_form_executor:
+            self.long_form_executor.shutdown()
+        await super().cleanup()
@@ -1,16 +1,17 @@
 """
 Vision Agent - Handles object detection, image captioning, and scene analysis
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterator, AsyncIterator, Union
 import logging
 from pathlib import Path
-import tempfile
-import os
 import cv2
 import numpy as np
 from PIL import Image
 
 from .base_agent import BaseAgent
+from .batching import MicroBatcher
+from .frame_sampler import FrameSampler
+from .progress import report_progress
 
 logger = logging.getLogger(__name__)
 
@@ -18,12 +19,26 @@ logger = logging.getLogger(__name__)
 class VisionAgent(BaseAgent):
     """Agent responsible for visual analysis of video frames"""
     
-    def __init__(self, blip_model_name: str = "Salesforce/blip-image-captioning-base"):
+    def __init__(self, blip_model_name: str = "Salesforce/blip-image-captioning-base",
+                 batch_size: int = 8, batch_wait_ms: int = 10):
         super().__init__("Vision Agent", blip_model_name)
         self.caption_processor = None
         self.caption_model = None
         self.detector_model = None
+        self.detector_weights = "models/yolov8n.pt"
         self.device = None
+        self.batch_size = batch_size
+        self.frame_sampler = FrameSampler()
+        
+        # Frames from concurrent requests are grouped into shared forward passes
+        self.detector_batcher = MicroBatcher(
+            "yolo", self._detect_batch, self.run_blocking,
+            max_batch_size=batch_size, max_wait=batch_wait_ms / 1000
+        )
+        self.caption_batcher = MicroBatcher(
+            "blip", self._caption_batch, self.run_blocking,
+            max_batch_size=batch_size, max_wait=batch_wait_ms / 1000
+        )
         
     async def initialize(self):
         """Initialize vision models for captioning and object detection"""
@@ -41,7 +56,7 @@ class VisionAgent(BaseAgent):
             self.caption_model.to(self.device)
             
             logger.info("Loading YOLOv8 nano model for object detection")
-            self.detector_model = YOLO("models/yolov8n.pt")
+            self.detector_model = YOLO(self.detector_weights)
             
             logger.info("✓ Vision models loaded")
             
@@ -49,6 +64,11 @@ class VisionAgent(BaseAgent):
             logger.error(f"Failed to load vision models: {e}")
             raise
         
+    @property
+    def model_version(self) -> str:
+        """Captioning and detection models both shape the results"""
+        return f"{self.model_path}+{Path(self.detector_weights).name}"
+        
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Analyze video frames with object detection and scene description
@@ -59,12 +79,15 @@ class VisionAgent(BaseAgent):
                 "task": str (optional) - "detect_objects", "describe_scene", "analyze" (default)
                 "num_frames": int (optional) - number of frames to sample (default: 10)
                 "interval": int (optional) - sample every N seconds (overrides num_frames)
+                "sampling": str (optional) - "uniform" (default) or "adaptive" to sample
+                            only at scene changes, with num_frames as the budget
             }
             
         Returns:
             {
                 "frames_analyzed": int,
-                "results": List[Dict] with frame_number, timestamp, objects, caption
+                "results": List[Dict] with frame_number, timestamp, objects, caption,
+                "sampling": Dict with the decode strategy chosen and decode time
             }
         """
         video_path = input_data.get("video_path")
@@ -74,49 +97,108 @@ class VisionAgent(BaseAgent):
         task = input_data.get("task", "analyze")
         num_frames = input_data.get("num_frames", 10)
         interval = input_data.get("interval", None)
+        mode = input_data.get("sampling", "uniform")
         
         logger.info(f"Vision analysis on: {video_path} (task: {task})")
         
         try:
-            frames_data = await self.extract_frames(video_path, num_frames, interval)
             results = []
+            sampling = {}
+            frames = self.extract_frames(video_path, num_frames, interval, sampling, mode)
+            
+            try:
+                batch = []
+                async for frame_info in frames:
+                    batch.append(frame_info)
+                    if len(batch) >= self.batch_size:
+                        results.extend(await self._analyze_batch(batch, task))
+                        self._report_batch(results, len(batch), sampling)
+                        batch = []
+                if batch:
+                    results.extend(await self._analyze_batch(batch, task))
+                    self._report_batch(results, len(batch), sampling)
+            finally:
+                await frames.aclose()
             
-            for frame_info in frames_data:
-                frame_path = frame_info["path"]
-                frame_num = frame_info["frame_number"]
-                timestamp = frame_info["timestamp"]
-                
-                result = {
-                    "frame_number": frame_num,
-                    "timestamp": timestamp
-                }
-                
-                if task in ["detect_objects", "analyze"]:
-                    objects = await self.detect_objects(frame_path)
-                    result["objects"] = objects
-                
-                if task in ["describe_scene", "analyze"]:
-                    caption = await self.caption_image(frame_path)
-                    result["caption"] = caption
-                
-                results.append(result)
-                os.unlink(frame_path)
+            logger.info(f"Decoded {sampling.get('frames_decoded', 0)} frames with "
+                        f"{sampling.get('strategy')} sampling in {sampling.get('decode_seconds', 0)}s")
             
             return {
                 "frames_analyzed": len(results),
-                "results": results
+                "results": results,
+                "sampling": sampling
             }
             
         except Exception as e:
             logger.error(f"Vision analysis failed: {e}")
             return {"error": str(e)}
     
+    def _report_batch(self, results: List[Dict], batch_size: int, sampling: Dict[str, Any]):
+        """Publish frames done out of total, with captions from the latest batch"""
+        captions = [
+            f"[{r['timestamp']}s] {r['caption']}" for r in results[-batch_size:] if r.get("caption")
+        ]
+        report_progress(
+            "vision", len(results), sampling.get("frames_requested", len(results)), "frames",
+            f"Analyzed {len(results)} frames",
+            partial_text="\n".join(captions)
+        )
+    
+    async def _analyze_batch(self, batch: List[Dict], task: str) -> List[Dict]:
+        """Run detection and captioning over a group of decoded frames"""
+        images = [frame_info["frame"] for frame_info in batch]
+        results = [
+            {"frame_number": frame_info["frame_number"], "timestamp": frame_info["timestamp"]}
+            for frame_info in batch
+        ]
+        
+        if task in ["detect_objects", "analyze"]:
+            for result, objects in zip(results, await self.detector_batcher.submit_many(images)):
+                result["objects"] = objects
+        
+        if task in ["describe_scene", "analyze"]:
+            for result, caption in zip(results, await self.caption_batcher.submit_many(images)):
+                result["caption"] = caption
+        
+        return results
+    
     async def extract_frames(self, video_path: str, num_frames: int = 10, 
-                           interval: Optional[int] = None) -> List[Dict]:
-        """Extract frames from video at regular intervals"""
+                           interval: Optional[int] = None,
+                           stats: Optional[Dict[str, Any]] = None,
+                           mode: str = "uniform") -> AsyncIterator[Dict]:
+        """
+        Yield sampled frames one at a time as in-memory BGR arrays
+        
+        Each item: {"sequence": int, "frame_number": int, "timestamp": float,
+                    "frame": np.ndarray}
+        """
+        frames = self.iter_frames(video_path, num_frames, interval, stats, mode)
+        try:
+            while True:
+                # Decode the next frame on the executor, not the event loop
+                frame_info = await self.run_blocking(next, frames, None)
+                if frame_info is None:
+                    break
+                yield frame_info
+        finally:
+            # Release the decoder after any decode still running on the executor
+            self.executor.submit_cleanup(frames.close)
+    
+    def iter_frames(self, video_path: str, num_frames: int = 10,
+                    interval: Optional[int] = None,
+                    stats: Optional[Dict[str, Any]] = None,
+                    mode: str = "uniform") -> Iterator[Dict]:
+        """Blocking generator decoding frames at regular intervals or scene changes"""
+        if mode == "adaptive":
+            stats = stats if stats is not None else {}
+            frame_indices = self.frame_sampler.select_scene_changes(video_path, num_frames, stats)
+            # Scene-change frames must not be moved to a keyframe of the previous scene
+            return self.frame_sampler.iter_frames(video_path, frame_indices, stats, exact=True)
+        
         cap = cv2.VideoCapture(video_path)
         fps = cap.get(cv2.CAP_PROP_FPS)
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
         duration = total_frames / fps if fps > 0 else 0
         
         if interval:
@@ -124,50 +206,55 @@ class VisionAgent(BaseAgent):
         else:
             frame_indices = np.linspace(0, total_frames - 1, num_frames, dtype=int)
         
-        frames_data = []
-        for idx in frame_indices:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-            ret, frame = cap.read()
-            
-            if ret:
-                temp_file = tempfile.NamedTemporaryFile(suffix=".jpg", delete=False)
-                cv2.imwrite(temp_file.name, frame)
-                
-                timestamp = idx / fps if fps > 0 else 0
-                frames_data.append({
-                    "path": temp_file.name,
-                    "frame_number": int(idx),
-                    "timestamp": round(timestamp, 2)
-                })
-        
-        cap.release()
-        return frames_data
+        return self.frame_sampler.iter_frames(video_path, list(frame_indices), stats)
+    
+    async def detect_objects(self, frame: Union[np.ndarray, str]) -> List[Dict]:
+        """Detect objects in a frame (BGR array or image path) using YOLOv8"""
+        return await self.detector_batcher.submit(frame)
     
-    async def detect_objects(self, frame_path: str) -> List[Dict]:
-        """Detect objects in a frame using YOLOv8"""
-        results = self.detector_model(frame_path, verbose=False)
+    def _detect_batch(self, frames: List[Union[np.ndarray, str]]) -> List[List[Dict]]:
+        """Run YOLOv8 over several frames in one call"""
+        results = self.detector_model(frames, verbose=False)
         
-        objects = []
+        batch_objects = []
         for result in results:
-            boxes = result.boxes
-            for box in boxes:
+            objects = []
+            for box in result.boxes:
                 objects.append({
                     "class": result.names[int(box.cls)],
                     "confidence": float(box.conf),
                     "bbox": box.xyxy[0].tolist()
                 })
+            batch_objects.append(objects)
         
-        return objects
+        return batch_objects
     
-    async def caption_image(self, frame_path: str) -> str:
-        """Generate descriptive caption for an image using BLIP-2"""
+    async def caption_image(self, frame: Union[np.ndarray, str]) -> str:
+        """Generate descriptive caption for a frame (BGR array or image path) using BLIP-2"""
+        return await self.caption_batcher.submit(frame)
+    
+    def _caption_batch(self, frames: List[Union[np.ndarray, str]]) -> List[str]:
+        """Caption several frames with one padded BLIP generate call"""
         import torch
         
-        image = Image.open(frame_path).convert("RGB")
-        inputs = self.caption_processor(image, return_tensors="pt").to(self.device)
+        images = []
+        for frame in frames:
+            if isinstance(frame, str):
+                images.append(Image.open(frame).convert("RGB"))
+            else:
+                # OpenCV decodes to BGR; the BLIP processor expects RGB
+                images.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        inputs = self.caption_processor(images=images, return_tensors="pt").to(self.device)
         
         with torch.no_grad():
             output = self.caption_model.generate(**inputs, max_length=50)
         
-        caption = self.caption_processor.decode(output[0], skip_special_tokens=True)
-        return caption
+        return self.caption_processor.batch_decode(output, skip_special_tokens=True)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Return batching and executor counters"""
+        return {
+            "detector": self.detector_batcher.get_stats(),
+            "captioner": self.caption_batcher.get_stats(),
+            "executor": self.executor.get_stats()
+        }
@@ -10,14 +10,19 @@ Note: This uses FastAPI which is already in requirements.txt
 import asyncio
 import json
 import logging
+import os
+import re
+import uuid
 from typing import Dict, Any
 from pathlib import Path
+from urllib.parse import quote
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse
 import uvicorn
+from multipart.multipart import MultipartParser, parse_options_header
 
 # Import gRPC client (already in requirements)
 import grpc
@@ -63,35 +68,196 @@ async def health_check():
     return {"status": "ok", "service": "http-bridge"}
 
 
+# Chunk size for streaming uploads to the gRPC backend
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _upload_result(response, filename: str) -> Dict[str, Any]:
+    """Convert an UploadVideoResponse into the frontend's JSON shape"""
+    metadata = response.metadata
+    return {
+        'videoId': response.video_id,
+        'filename': filename,
+        'duration': metadata.duration_seconds,
+        'resolution': f"{metadata.width}x{metadata.height}",
+        'fps': metadata.fps,
+        'fileSize': metadata.file_size,
+        'sha256': response.sha256,
+        'deduplicated': response.deduplicated
+    }
+
+
+async def _multipart_file(request: Request, field: str):
+    """
+    Parse a multipart/form-data body as it arrives and yield
+    (filename, content_type, data) for each block of the named file field,
+    so nothing is spooled to disk before it reaches the backend.
+    """
+    content_type, params = parse_options_header(request.headers.get('content-type', ''))
+    if content_type != b'multipart/form-data' or not params.get(b'boundary'):
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data body")
+    
+    headers: Dict[bytes, bytes] = {}
+    header = {'field': b'', 'value': b''}
+    current = {'file': None}  # (filename, content_type) while inside the wanted field
+    blocks = []
+    
+    def on_part_begin():
+        headers.clear()
+    
+    def on_header_field(data, start, end):
+        header['field'] += data[start:end]
+    
+    def on_header_value(data, start, end):
+        header['value'] += data[start:end]
+    
+    def on_header_end():
+        headers[header['field'].lower()] = header['value']
+        header['field'], header['value'] = b'', b''
+    
+    def on_headers_finished():
+        _, options = parse_options_header(headers.get(b'content-disposition', b''))
+        if options.get(b'name') == field.encode() and b'filename' in options:
+            current['file'] = (options[b'filename'].decode('utf-8', errors='replace'),
+                               headers.get(b'content-type', b'').decode('latin-1'))
+        else:
+            current['file'] = None
+    
+    def on_part_data(data, start, end):
+        if current['file'] is not None:
+            blocks.append(data[start:end])
+    
+    parser = MultipartParser(params[b'boundary'], {
+        'on_part_begin': on_part_begin,
+        'on_header_field': on_header_field,
+        'on_header_value': on_header_value,
+        'on_header_end': on_header_end,
+        'on_headers_finished': on_headers_finished,
+        'on_part_data': on_part_data
+    })
+    async for chunk in request.stream():
+        parser.write(chunk)
+        if blocks and current['file'] is not None:
+            filename, mime_type = current['file']
+            yield filename, mime_type, b''.join(blocks)
+            blocks.clear()
+    parser.finalize()
+
+
 @app.post("/upload")
-async def upload_video(video: UploadFile = File(...)):
-    """Handle video upload."""
+async def upload_video(request: Request):
+    """
+    Handle a multipart video upload (file field "video"), streaming the
+    body to the backend in chunks as it arrives rather than spooling it.
+    """
     try:
-        content = await video.read()
+        upload_id = uuid.uuid4().hex
+        parts = _multipart_file(request, 'video')
+        # The first block carries the filename the first UploadChunk needs
+        first = await anext(parts, None)
+        if first is None:
+            raise HTTPException(status_code=400, detail="Missing or empty 'video' file field")
+        filename, mime_type, data = first
+        mime_type = mime_type or 'video/mp4'
         
-        grpc_request = video_analysis_pb2.UploadVideoRequest(
-            filename=video.filename,
-            content=content,
-            mime_type=video.content_type or 'video/mp4'
-        )
+        async def chunks():
+            offset = 0
+            buffer = bytearray(data)
+            async for _, _, block in parts:
+                buffer += block
+                while len(buffer) >= UPLOAD_CHUNK_SIZE:
+                    piece = bytes(buffer[:UPLOAD_CHUNK_SIZE])
+                    del buffer[:UPLOAD_CHUNK_SIZE]
+                    yield video_analysis_pb2.UploadChunk(
+                        upload_id=upload_id, filename=filename, mime_type=mime_type,
+                        offset=offset, data=piece, last=False
+                    )
+                    offset += len(piece)
+            yield video_analysis_pb2.UploadChunk(
+                upload_id=upload_id, filename=filename, mime_type=mime_type,
+                offset=offset, data=bytes(buffer), last=True
+            )
         
-        response = await stub.UploadVideo(grpc_request)
+        response = await stub.UploadVideoStream(chunks())
+        if response.status != 'success':
+            raise HTTPException(status_code=500, detail=response.message)
         
-        # Return metadata from response
-        metadata = response.metadata
-        return {
-            'videoId': response.video_id,
-            'filename': video.filename,
-            'duration': metadata.duration_seconds,
-            'resolution': f"{metadata.width}x{metadata.height}",
-            'fps': metadata.fps,
-            'fileSize': metadata.file_size
-        }
+        return _upload_result(response, filename)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Upload error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.put("/upload/{upload_id}")
+async def upload_video_resumable(upload_id: str, request: Request, filename: str = '',
+                                 offset: int = 0, final: bool = True):
+    """
+    Resumable raw-body upload. The request body is streamed to the backend
+    without buffering; send offset from GET /upload/{upload_id} to resume.
+    """
+    try:
+        mime_type = request.headers.get('content-type', 'video/mp4')
+        
+        async def chunks():
+            position = offset
+            buffer = bytearray()
+            first = True
+            async for data in request.stream():
+                buffer.extend(data)
+                while len(buffer) >= UPLOAD_CHUNK_SIZE:
+                    piece = bytes(buffer[:UPLOAD_CHUNK_SIZE])
+                    del buffer[:UPLOAD_CHUNK_SIZE]
+                    yield video_analysis_pb2.UploadChunk(
+                        upload_id=upload_id,
+                        filename=filename if first else '',
+                        mime_type=mime_type if first else '',
+                        offset=position,
+                        data=piece
+                    )
+                    position += len(piece)
+                    first = False
+            yield video_analysis_pb2.UploadChunk(
+                upload_id=upload_id,
+                filename=filename if first else '',
+                mime_type=mime_type if first else '',
+                offset=position,
+                data=bytes(buffer),
+                last=final
+            )
+        
+        response = await stub.UploadVideoStream(chunks())
+        if response.status == 'partial':
+            return {'uploadId': upload_id, 'offset': response.committed_offset, 'complete': False}
+        if response.status != 'success':
+            raise HTTPException(status_code=409, detail=response.message)
+        
+        return {**_upload_result(response, filename), 'uploadId': upload_id, 'complete': True}
+    except HTTPException:
+        raise
+    except grpc.aio.AioRpcError as e:
+        logger.error(f"Resumable upload error: {e.details()}")
+        status = 409 if e.code() == grpc.StatusCode.FAILED_PRECONDITION else 500
+        raise HTTPException(status_code=status, detail=e.details())
+    except Exception as e:
+        logger.error(f"Resumable upload error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/upload/{upload_id}")
+async def upload_status(upload_id: str):
+    """Return the committed offset of a partial upload."""
+    try:
+        response = await stub.GetUploadStatus(
+            video_analysis_pb2.UploadStatusRequest(upload_id=upload_id)
+        )
+        return {'uploadId': upload_id, 'exists': response.exists, 'offset': response.offset}
+    except Exception as e:
+        logger.error(f"Upload status error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/query")
 async def query_video(request: Dict[str, Any]):
     """Handle single query."""
@@ -115,7 +281,9 @@ async def query_video(request: Dict[str, Any]):
                 {
                     'type': a.type,
                     'content': a.path,
-                    'metadata': dict(a.metadata) if a.metadata else {}
+                    'metadata': dict(a.metadata) if a.metadata else {},
+                    'artifactId': a.artifact_id,
+                    'size': a.size
                 }
                 for a in response.artifacts
             ],
@@ -156,13 +324,34 @@ async def stream_query(request: Dict[str, Any]):
         async def generate():
             try:
                 last_update = None
+                generated = {}
                 async for update in stub.StreamQuery(grpc_request):
-                    logger.info(f"[STREAM] Received update from gRPC: {update.response_text[:100]}...")
                     last_update = update
+                    if update.is_final:
+                        break
+                    progress = update.progress
+                    if update.delta:
+                        # Token deltas: also send the text so far as the update
+                        # so clients that only read 'update' show it growing
+                        generated[progress.stage] = generated.get(progress.stage, '') + update.delta
+                        yield json.dumps({
+                            'delta': update.delta,
+                            'update': generated[progress.stage],
+                            'progress': round(progress.fraction, 3),
+                            'stage': progress.stage,
+                            'sessionId': session_id
+                        }) + '\n'
+                        continue
+                    logger.info(f"[STREAM] Received update from gRPC: {update.response_text[:100]}...")
                     # Send progress update
                     chunk = json.dumps({
                         'update': update.response_text,
-                        'progress': 0,
+                        'progress': round(progress.fraction, 3),
+                        'stage': progress.stage,
+                        'completed': progress.completed,
+                        'total': progress.total,
+                        'unit': progress.unit,
+                        'partialText': progress.partial_text,
                         'sessionId': session_id
                     }) + '\n'
                     yield chunk
@@ -177,7 +366,9 @@ async def stream_query(request: Dict[str, Any]):
                             {
                                 'type': a.type,
                                 'content': a.path,
-                                'metadata': dict(a.metadata) if a.metadata else {}
+                                'metadata': dict(a.metadata) if a.metadata else {},
+                                'artifactId': a.artifact_id,
+                                'size': a.size
                             }
                             for a in last_update.artifacts
                         ],
@@ -202,16 +393,126 @@ async def stream_query(request: Dict[str, Any]):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _job_result(job) -> Dict[str, Any]:
+    """Convert a JobStatus into the frontend's JSON shape"""
+    progress = job.progress
+    return {
+        'jobId': job.job_id,
+        'status': job.status,
+        'sessionId': job.session_id,
+        'videoId': job.video_id,
+        'query': job.query,
+        'progress': round(progress.fraction, 3),
+        'stage': progress.stage,
+        'completed': progress.completed,
+        'total': progress.total,
+        'unit': progress.unit,
+        'message': progress.message,
+        'error': job.error,
+        'createdAt': job.created_at,
+        'updatedAt': job.updated_at
+    }
+
+
+def _job_error(e: grpc.aio.AioRpcError) -> HTTPException:
+    """Map a job RPC error to an HTTP error"""
+    status = {
+        grpc.StatusCode.NOT_FOUND: 404,
+        grpc.StatusCode.FAILED_PRECONDITION: 409
+    }.get(e.code(), 500)
+    return HTTPException(status_code=status, detail=e.details())
+
+
+@app.post("/jobs")
+async def submit_job(request: Dict[str, Any]):
+    """Queue a query as a job and return its id without waiting for the analysis."""
+    if not request.get('videoId') or not request.get('query'):
+        raise HTTPException(status_code=400, detail="Missing videoId or query")
+    try:
+        job = await stub.SubmitJob(video_analysis_pb2.QueryRequest(
+            session_id=request.get('sessionId', ''),
+            video_id=request['videoId'],
+            query=request['query']
+        ))
+        return _job_result(job)
+    except grpc.aio.AioRpcError as e:
+        logger.error(f"[JOBS] Submit error: {e.details()}")
+        raise _job_error(e)
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Poll the status of a job."""
+    try:
+        job = await stub.GetJob(video_analysis_pb2.JobRequest(job_id=job_id))
+        return _job_result(job)
+    except grpc.aio.AioRpcError as e:
+        raise _job_error(e)
+
+
+@app.get("/jobs/{job_id}/events")
+async def watch_job(job_id: str):
+    """Stream job status as NDJSON until the job finishes."""
+    async def generate():
+        try:
+            async for job in stub.WatchJob(video_analysis_pb2.JobRequest(job_id=job_id)):
+                yield json.dumps(_job_result(job)) + '\n'
+        except grpc.aio.AioRpcError as e:
+            yield json.dumps({'jobId': job_id, 'error': e.details()}) + '\n'
+    
+    return StreamingResponse(generate(), media_type='application/x-ndjson')
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Fetch the response of a completed job (409 while it is not completed)."""
+    try:
+        response = await stub.GetJobResult(video_analysis_pb2.JobRequest(job_id=job_id))
+    except grpc.aio.AioRpcError as e:
+        raise _job_error(e)
+    return {
+        'jobId': job_id,
+        'response': response.response_text,
+        'actions': [response.type],
+        'artifacts': [
+            {
+                'type': a.type,
+                'content': a.path,
+                'metadata': dict(a.metadata) if a.metadata else {},
+                'artifactId': a.artifact_id,
+                'size': a.size
+            }
+            for a in response.artifacts
+        ]
+    }
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    try:
+        job = await stub.CancelJob(video_analysis_pb2.JobRequest(job_id=job_id))
+        return _job_result(job)
+    except grpc.aio.AioRpcError as e:
+        raise _job_error(e)
+
+
 @app.get("/history")
-async def get_history(sessionId: str, limit: int = 50):
-    """Handle chat history request."""
+async def get_history(sessionId: str, response: Response, limit: int = 50, before: str = ''):
+    """
+    Handle chat history request: the latest page, or the page before the
+    cursor. The cursor for the preceding page is sent in X-Next-Cursor.
+    """
     try:
         grpc_request = video_analysis_pb2.ChatHistoryRequest(
             session_id=sessionId,
-            limit=limit
+            limit=limit,
+            before=before
         )
         
-        response = await stub.GetChatHistory(grpc_request)
+        history = await stub.GetChatHistory(grpc_request)
+        if history.next_cursor:
+            response.headers['X-Next-Cursor'] = history.next_cursor
         
         messages = [
             {
@@ -222,12 +523,14 @@ async def get_history(sessionId: str, limit: int = 50):
                     {
                         'type': a.type,
                         'content': a.path,
-                        'metadata': dict(a.metadata) if a.metadata else {}
+                        'metadata': dict(a.metadata) if a.metadata else {},
+                        'artifactId': a.artifact_id,
+                        'size': a.size
                     }
                     for a in m.artifacts
                 ]
             }
-            for m in response.messages
+            for m in history.messages
         ]
         
         return messages
@@ -257,6 +560,9 @@ async def generate_report(request: Dict[str, Any]):
         
         return {
             'filePath': response.file_path if hasattr(response, 'file_path') else '',
+            'artifactId': response.artifact_id,
+            'size': response.size,
+            'downloadUrl': f"/artifacts/{response.artifact_id}" if response.artifact_id else '',
             'success': response.status == 'success' if hasattr(response, 'status') else True,
             'message': response.message if hasattr(response, 'message') else 'Report generated'
         }
@@ -265,6 +571,161 @@ async def generate_report(request: Dict[str, Any]):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Artifacts are content-addressed, so the ID doubles as a strong ETag and
+# the bytes at an ID never change
+ARTIFACTS_DIR = Path(os.environ.get('ARTIFACTS_DIR', 'uploads/artifacts'))
+ARTIFACT_READ_SIZE = 256 * 1024
+_ARTIFACT_ID_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+_RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag (weak comparison)"""
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or any(tag.removeprefix('W/') == etag for tag in candidates)
+
+
+def _parse_range(range_header: str, size: int):
+    """
+    (start, end) inclusive for a single 'bytes=' range, None to send the
+    whole file (no header, or a form that is not supported and may be ignored)
+    """
+    match = _RANGE_PATTERN.match(range_header.strip())
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    start, end = match.group(1), match.group(2)
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            raise HTTPException(status_code=416, headers={'Content-Range': f'bytes */{size}'})
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or end < start:
+        raise HTTPException(status_code=416, headers={'Content-Range': f'bytes */{size}'})
+    return start, end
+
+
+async def _read_file_range(path: Path, start: int, end: int):
+    """Yield bytes start..end (inclusive) of a file without loading it whole"""
+    f = await asyncio.to_thread(open, path, 'rb')
+    try:
+        await asyncio.to_thread(f.seek, start)
+        remaining = end - start + 1
+        while remaining > 0:
+            block = await asyncio.to_thread(f.read, min(ARTIFACT_READ_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+    finally:
+        f.close()
+
+
+def _content_disposition(name: str) -> str:
+    """inline disposition with an ASCII filename fallback and the UTF-8 name (RFC 6266)"""
+    fallback = ''.join(c for c in name if 32 <= ord(c) < 127 and c not in '"\\') or 'artifact'
+    return f"inline; filename=\"{fallback}\"; filename*=UTF-8''{quote(name, safe='')}"
+
+
+@app.get("/artifacts/{artifact_id}")
+async def download_artifact(artifact_id: str, request: Request):
+    """
+    Serve a report or JSON artifact straight from the shared artifacts
+    directory (sendfile-backed FileResponse), with content-hash ETags,
+    If-None-Match (304) and single byte ranges (206).
+    Falls back to the DownloadArtifact RPC when the directory isn't shared.
+    """
+    if not _ARTIFACT_ID_PATTERN.match(artifact_id):
+        raise HTTPException(status_code=400, detail="Invalid artifact id")
+    
+    etag = f'"{artifact_id}"'
+    headers = {
+        'ETag': etag,
+        'Cache-Control': 'public, max-age=31536000, immutable',
+        'Accept-Ranges': 'bytes'
+    }
+    # Check the artifact still exists before answering 304 for it
+    path = ARTIFACTS_DIR / artifact_id
+    meta_path = ARTIFACTS_DIR / f"{artifact_id}.json"
+    if not path.exists() or not meta_path.exists():
+        return await _download_artifact_via_grpc(artifact_id, request, headers)
+    if _etag_matches(request.headers.get('if-none-match', ''), etag):
+        return Response(status_code=304, headers=headers)
+    
+    meta = json.loads(await asyncio.to_thread(meta_path.read_text))
+    media_type = meta.get('media_type') or 'application/octet-stream'
+    headers['Content-Disposition'] = _content_disposition(meta.get("name") or artifact_id)
+    
+    size = path.stat().st_size
+    byte_range = _parse_range(request.headers.get('range', ''), size)
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+    
+    start, end = byte_range
+    headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    headers['Content-Length'] = str(end - start + 1)
+    return StreamingResponse(
+        _read_file_range(path, start, end), status_code=206,
+        media_type=media_type, headers=headers
+    )
+
+
+async def _download_artifact_via_grpc(artifact_id: str, request: Request,
+                                      headers: Dict[str, str]):
+    """Stream an artifact from the backend's DownloadArtifact RPC"""
+    offset, length = 0, 0
+    match = _RANGE_PATTERN.match(request.headers.get('range', '').strip())
+    if match and match.group(1):
+        offset = int(match.group(1))
+        if match.group(2):
+            length = max(int(match.group(2)) - offset + 1, 0)
+    else:
+        # Suffix ranges need the size up front; send the whole artifact instead
+        match = None
+    
+    call = stub.DownloadArtifact(video_analysis_pb2.ArtifactRequest(
+        artifact_id=artifact_id, offset=offset, length=length
+    ))
+    try:
+        # The first chunk carries the size and media type needed for the headers
+        first = await call.read()
+    except grpc.aio.AioRpcError as e:
+        status = {
+            grpc.StatusCode.NOT_FOUND: 404,
+            grpc.StatusCode.INVALID_ARGUMENT: 400,
+            grpc.StatusCode.OUT_OF_RANGE: 416
+        }.get(e.code(), 500)
+        raise HTTPException(status_code=status, detail=e.details())
+    if first is grpc.aio.EOF:
+        raise HTTPException(status_code=500, detail="Empty artifact stream")
+    if _etag_matches(request.headers.get('if-none-match', ''), headers['ETag']):
+        call.cancel()
+        return Response(status_code=304, headers=headers)
+    
+    total = first.total_size
+    sent = min(length, total - offset) if length > 0 else total - offset
+    headers['Content-Length'] = str(sent)
+    headers['Content-Disposition'] = _content_disposition(first.name or artifact_id)
+    if match:
+        headers['Content-Range'] = f'bytes {offset}-{offset + sent - 1}/{total}'
+    
+    async def generate():
+        # read() throughout: grpc.aio doesn't allow mixing it with async iteration
+        chunk = first
+        while chunk is not grpc.aio.EOF:
+            yield chunk.data
+            chunk = await call.read()
+    
+    return StreamingResponse(
+        generate(),
+        status_code=206 if match else 200,
+        media_type=first.media_type or 'application/octet-stream',
+        headers=headers
+    )
+
+
 if __name__ == '__main__':
     logging.basicConfig(
         level=logging.INFO,
@@ -0,0 +1,9 @@
+"""
+Background jobs run alongside interactive requests
+"""
+
+from .ingest import IngestPipeline
+
+__all__ = [
+    'IngestPipeline',
+]
@@ -0,0 +1,124 @@
+"""
+Ingest Pipeline - Background pre-analysis of uploaded videos
+Runs transcription and frame analysis at background priority right after
+upload, so results are already in the analysis cache when the first
+question arrives. Interactive queries for the same analysis join the
+running step (promoting it) instead of starting their own.
+"""
+from typing import Dict, Any, Optional
+import asyncio
+import logging
+import time
+
+from agents.executor import background_priority
+
+logger = logging.getLogger(__name__)
+
+# Analyses every query path can reuse; detect_objects also yields captions
+INGEST_STEPS = ["transcribe", "detect_objects"]
+
+
+class IngestPipeline:
+    """
+    Single worker draining a queue of uploaded videos.
+
+    Each step goes through the orchestrator's MCP call for that action, so
+    cache keys match the ones interactive queries look up. Steps run one
+    at a time and the executors hold their jobs back while interactive
+    work is in flight.
+    """
+
+    def __init__(self, orchestrator, registry=None, max_queue: int = 64):
+        self.orchestrator = orchestrator
+        self.registry = registry  # Optional VideoRegistry recording analysis_status
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.jobs: Dict[str, Dict[str, Any]] = {}  # video_id -> status
+        self._worker: Optional[asyncio.Task] = None
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the worker on the running event loop"""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+            logger.info("Ingest pipeline started")
+
+    async def stop(self):
+        """Cancel the worker and any step it is running"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    def enqueue(self, video_id: str, video_path: str) -> bool:
+        """Queue a video for pre-analysis; False if the queue is full"""
+        try:
+            self.queue.put_nowait((video_id, video_path))
+        except asyncio.QueueFull:
+            logger.warning(f"Ingest queue full, skipping pre-analysis of {video_id}")
+            return False
+        self.jobs[video_id] = {"status": "queued", "completed_steps": [], "error": ""}
+        return True
+
+    def status(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Pre-analysis status of a video, or None if it was never queued"""
+        return self.jobs.get(video_id)
+
+    async def _run(self):
+        while True:
+            video_id, video_path = await self.queue.get()
+            try:
+                await self._ingest(video_id, video_path)
+            finally:
+                self.queue.task_done()
+
+    async def _ingest(self, video_id: str, video_path: str):
+        job = self.jobs.setdefault(video_id, {"status": "queued", "completed_steps": [], "error": ""})
+        job["status"] = "running"
+        await self._record_status(video_id, "running")
+        start = time.time()
+
+        with background_priority():
+            for action in INGEST_STEPS:
+                call = self.orchestrator.analysis_call(action, video_path)
+                if call is None:
+                    continue
+                server, tool, arguments = call
+                try:
+                    result = await server.handle_tool_call(tool, arguments)
+                except Exception as e:
+                    result = {"error": str(e)}
+                if result.get("error"):
+                    logger.warning(f"Pre-analysis {action} failed for {video_id}: {result['error']}")
+                    job["status"] = "failed"
+                    job["error"] = result["error"]
+                    self.failed += 1
+                    await self._record_status(video_id, "failed")
+                    return
+                job["completed_steps"].append(action)
+
+        job["status"] = "completed"
+        self.completed += 1
+        await self._record_status(video_id, "completed")
+        logger.info(f"Pre-analysis of {video_id} finished in {time.time() - start:.1f}s")
+
+    async def _record_status(self, video_id: str, status: str):
+        if self.registry is None:
+            return
+        try:
+            await self.registry.set_analysis_status(video_id, status)
+        except Exception as e:
+            logger.warning(f"Could not record analysis status of {video_id}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queue and outcome counters"""
+        return {
+            "queued": self.queue.qsize(),
+            "running": self._worker is not None,
+            "completed": self.completed,
+            "failed": self.failed
+        }
@@ -0,0 +1,141 @@
+"""
+Job Store - Durable table of submitted analysis jobs
+Jobs live in a local SQLite database so clients can poll, watch or fetch
+results after the submitting connection is gone, and queued work survives
+a server restart.
+"""
+from typing import Dict, Any, Optional
+import json
+import logging
+import time
+import uuid
+from pathlib import Path
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+TERMINAL_STATUSES = (COMPLETED, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    video_path TEXT NOT NULL,
+    query TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress TEXT NOT NULL DEFAULT '{}',
+    result TEXT,
+    error TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+
+class JobStore:
+    """
+    One row per job: queued -> running -> completed | failed | cancelled.
+
+    Rows are returned as dicts with progress and result decoded from JSON.
+    """
+
+    def __init__(self, db_path: str = "data/jobs.db"):
+        self.db_path = Path(db_path)
+        self._db: Optional[aiosqlite.Connection] = None
+
+    async def initialize(self):
+        """Open the database and requeue jobs interrupted by a shutdown"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = await aiosqlite.connect(str(self.db_path))
+        self._db.row_factory = aiosqlite.Row
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.executescript(_SCHEMA)
+        cursor = await self._db.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?",
+            (QUEUED, time.time(), RUNNING)
+        )
+        await self._db.commit()
+        if cursor.rowcount:
+            logger.info(f"Requeued {cursor.rowcount} interrupted jobs")
+
+    async def close(self):
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    @staticmethod
+    def _decode(row) -> Dict[str, Any]:
+        job = dict(row)
+        job["progress"] = json.loads(job["progress"] or "{}")
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    async def create(self, session_id: str, video_id: str, video_path: str,
+                     query: str) -> Dict[str, Any]:
+        """Insert a queued job and return it"""
+        now = time.time()
+        job_id = str(uuid.uuid4())
+        await self._db.execute(
+            "INSERT INTO jobs (job_id, session_id, video_id, video_path, query, status, "
+            "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, session_id, video_id, video_path, query, QUEUED, now, now)
+        )
+        await self._db.commit()
+        return await self.get(job_id)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        async with self._db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)) as cursor:
+            row = await cursor.fetchone()
+        return self._decode(row) if row else None
+
+    async def claim_next(self) -> Optional[Dict[str, Any]]:
+        """Mark the oldest queued job running and return it, or None"""
+        async with self._db.execute(
+            "SELECT job_id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        cursor = await self._db.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+            (RUNNING, time.time(), row["job_id"], QUEUED)
+        )
+        await self._db.commit()
+        if not cursor.rowcount:
+            # Cancelled between the select and the update
+            return None
+        return await self.get(row["job_id"])
+
+    async def update_progress(self, job_id: str, progress: Dict[str, Any]):
+        await self._db.execute(
+            "UPDATE jobs SET progress = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+            (json.dumps(progress), time.time(), job_id, RUNNING)
+        )
+        await self._db.commit()
+
+    async def finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None,
+                     error: str = "") -> bool:
+        """Move a job that is not yet finished to a terminal status"""
+        cursor = await self._db.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? "
+            "WHERE job_id = ? AND status NOT IN (?, ?, ?)",
+            (status, json.dumps(result) if result is not None else None, error,
+             time.time(), job_id, *TERMINAL_STATUSES)
+        )
+        await self._db.commit()
+        return cursor.rowcount > 0
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Return job counts per status"""
+        async with self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status") as cursor:
+            rows = await cursor.fetchall()
+        return {row[0]: row[1] for row in rows}
@@ -0,0 +1,151 @@
+"""
+Job Worker - Drives submitted analysis jobs through the orchestrator
+Claims queued jobs from the JobStore, runs them with progress reporting,
+records the outcome, and wakes clients watching a job.
+"""
+from typing import Dict, Any, Optional, Callable, Awaitable, AsyncIterator
+import asyncio
+import logging
+import time
+
+from agents.progress import run_with_progress
+
+from .job_store import JobStore, COMPLETED, FAILED, CANCELLED, TERMINAL_STATUSES
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    """
+    run_job(job) performs one job and returns its JSON-serializable result;
+    progress it reports (see agents.progress) is persisted on the job row,
+    at most every progress_interval seconds.
+    """
+
+    def __init__(self, store: JobStore,
+                 run_job: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                 max_concurrency: int = 1, progress_interval: float = 0.5):
+        self.store = store
+        self.run_job = run_job
+        self.max_concurrency = max_concurrency
+        self.progress_interval = progress_interval
+        self._wake = asyncio.Event()
+        self._changed = asyncio.Condition()
+        self._running: Dict[str, asyncio.Task] = {}  # job_id -> task
+        self._cancel_requested = set()
+        self._loops = []
+
+    def start(self):
+        """Start the worker loops on the running event loop"""
+        if not self._loops:
+            self._loops = [asyncio.create_task(self._loop()) for _ in range(self.max_concurrency)]
+            self._wake.set()  # Pick up jobs left queued by a previous run
+            logger.info(f"Job worker started ({self.max_concurrency} concurrent)")
+
+    async def stop(self):
+        """Stop the loops; running jobs stay 'running' and are requeued on restart"""
+        for task in self._loops:
+            task.cancel()
+        await asyncio.gather(*self._loops, return_exceptions=True)
+        self._loops = []
+
+    async def submit(self, session_id: str, video_id: str, video_path: str,
+                     query: str) -> Dict[str, Any]:
+        """Queue a job and return its row"""
+        job = await self.store.create(session_id, video_id, video_path, query)
+        logger.info(f"Job {job['job_id']} queued: {query}")
+        self._wake.set()
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued or running job; returns the updated row or None if unknown"""
+        task = self._running.get(job_id)
+        if task is not None:
+            self._cancel_requested.add(job_id)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        elif await self.store.finish(job_id, CANCELLED):
+            await self._notify()
+        return await self.store.get(job_id)
+
+    async def watch(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the job row on every change until it reaches a terminal status"""
+        last_update = None
+        while True:
+            async with self._changed:
+                job = await self.store.get(job_id)
+                if job is None:
+                    return
+                if job["updated_at"] == last_update:
+                    try:
+                        # Timeout re-reads the row in case a change was missed
+                        await asyncio.wait_for(self._changed.wait(), timeout=5.0)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+            last_update = job["updated_at"]
+            yield job
+            if job["status"] in TERMINAL_STATUSES:
+                return
+
+    async def _notify(self):
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def _loop(self):
+        while True:
+            job = await self.store.claim_next()
+            if job is None:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            await self._notify()
+            task = asyncio.create_task(self._execute(job))
+            self._running[job["job_id"]] = task
+            try:
+                await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if not task.done():
+                    # The worker itself is stopping
+                    task.cancel()
+                    raise
+            finally:
+                self._running.pop(job["job_id"], None)
+
+    async def _execute(self, job: Dict[str, Any]):
+        job_id = job["job_id"]
+        start = time.time()
+        last_progress = 0.0
+        events = run_with_progress(self.run_job(job))
+        try:
+            async for event in events:
+                if event["type"] == "result":
+                    await self.store.finish(job_id, COMPLETED, result=event["result"])
+                    logger.info(f"Job {job_id} completed in {time.time() - start:.1f}s")
+                    break
+                if time.time() - last_progress >= self.progress_interval:
+                    last_progress = time.time()
+                    await self.store.update_progress(job_id, {
+                        "stage": event["stage"],
+                        "completed": event["completed"],
+                        "total": event["total"],
+                        "unit": event["unit"],
+                        "fraction": event["fraction"],
+                        "message": event["message"]
+                    })
+                    await self._notify()
+        except asyncio.CancelledError:
+            if job_id in self._cancel_requested:
+                self._cancel_requested.discard(job_id)
+                await self.store.finish(job_id, CANCELLED)
+                logger.info(f"Job {job_id} cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+            await self.store.finish(job_id, FAILED, error=str(e))
+        finally:
+            await events.aclose()
+            await self._notify()
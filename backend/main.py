@@ -3,13 +3,12 @@ Main entry point for the AI Video Analysis Backend
 """
 import asyncio
 import logging
+import os
 from concurrent import futures
 from pathlib import Path
 import grpc
 import uuid
-import json
-from datetime import datetime
-from typing import Dict, List
+from typing import List
 import cv2
 
 from rich.console import Console
@@ -19,11 +18,23 @@ from agents.orchestrator_agent import OrchestratorAgent
 from agents.transcription_agent import TranscriptionAgent
 from agents.vision_agent import VisionAgent
 from agents.generation_agent import GenerationAgent
+from agents.executor import request_deadline
+from agents.progress import run_with_progress
 
 from mcp_servers.transcription_mcp import TranscriptionMCPServer
 from mcp_servers.vision_mcp import VisionMCPServer
 from mcp_servers.generation_mcp import GenerationMCPServer
 
+from storage.analysis_cache import AnalysisCache
+from storage.upload_store import UploadStore, UploadError, safe_filename
+from storage.video_registry import VideoRegistry
+from storage.chat_store import ChatStore
+from storage.artifact_store import ArtifactStore, DOWNLOAD_CHUNK_SIZE
+
+from jobs.ingest import IngestPipeline
+from jobs.job_store import JobStore, COMPLETED
+from jobs.worker import JobWorker
+
 from generated import video_analysis_pb2
 from generated import video_analysis_pb2_grpc
 
@@ -40,91 +51,168 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Chat history page size when the request sets no limit, and the cap on limit
+CHAT_HISTORY_PAGE_SIZE = 50
+CHAT_HISTORY_MAX_PAGE_SIZE = 500
+
 
 class VideoAnalysisServicer(video_analysis_pb2_grpc.VideoAnalysisServiceServicer):
     """gRPC service implementation for video analysis"""
     
-    def __init__(self, orchestrator: OrchestratorAgent):
+    def __init__(self, orchestrator: OrchestratorAgent, ingest: IngestPipeline = None,
+                 job_store: JobStore = None, analysis_cache: AnalysisCache = None,
+                 video_registry: VideoRegistry = None, chat_store: ChatStore = None,
+                 artifact_store: ArtifactStore = None):
         self.orchestrator = orchestrator
-        self.sessions: Dict[str, dict] = {}  # session_id -> session data
-        self.videos: Dict[str, str] = {}  # video_id -> file path
-        self.chat_history: Dict[str, List[dict]] = {}  # session_id -> messages
-        self.session_results: Dict[str, Dict] = {}  # session_id -> accumulated results
+        self.analysis_cache = analysis_cache
+        self.ingest = ingest  # Optional background pre-analysis
+        # Submitted analysis jobs, driven by a worker loop
+        self.jobs = JobWorker(job_store or JobStore(), self._run_job)
+        self.videos = video_registry or VideoRegistry()  # video_id -> file, metadata, status
+        # Sessions, their accumulated results and chat history
+        self.chat_store = chat_store or ChatStore()
+        # Responses reference artifacts by ID; bytes are fetched with DownloadArtifact
+        self.artifacts = artifact_store or ArtifactStore()
         
         # Ensure uploads directory exists
         self.uploads_dir = Path("uploads")
         self.uploads_dir.mkdir(exist_ok=True)
+        self.upload_store = UploadStore(str(self.uploads_dir))
+    
+    def _probe_video(self, video_path: Path) -> dict:
+        """Extract video metadata using OpenCV"""
+        cap = cv2.VideoCapture(str(video_path))
         
-        # Path for video registry
-        self.video_registry_path = self.uploads_dir / "video_registry.json"
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        duration = int(frame_count / fps) if fps > 0 else 0
         
-        # Load existing video mappings from disk
-        self._load_video_registry()
-    
-    def _load_video_registry(self):
-        """Load video ID to path mappings from disk"""
-        if self.video_registry_path.exists():
-            try:
-                with open(self.video_registry_path, 'r') as f:
-                    self.videos = json.load(f)
-                logger.info(f"Loaded {len(self.videos)} video mappings from registry")
-            except Exception as e:
-                logger.error(f"Failed to load video registry: {e}")
-                self.videos = {}
+        cap.release()
+        
+        return {
+            "duration_seconds": duration,
+            "width": width,
+            "height": height,
+            "fps": fps
+        }
     
-    def _save_video_registry(self):
-        """Save video ID to path mappings to disk"""
-        try:
-            with open(self.video_registry_path, 'w') as f:
-                json.dump(self.videos, f, indent=2)
-            logger.debug(f"Saved video registry with {len(self.videos)} entries")
-        except Exception as e:
-            logger.error(f"Failed to save video registry: {e}")
+    async def _register_video(self, video_id: str, video_path: Path, filename: str,
+                              file_size: int, sha256: str = "", deduplicated: bool = False):
+        """Read metadata for a stored video, persist its mapping and build the response"""
+        metadata = await asyncio.to_thread(self._probe_video, video_path)
+        
+        # Store video reference (several IDs may alias one blob)
+        await self.videos.register(
+            video_id, str(video_path), filename=filename, sha256=sha256,
+            metadata={"file_size": file_size, **metadata}
+        )
+        
+        if sha256 and self.analysis_cache:
+            # Hash was computed while storing; spare the cache a re-read
+            self.analysis_cache.remember_hash(str(video_path), sha256)
+        
+        message = f"Video uploaded successfully: {filename}"
+        if deduplicated:
+            logger.info(f"Video uploaded: {video_id} ({filename}), same content as blob {sha256[:12]}")
+            message += " (already stored, earlier analyses reused)"
+        else:
+            logger.info(f"Video uploaded: {video_id} ({filename})")
+        
+        if self.ingest:
+            # Steps already analyzed for this content are cache hits
+            self.ingest.enqueue(video_id, str(video_path))
+        
+        return video_analysis_pb2.UploadVideoResponse(
+            video_id=video_id,
+            status="success",
+            message=message,
+            metadata=video_analysis_pb2.VideoMetadata(
+                file_size=file_size,
+                **metadata
+            ),
+            sha256=sha256,
+            committed_offset=file_size,
+            deduplicated=deduplicated
+        )
     
     async def UploadVideo(self, request, context):
         """Handle video upload and extract metadata"""
         try:
             # Generate unique video ID
             video_id = str(uuid.uuid4())
+            filename = safe_filename(request.filename)
             
-            # Save video file
-            video_path = self.uploads_dir / f"{video_id}_{request.filename}"
-            video_path.write_bytes(request.content)
-            
-            # Extract metadata using OpenCV
-            cap = cv2.VideoCapture(str(video_path))
-            
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            duration = int(frame_count / fps) if fps > 0 else 0
-            
-            cap.release()
-            
-            # Store video reference
-            self.videos[video_id] = str(video_path)
-            
-            # Persist to disk
-            self._save_video_registry()
+            # Save video file, once per content hash
+            video_path, sha256, size, deduplicated = await self.upload_store.store_bytes(
+                request.content, filename
+            )
             
-            logger.info(f"Video uploaded: {video_id} ({request.filename})")
+            return await self._register_video(
+                video_id, video_path, filename, size,
+                sha256=sha256, deduplicated=deduplicated
+            )
             
+        except Exception as e:
+            logger.error(f"Video upload failed: {e}")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
             return video_analysis_pb2.UploadVideoResponse(
-                video_id=video_id,
-                status="success",
-                message=f"Video uploaded successfully: {request.filename}",
-                metadata=video_analysis_pb2.VideoMetadata(
-                    duration_seconds=duration,
-                    width=width,
-                    height=height,
-                    fps=fps,
-                    file_size=len(request.content)
+                video_id="",
+                status="error",
+                message=f"Upload failed: {str(e)}"
+            )
+    
+    async def UploadVideoStream(self, request_iterator, context):
+        """Handle a chunked, resumable upload appended straight to disk"""
+        upload = None
+        try:
+            completed = False
+            async for chunk in request_iterator:
+                if upload is None:
+                    upload_id = chunk.upload_id or str(uuid.uuid4())
+                    upload = await self.upload_store.open(
+                        upload_id, chunk.filename, chunk.mime_type, chunk.offset
+                    )
+                await upload.write(chunk.data, chunk.offset)
+                if chunk.last:
+                    completed = True
+                    break
+            
+            if upload is None:
+                raise UploadError("Upload stream contained no chunks")
+            
+            if not completed:
+                # Client stopped early; keep the partial file so it can resume
+                upload.close()
+                return video_analysis_pb2.UploadVideoResponse(
+                    video_id="",
+                    status="partial",
+                    message=f"Upload {upload.upload_id} paused at {upload.size} bytes",
+                    committed_offset=upload.size
                 )
+            
+            video_id = str(uuid.uuid4())
+            filename = upload.meta["filename"]
+            video_path, sha256, size, deduplicated = await self.upload_store.commit(upload)
+            return await self._register_video(
+                video_id, video_path, filename, size,
+                sha256=sha256, deduplicated=deduplicated
             )
             
+        except UploadError as e:
+            logger.warning(f"Rejected chunked upload: {e}")
+            context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
+            context.set_details(str(e))
+            return video_analysis_pb2.UploadVideoResponse(
+                video_id="",
+                status="error",
+                message=f"Upload failed: {str(e)}",
+                committed_offset=upload.size if upload else 0
+            )
         except Exception as e:
-            logger.error(f"Video upload failed: {e}")
+            logger.error(f"Chunked upload failed: {e}")
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(str(e))
             return video_analysis_pb2.UploadVideoResponse(
@@ -132,22 +220,33 @@ class VideoAnalysisServicer(video_analysis_pb2_grpc.VideoAnalysisServiceServicer
                 status="error",
                 message=f"Upload failed: {str(e)}"
             )
+        finally:
+            if upload is not None:
+                upload.close()
+    
+    async def GetUploadStatus(self, request, context):
+        """Report how many bytes of a partial upload are stored, for resuming"""
+        try:
+            status = self.upload_store.status(request.upload_id)
+            return video_analysis_pb2.UploadStatusResponse(
+                upload_id=request.upload_id,
+                exists=status["exists"],
+                offset=status["offset"]
+            )
+        except UploadError as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+            return video_analysis_pb2.UploadStatusResponse(upload_id=request.upload_id)
     
     async def QueryVideo(self, request, context):
         """Process a single query about the video"""
         try:
             session_id = request.session_id or str(uuid.uuid4())
             
-            # Initialize session if needed
-            if session_id not in self.sessions:
-                self.sessions[session_id] = {
-                    "video_id": request.video_id,
-                    "created_at": datetime.now().isoformat()
-                }
-                self.chat_history[session_id] = []
+            session_results = await self.chat_store.open_session(session_id, request.video_id)
             
             # Get video path
-            video_path = self.videos.get(request.video_id)
+            video_path = await self.videos.get_path(request.video_id)
             if not video_path:
                 context.set_code(grpc.StatusCode.NOT_FOUND)
                 context.set_details("Video not found")
@@ -159,45 +258,19 @@ class VideoAnalysisServicer(video_analysis_pb2_grpc.VideoAnalysisServiceServicer
                 )
             
             # Add user message to history
-            self.chat_history[session_id].append({
-                "role": "user",
-                "content": request.query,
-                "timestamp": datetime.now().isoformat()
-            })
+            await self.chat_store.add_message(session_id, "user", request.query)
             
             # Process query through orchestrator
             logger.info(f"Processing query: {request.query}")
-            result = await self.orchestrator.process({
-                "query": request.query,
-                "video_path": video_path
-            })
-            
-            # Store results in session for report generation
-            if session_id not in self.session_results:
-                self.session_results[session_id] = {}
-            
-            # Accumulate results from this query
-            query_results = result.get("results", {})
-            if "transcription" in query_results:
-                self.session_results[session_id]["transcription"] = query_results["transcription"]
-            if "vision" in query_results:
-                self.session_results[session_id]["vision_results"] = query_results["vision"]
-            if "summary" in query_results:
-                self.session_results[session_id]["summary"] = query_results["summary"]
-            
-            # Map response type
-            response_type = self._map_response_type(result.get("actions_taken", []))
-            
-            # Create artifacts from results
-            artifacts = self._create_artifacts(result)
-            
-            # Add assistant message to history
-            self.chat_history[session_id].append({
-                "role": "assistant",
-                "content": result["response"],
-                "timestamp": datetime.now().isoformat(),
-                "artifacts": [{"type": a.type, "path": a.path} for a in artifacts]
-            })
+            # Agent executors stop picking up work once the call's deadline passes
+            with request_deadline(context.time_remaining()):
+                result = await self.orchestrator.process({
+                    "query": request.query,
+                    "video_path": video_path,
+                    "context": session_results
+                })
+            
+            response_type, artifacts = await self._record_result(session_id, session_results, result)
             
             response_id = str(uuid.uuid4())
             
@@ -226,73 +299,58 @@ class VideoAnalysisServicer(video_analysis_pb2_grpc.VideoAnalysisServiceServicer
         try:
             session_id = request.session_id or str(uuid.uuid4())
             
-            # Initialize session if needed
-            if session_id not in self.sessions:
-                self.sessions[session_id] = {
-                    "video_id": request.video_id,
-                    "created_at": datetime.now().isoformat()
-                }
-                self.chat_history[session_id] = []
+            session_results = await self.chat_store.open_session(session_id, request.video_id)
             
             # Get video path
-            video_path = self.videos.get(request.video_id)
+            video_path = await self.videos.get_path(request.video_id)
             if not video_path:
                 yield video_analysis_pb2.QueryResponse(
                     response_id="",
                     query=request.query,
                     response_text="Video not found. Please upload a video first.",
-                    type=video_analysis_pb2.ResponseType.TEXT
+                    type=video_analysis_pb2.ResponseType.TEXT,
+                    is_final=True
                 )
                 return
             
             # Add user message to history
-            self.chat_history[session_id].append({
-                "role": "user",
-                "content": request.query,
-                "timestamp": datetime.now().isoformat()
-            })
-            
-            # Send initial response
-            yield video_analysis_pb2.QueryResponse(
-                response_id=str(uuid.uuid4()),
-                query=request.query,
-                response_text="Processing your query...",
-                type=video_analysis_pb2.ResponseType.TEXT,
-                confidence=0.0
-            )
-            
-            # Process query through orchestrator
-            result = await self.orchestrator.process({
-                "query": request.query,
-                "video_path": video_path
-            })
-            
-            # Store results in session for report generation
-            if session_id not in self.session_results:
-                self.session_results[session_id] = {}
-            
-            # Accumulate results from this query
-            query_results = result.get("results", {})
-            if "transcription" in query_results:
-                self.session_results[session_id]["transcription"] = query_results["transcription"]
-            if "vision" in query_results:
-                self.session_results[session_id]["vision_results"] = query_results["vision"]
-            if "summary" in query_results:
-                self.session_results[session_id]["summary"] = query_results["summary"]
-            
-            logger.info(f"Session {session_id} results updated: {list(self.session_results[session_id].keys())}")
-            
-            # Map response type and create artifacts
-            response_type = self._map_response_type(result.get("actions_taken", []))
-            artifacts = self._create_artifacts(result)
-            
-            # Add to history
-            self.chat_history[session_id].append({
-                "role": "assistant",
-                "content": result["response"],
-                "timestamp": datetime.now().isoformat(),
-                "artifacts": [{"type": a.type, "path": a.path} for a in artifacts]
-            })
+            await self.chat_store.add_message(session_id, "user", request.query)
+            
+            # Process query through orchestrator, forwarding agent progress
+            # Agent executors stop picking up work once the call's deadline passes
+            result = None
+            with request_deadline(context.time_remaining()):
+                events = run_with_progress(self.orchestrator.process({
+                    "query": request.query,
+                    "video_path": video_path,
+                    "context": session_results
+                }))
+                try:
+                    async for event in events:
+                        if event["type"] == "result":
+                            result = event["result"]
+                            continue
+                        yield video_analysis_pb2.QueryResponse(
+                            response_id=str(uuid.uuid4()),
+                            query=request.query,
+                            response_text=event["message"],
+                            type=video_analysis_pb2.ResponseType.TEXT,
+                            confidence=0.0,
+                            progress=video_analysis_pb2.Progress(
+                                stage=event["stage"],
+                                completed=event["completed"],
+                                total=event["total"],
+                                unit=event["unit"],
+                                fraction=event["fraction"],
+                                message=event["message"],
+                                partial_text=event.get("partial_text", "")
+                            ),
+                            delta=event.get("delta", "")
+                        )
+                finally:
+                    await events.aclose()
+            
+            response_type, artifacts = await self._record_result(session_id, session_results, result)
             
             # Send final response
             yield video_analysis_pb2.QueryResponse(
@@ -301,7 +359,8 @@ class VideoAnalysisServicer(video_analysis_pb2_grpc.VideoAnalysisServiceServicer
                 response_text=result["response"],
                 type=response_type,
                 artifacts=artifacts,
-                confidence=1.0
+                confidence=1.0,
+                is_final=True
             )
             
         except Exception as e:
@@ -310,44 +369,178 @@ class VideoAnalysisServicer(video_analysis_pb2_grpc.VideoAnalysisServiceServicer
                 response_id="",
                 query=request.query,
                 response_text=f"Error: {str(e)}",
+                type=video_analysis_pb2.ResponseType.TEXT,
+                is_final=True
+            )
+    
+    async def _record_result(self, session_id: str, session_results: dict, result: dict):
+        """Accumulate a query's results into its session and add the reply to history"""
+        query_results = result.get("results", {})
+        if "transcription" in query_results:
+            session_results["transcription"] = query_results["transcription"]
+        if "vision" in query_results:
+            session_results["vision_results"] = query_results["vision"]
+        if "summary" in query_results:
+            session_results["summary"] = query_results["summary"]
+        await self.chat_store.save_results(session_id, session_results)
+        
+        logger.info(f"Session {session_id} results updated: {list(session_results.keys())}")
+        
+        # Map response type and create artifacts
+        response_type = self._map_response_type(result.get("actions_taken", []))
+        artifact_refs = await asyncio.to_thread(self._create_artifacts, result)
+        
+        # Add to history
+        await self.chat_store.add_message(
+            session_id, "assistant", result["response"], artifacts=artifact_refs
+        )
+        
+        return response_type, [self._artifact_message(ref) for ref in artifact_refs]
+    
+    async def _run_job(self, job: dict) -> dict:
+        """Run a submitted job like QueryVideo; returns what GetJobResult needs"""
+        session_id = job["session_id"]
+        session_results = await self.chat_store.open_session(session_id, job["video_id"])
+        await self.chat_store.add_message(session_id, "user", job["query"])
+        
+        result = await self.orchestrator.process({
+            "query": job["query"],
+            "video_path": job["video_path"],
+            "context": session_results
+        })
+        _, artifacts = await self._record_result(session_id, session_results, result)
+        
+        # Artifacts are stored already; the row keeps only their references
+        return {
+            "response": result["response"],
+            "actions_taken": result.get("actions_taken", []),
+            "artifacts": [
+                {"artifact_id": a.artifact_id, "type": a.type, "path": a.path,
+                 "size": a.size, "media_type": a.media_type}
+                for a in artifacts
+            ]
+        }
+    
+    def _job_status(self, job: dict):
+        """Convert a job row to a JobStatus message"""
+        progress = job["progress"]
+        return video_analysis_pb2.JobStatus(
+            job_id=job["job_id"],
+            status=job["status"],
+            session_id=job["session_id"],
+            video_id=job["video_id"],
+            query=job["query"],
+            progress=video_analysis_pb2.Progress(
+                stage=progress.get("stage", ""),
+                completed=progress.get("completed", 0),
+                total=progress.get("total", 0),
+                unit=progress.get("unit", ""),
+                fraction=progress.get("fraction", 0),
+                message=progress.get("message", "")
+            ),
+            error=job["error"],
+            created_at=int(job["created_at"]),
+            updated_at=int(job["updated_at"])
+        )
+    
+    async def SubmitJob(self, request, context):
+        """Queue a query as a job; progress and result are fetched by job_id"""
+        video_path = await self.videos.get_path(request.video_id)
+        if not video_path:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details("Video not found")
+            return video_analysis_pb2.JobStatus()
+        
+        session_id = request.session_id or str(uuid.uuid4())
+        job = await self.jobs.submit(session_id, request.video_id, video_path, request.query)
+        return self._job_status(job)
+    
+    async def GetJob(self, request, context):
+        """Get the current status of a job"""
+        job = await self.jobs.store.get(request.job_id)
+        if job is None:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details("Job not found")
+            return video_analysis_pb2.JobStatus()
+        return self._job_status(job)
+    
+    async def WatchJob(self, request, context):
+        """Stream job status on every change until the job finishes"""
+        found = False
+        async for job in self.jobs.watch(request.job_id):
+            found = True
+            yield self._job_status(job)
+        if not found:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details("Job not found")
+    
+    async def GetJobResult(self, request, context):
+        """Get the response of a completed job"""
+        job = await self.jobs.store.get(request.job_id)
+        if job is None:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details("Job not found")
+            return video_analysis_pb2.QueryResponse()
+        if job["status"] != COMPLETED:
+            context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
+            context.set_details(f"Job is {job['status']}")
+            return video_analysis_pb2.QueryResponse(
+                query=job["query"],
+                response_text=job["error"] or f"Job is {job['status']}",
                 type=video_analysis_pb2.ResponseType.TEXT
             )
+        
+        result = job["result"]
+        return video_analysis_pb2.QueryResponse(
+            response_id=job["job_id"],
+            query=job["query"],
+            response_text=result["response"],
+            type=self._map_response_type(result["actions_taken"]),
+            artifacts=[self._artifact_message(ref) for ref in result["artifacts"]],
+            confidence=1.0,
+            is_final=True
+        )
+    
+    async def CancelJob(self, request, context):
+        """Cancel a queued or running job"""
+        job = await self.jobs.cancel(request.job_id)
+        if job is None:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details("Job not found")
+            return video_analysis_pb2.JobStatus()
+        return self._job_status(job)
     
     async def GetChatHistory(self, request, context):
-        """Retrieve chat history for a session"""
+        """Retrieve one page of chat history for a session, newest page first"""
         try:
-            session_id = request.session_id
-            
-            if session_id not in self.chat_history:
-                return video_analysis_pb2.ChatHistoryResponse(messages=[])
+            # Pages are read by key from the index; limit 0 means the default page size
+            limit = min(request.limit if request.limit > 0 else CHAT_HISTORY_PAGE_SIZE,
+                        CHAT_HISTORY_MAX_PAGE_SIZE)
+            history, next_cursor = await self.chat_store.get_messages(
+                request.session_id, limit=limit, before=request.before
+            )
             
             messages = []
-            history = self.chat_history[session_id]
-            
-            # Apply limit if specified
-            limit = request.limit if request.limit > 0 else len(history)
-            history_slice = history[-limit:]
-            
-            for msg in history_slice:
+            for msg in history:
                 # Convert artifacts if present
-                artifacts = []
-                if "artifacts" in msg:
-                    for art in msg["artifacts"]:
-                        artifacts.append(video_analysis_pb2.Artifact(
-                            type=art["type"],
-                            path=art["path"]
-                        ))
+                artifacts = [self._artifact_message(art) for art in msg["artifacts"]]
                 
                 messages.append(video_analysis_pb2.ChatMessage(
-                    message_id=str(uuid.uuid4()),
+                    message_id=msg["message_id"],
                     role=msg["role"],
                     content=msg["content"],
-                    timestamp=int(datetime.fromisoformat(msg["timestamp"]).timestamp()),
+                    timestamp=int(msg["timestamp"]),
                     artifacts=artifacts
                 ))
             
-            return video_analysis_pb2.ChatHistoryResponse(messages=messages)
+            return video_analysis_pb2.ChatHistoryResponse(
+                messages=messages, next_cursor=next_cursor
+            )
             
+        except ValueError as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(f"Invalid history cursor: {e}")
+            return video_analysis_pb2.ChatHistoryResponse(messages=[])
         except Exception as e:
             logger.error(f"Failed to get chat history: {e}")
             context.set_code(grpc.StatusCode.INTERNAL)
@@ -360,9 +553,9 @@ class VideoAnalysisServicer(video_analysis_pb2_grpc.VideoAnalysisServiceServicer
             logger.info(f"GenerateReport called for session: {request.session_id}, format: {request.format}")
             
             # Get session context with actual analysis results
-            session_context = self.session_results.get(request.session_id, {})
+            session_context = await self.chat_store.get_results(request.session_id)
             logger.info(f"Session context keys: {list(session_context.keys())}")
-            logger.info(f"Available sessions: {list(self.session_results.keys())}")
+            logger.info(f"Session cache: {self.chat_store.get_stats()}")
             
             # Build content for report generation
             content_dict = {
@@ -371,14 +564,19 @@ class VideoAnalysisServicer(video_analysis_pb2_grpc.VideoAnalysisServiceServicer
                 "data": dict(request.content.data)
             }
             
+            # The session's video locates its stored summary tree
+            video_id = await self.chat_store.get_video_id(request.session_id)
+            video_path = await self.videos.get_path(video_id) if video_id else None
+            
             # Use generation agent directly through orchestrator context
             query = f"Generate a {request.format.upper()} report with title: {content_dict['title']}"
             
-            result = await self.orchestrator.process({
-                "query": query,
-                "video_path": "",  # Report generation doesn't need video
-                "context": session_context  # Pass accumulated context
-            })
+            with request_deadline(context.time_remaining()):
+                result = await self.orchestrator.process({
+                    "query": query,
+                    "video_path": video_path or "",
+                    "context": session_context  # Pass accumulated context
+                })
             
             # Extract file path from results
             file_path = ""
@@ -391,13 +589,17 @@ class VideoAnalysisServicer(video_analysis_pb2_grpc.VideoAnalysisServiceServicer
                 file_path = results["pptx"].get("output_path", "")
             
             if file_path and Path(file_path).exists():
-                file_data = Path(file_path).read_bytes()
+                # Only a reference is returned; the file is fetched with DownloadArtifact
+                ref = await asyncio.to_thread(
+                    self.artifacts.put_file, file_path, request.format.lower()
+                )
                 
                 return video_analysis_pb2.ReportResponse(
                     status="success",
                     file_path=file_path,
-                    file_data=file_data,
-                    message=f"Report generated successfully: {file_path}"
+                    message=f"Report generated successfully: {file_path}",
+                    artifact_id=ref["artifact_id"],
+                    size=ref["size"]
                 )
             else:
                 logger.error(f"Report generation failed. File path: {file_path}, Results: {results.keys()}")
@@ -438,43 +640,76 @@ class VideoAnalysisServicer(video_analysis_pb2_grpc.VideoAnalysisServiceServicer
         else:
             return video_analysis_pb2.ResponseType.TEXT
     
-    def _create_artifacts(self, result: dict) -> List:
-        """Create Artifact messages from orchestrator results"""
+    def _create_artifacts(self, result: dict) -> List[dict]:
+        """Store artifacts from orchestrator results and return their references"""
         artifacts = []
+        query_results = result.get("results", {})
         
-        # Check for generated files in artifacts
-        for artifact in result.get("artifacts", []):
-            artifact_type = artifact.get("type", "")
-            artifact_path = artifact.get("path", "")
-            
-            if artifact_path and Path(artifact_path).exists():
-                # Read file data
-                file_data = Path(artifact_path).read_bytes()
-                
-                artifacts.append(video_analysis_pb2.Artifact(
-                    type=artifact_type,
-                    path=artifact_path,
-                    data=file_data
-                ))
+        # Generated reports
+        for key in ("pdf", "pptx"):
+            output_path = (query_results.get(key) or {}).get("output_path", "")
+            if output_path and Path(output_path).exists():
+                ref = self.artifacts.put_file(output_path, key)
+                artifacts.append({**ref, "path": output_path})
         
-        # Check for JSON results (transcription, vision)
-        if "transcription" in result.get("context", {}):
-            trans_data = json.dumps(result["context"]["transcription"]).encode()
-            artifacts.append(video_analysis_pb2.Artifact(
-                type="json",
-                path="transcription.json",
-                data=trans_data
-            ))
-        
-        if "vision_results" in result.get("context", {}):
-            vision_data = json.dumps(result["context"]["vision_results"]).encode()
-            artifacts.append(video_analysis_pb2.Artifact(
-                type="json",
-                path="vision_results.json",
-                data=vision_data
-            ))
+        # JSON results (transcription, vision)
+        for key, name in (("transcription", "transcription.json"),
+                          ("vision", "vision_results.json")):
+            value = query_results.get(key)
+            if value and not (isinstance(value, dict) and "error" in value):
+                ref = self.artifacts.put_json(value, name)
+                artifacts.append({**ref, "path": name})
         
         return artifacts
+    
+    def _artifact_message(self, ref: dict):
+        """Convert an artifact reference to an Artifact message (no inline data)"""
+        return video_analysis_pb2.Artifact(
+            type=ref["type"],
+            path=ref["path"],
+            artifact_id=ref.get("artifact_id", ""),
+            size=ref.get("size", 0),
+            media_type=ref.get("media_type", "")
+        )
+    
+    async def DownloadArtifact(self, request, context):
+        """Stream an artifact's bytes from disk, optionally a range of them"""
+        try:
+            ref = self.artifacts.get(request.artifact_id)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        if ref is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Artifact not found")
+        
+        size = ref["size"]
+        offset = request.offset
+        if offset < 0 or offset > size:
+            await context.abort(grpc.StatusCode.OUT_OF_RANGE, f"Offset {offset} outside 0-{size}")
+        length = min(request.length, size - offset) if request.length > 0 else size - offset
+        chunk_size = request.chunk_size if request.chunk_size > 0 else DOWNLOAD_CHUNK_SIZE
+        
+        chunks = self.artifacts.read(request.artifact_id, offset, length, chunk_size)
+        try:
+            position = offset
+            first = True
+            while True:
+                block = await asyncio.to_thread(next, chunks, None)
+                if block is None and not first:
+                    break
+                # The first message carries the artifact's metadata
+                yield video_analysis_pb2.ArtifactChunk(
+                    data=block or b"",
+                    offset=position,
+                    total_size=size,
+                    media_type=ref["media_type"] if first else "",
+                    name=ref["name"] if first else ""
+                )
+                if block is None:
+                    break
+                position += len(block)
+                first = False
+        finally:
+            chunks.close()
 
 
 class BackendServer:
@@ -487,6 +722,17 @@ class BackendServer:
         self.transcription_mcp = None
         self.vision_mcp = None
         self.generation_mcp = None
+        self.analysis_cache = None
+        self.ingest = None
+        self.job_store = None
+        self.video_registry = None
+        self.chat_store = None
+        self.artifact_store = None
+        self.servicer = None
+        # Pre-analyze uploads in the background (VIDEO_PREANALYSIS=1)
+        self.preanalysis = os.environ.get("VIDEO_PREANALYSIS", "0") == "1"
+        # Frame sampling for vision queries: "uniform" or "adaptive" (scene changes)
+        self.vision_sampling = os.environ.get("VISION_SAMPLING", "uniform")
         
     async def initialize(self):
         """Initialize all agents and MCP servers"""
@@ -518,11 +764,16 @@ class BackendServer:
             # Initialize MCP servers wrapping the agents
             console.print("\nInitializing MCP servers...")
             
-            self.transcription_mcp = TranscriptionMCPServer(agent=transcription_agent)
+            # Shared cache so repeat queries on a video reuse earlier analyses
+            self.analysis_cache = AnalysisCache(cache_dir="uploads/analysis_cache")
+            
+            self.transcription_mcp = TranscriptionMCPServer(
+                agent=transcription_agent, cache=self.analysis_cache
+            )
             await self.transcription_mcp.initialize()
             console.print("  ✓ Transcription MCP server ready", style="green")
             
-            self.vision_mcp = VisionMCPServer(agent=vision_agent)
+            self.vision_mcp = VisionMCPServer(agent=vision_agent, cache=self.analysis_cache)
             await self.vision_mcp.initialize()
             console.print("  ✓ Vision MCP server ready", style="green")
             
@@ -536,11 +787,37 @@ class BackendServer:
                 model_path=str(model_path),
                 transcription_mcp=self.transcription_mcp,
                 vision_mcp=self.vision_mcp,
-                generation_mcp=self.generation_mcp
+                generation_mcp=self.generation_mcp,
+                cache=self.analysis_cache,
+                # Pre-analysis uses the same sampling, so queries hit its cached results
+                vision_sampling=self.vision_sampling
             )
             await self.orchestrator.initialize()
             console.print("  ✓ Orchestrator ready", style="green")
             
+            # Indexed registry of uploaded videos
+            self.video_registry = VideoRegistry(
+                db_path="data/videos.db", legacy_json="uploads/video_registry.json"
+            )
+            await self.video_registry.initialize()
+            console.print("  ✓ Video registry ready", style="green")
+            
+            # Persistent sessions and chat history, recent sessions cached in memory
+            self.chat_store = ChatStore(db_path="data/chat_history.db")
+            await self.chat_store.initialize()
+            console.print("  ✓ Chat history store ready", style="green")
+            
+            self.artifact_store = ArtifactStore(root="uploads/artifacts")
+            
+            if self.preanalysis:
+                self.ingest = IngestPipeline(self.orchestrator, registry=self.video_registry)
+                console.print("  ✓ Background pre-analysis enabled", style="green")
+            
+            # Durable table of submitted analysis jobs
+            self.job_store = JobStore(db_path="data/jobs.db")
+            await self.job_store.initialize()
+            console.print("  ✓ Job store ready", style="green")
+            
             console.print("\n[bold green]✓ All agents and MCP servers initialized successfully[/bold green]")
             
         except Exception as e:
@@ -563,9 +840,16 @@ class BackendServer:
         )
         
         # Add VideoAnalysis service
-        servicer = VideoAnalysisServicer(orchestrator=self.orchestrator)
+        if self.ingest:
+            self.ingest.start()
+        self.servicer = VideoAnalysisServicer(
+            orchestrator=self.orchestrator, ingest=self.ingest, job_store=self.job_store,
+            analysis_cache=self.analysis_cache, video_registry=self.video_registry,
+            chat_store=self.chat_store, artifact_store=self.artifact_store
+        )
+        self.servicer.jobs.start()
         video_analysis_pb2_grpc.add_VideoAnalysisServiceServicer_to_server(
-            servicer, self.server
+            self.servicer, self.server
         )
         
         self.server.add_insecure_port(f'[::]:{self.port}')
@@ -581,6 +865,21 @@ class BackendServer:
         """Graceful shutdown"""
         console.print("\n[yellow]Shutting down...[/yellow]")
         
+        if self.ingest:
+            await self.ingest.stop()
+        if self.servicer:
+            # Running jobs are requeued on the next start
+            await self.servicer.jobs.stop()
+        if self.job_store:
+            await self.job_store.close()
+        if self.video_registry:
+            await self.video_registry.close()
+        if self.chat_store:
+            await self.chat_store.close()
+        if self.analysis_cache:
+            # Persist LRU order changed by hits since the last index write
+            await asyncio.to_thread(self.analysis_cache.flush)
+        
         if self.orchestrator:
             await self.orchestrator.cleanup()
         
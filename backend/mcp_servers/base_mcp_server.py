@@ -2,8 +2,14 @@
 Base MCP Server implementation
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+import asyncio
+import json
 import logging
+import os
+from pathlib import Path
+
+from .single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -11,9 +17,11 @@ logger = logging.getLogger(__name__)
 class BaseMCPServer(ABC):
     """Base class for MCP servers following Model Context Protocol"""
     
-    def __init__(self, name: str, version: str = "1.0.0"):
+    def __init__(self, name: str, version: str = "1.0.0", cache=None):
         self.name = name
         self.version = version
+        self.cache = cache  # Optional AnalysisCache shared across servers
+        self.flights = SingleFlight(name)
         self.tools: List[Dict[str, Any]] = []
         self.prompts: List[Dict[str, Any]] = []
         logger.info(f"Initializing MCP Server: {name} v{version}")
@@ -28,6 +36,58 @@ class BaseMCPServer(ABC):
         """Handle a tool invocation"""
         pass
     
+    async def call_cached(self, tool_name: str, arguments: Dict[str, Any],
+                          params: Dict[str, Any],
+                          run: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Serve a tool call from the analysis cache, or run it and store the result
+
+        Identical calls already in flight are joined instead of run again.
+
+        Args:
+            tool_name: Tool being invoked
+            arguments: Tool arguments (must contain video_path)
+            params: Normalized parameters that determine the result; tools
+                producing identical output should yield identical params
+            run: Coroutine factory performing the actual analysis
+        """
+        video_path = arguments.get("video_path")
+        agent = getattr(self, "agent", None)
+        if not video_path or agent is None:
+            return await run()
+
+        try:
+            if self.cache:
+                video_id = await asyncio.to_thread(self.cache.video_hash, video_path)
+            else:
+                stat = os.stat(video_path)
+                video_id = f"{Path(video_path).resolve()}:{stat.st_size}:{stat.st_mtime}"
+        except OSError:
+            # Let the agent report the missing file
+            return await run()
+
+        key = None
+        if self.cache:
+            key = self.cache.make_key(video_id, agent.name, agent.model_version, params)
+            # Entry reads and index writes are file I/O; keep them off the event loop
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                logger.info(f"Analysis cache hit: {tool_name} on {video_id[:12]}")
+                return cached
+
+        async def run_and_store():
+            result = await run()
+            if key and isinstance(result, dict) and "error" not in result:
+                await asyncio.to_thread(self.cache.put, key, result)
+            return result
+
+        flight_key = (video_id, agent.name, json.dumps(params, sort_keys=True, default=str))
+        return await self.flights.do(flight_key, run_and_store)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return single-flight counters"""
+        return {"single_flight": self.flights.get_stats()}
+
     def register_tool(self, tool: Dict[str, Any]):
         """Register a tool with this MCP server"""
         self.tools.append(tool)
@@ -0,0 +1,90 @@
+"""
+Single-flight - Coalesces identical in-flight tool calls into one execution
+Concurrent requests for the same analysis await one shared task; it is
+cancelled only when every caller waiting on it has gone away.
+"""
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+import logging
+
+from agents.executor import no_deadline, current_priority, is_background
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """One shared execution and the number of callers waiting on it"""
+
+    def __init__(self, task: asyncio.Task, priority):
+        self.task = task
+        self.priority = priority  # WorkPriority of the starting caller, if any
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    do(key, run) starts run() for the first caller of a key and lets later
+    callers with the same key join it until it finishes.
+
+    The shared task runs without the first caller's request deadline (the
+    callers may have different ones); each caller stays cancellable on its
+    own, and the task is cancelled when its last waiter is.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.started = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self.promoted = 0
+
+    async def do(self, key: Hashable, run: Callable[[], Awaitable[Any]]) -> Any:
+        """Run or join the execution for key and return its result"""
+        flight = self._flights.get(key)
+        if flight is None:
+            with no_deadline():
+                task = asyncio.ensure_future(run())
+            flight = _Flight(task, current_priority())
+            self._flights[key] = flight
+            task.add_done_callback(lambda _, key=key, flight=flight: self._finished(key, flight))
+            self.started += 1
+        else:
+            self.coalesced += 1
+            logger.info(f"{self.name}: joined in-flight call ({flight.waiters} already waiting)")
+            if flight.priority is not None and flight.priority.background and not is_background():
+                # An interactive caller now depends on background work: promote it
+                flight.priority.background = False
+                self.promoted += 1
+
+        flight.waiters += 1
+        try:
+            # Shielded so one caller's cancellation doesn't cancel the others' work
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # New callers must start fresh rather than join a cancelled task
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+                self.cancelled += 1
+                logger.info(f"{self.name}: cancelled call with no remaining waiters")
+
+    def _finished(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled():
+            # Retrieve the exception so an unawaited failure isn't logged as lost
+            flight.task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return coalescing counters"""
+        return {
+            "name": self.name,
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+            "promoted": self.promoted
+        }
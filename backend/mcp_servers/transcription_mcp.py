@@ -14,8 +14,8 @@ logger = logging.getLogger(__name__)
 class TranscriptionMCPServer(BaseMCPServer):
     """MCP Server for transcription operations"""
     
-    def __init__(self, agent=None):
-        super().__init__("transcription-server", "1.0.0")
+    def __init__(self, agent=None, cache=None):
+        super().__init__("transcription-server", "1.0.0", cache=cache)
         self.agent = agent
         
     async def initialize(self):
@@ -60,6 +60,13 @@ class TranscriptionMCPServer(BaseMCPServer):
     async def handle_tool_call(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Handle tool invocations"""
         if tool_name == "transcribe_video":
-            return await self.agent.process(arguments)
+            params = {
+                "language": arguments.get("language"),
+                "long_form": arguments.get("long_form")
+            }
+            return await self.call_cached(
+                tool_name, arguments, params,
+                lambda: self.agent.process(arguments)
+            )
         else:
             return {"error": f"Unknown tool: {tool_name}"}
@@ -14,8 +14,8 @@ logger = logging.getLogger(__name__)
 class VisionMCPServer(BaseMCPServer):
     """MCP Server for vision analysis operations"""
     
-    def __init__(self, agent=None):
-        super().__init__("vision-server", "1.0.0")
+    def __init__(self, agent=None, cache=None):
+        super().__init__("vision-server", "1.0.0", cache=cache)
         self.agent = agent
         
     async def initialize(self):
@@ -95,6 +95,15 @@ class VisionMCPServer(BaseMCPServer):
         
         if tool_name in task_map:
             arguments["task"] = task_map[tool_name]
-            return await self.agent.process(arguments)
+            params = {
+                "task": arguments["task"],
+                "num_frames": arguments.get("num_frames", 10),
+                "interval": arguments.get("interval"),
+                "sampling": arguments.get("sampling", "uniform")
+            }
+            return await self.call_cached(
+                tool_name, arguments, params,
+                lambda: self.agent.process(arguments)
+            )
         else:
             return {"error": f"Unknown tool: {tool_name}"}
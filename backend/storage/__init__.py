@@ -0,0 +1,14 @@
+"""
+Persistent storage for uploaded videos and their analysis results
+"""
+
+from .analysis_cache import AnalysisCache
+from .upload_store import UploadStore, UploadError
+from .video_registry import VideoRegistry
+
+__all__ = [
+    'AnalysisCache',
+    'UploadStore',
+    'UploadError',
+    'VideoRegistry',
+]
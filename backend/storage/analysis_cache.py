@@ -0,0 +1,196 @@
+"""
+Analysis Cache - Content-addressed, disk-backed cache of agent results
+Keyed on the video content hash, the agent, its model version and the
+parameters that change the output, so repeat queries on the same video
+never re-run Whisper, YOLO or BLIP.
+"""
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def hash_file(path: str) -> str:
+    """Compute the SHA-256 of a file without loading it into memory"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Size-bounded LRU cache of analysis results persisted under uploads/.
+
+    Each entry is stored as its own JSON file named after the cache key;
+    an index file keeps the LRU order and entry sizes so the cache
+    survives restarts without scanning every entry. Hits only reorder the
+    index in memory; it is written on put(), at most every
+    index_flush_interval seconds on hits, and on flush() at shutdown.
+    """
+
+    def __init__(self, cache_dir: str = "uploads/analysis_cache",
+                 max_bytes: int = 512 * 1024 * 1024, index_flush_interval: float = 30.0):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.cache_dir / "index.json"
+        self.max_bytes = max_bytes
+        self.index_flush_interval = index_flush_interval
+        self.entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size in bytes, LRU first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # (path, size, mtime) -> sha256, so large files are hashed only once
+        self._hash_memo: Dict[Tuple[str, int, float], str] = {}
+        # get()/put() run on worker threads; guards entries and the index file
+        self._lock = threading.RLock()
+        self._index_dirty = False
+        self._index_saved_at = time.monotonic()
+
+        self._load_index()
+
+    def _load_index(self):
+        """Load LRU order and entry sizes from disk"""
+        if not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+            for key, size in index.get("entries", []):
+                if (self.cache_dir / f"{key}.json").exists():
+                    self.entries[key] = size
+                    self.total_bytes += size
+            logger.info(f"Loaded analysis cache with {len(self.entries)} entries "
+                        f"({self.total_bytes / 1024 / 1024:.1f} MB)")
+        except Exception as e:
+            logger.error(f"Failed to load analysis cache index: {e}")
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def _save_index(self):
+        """Persist LRU order atomically (caller holds the lock)"""
+        self._index_dirty = False
+        self._index_saved_at = time.monotonic()
+        try:
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({"entries": list(self.entries.items())}, f)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            logger.error(f"Failed to save analysis cache index: {e}")
+
+    def video_hash(self, video_path: str) -> str:
+        """Return the content hash of a video, memoized on size and mtime"""
+        stat = os.stat(video_path)
+        memo_key = (str(Path(video_path).resolve()), stat.st_size, stat.st_mtime)
+        digest = self._hash_memo.get(memo_key)
+        if digest is None:
+            started = time.perf_counter()
+            digest = hash_file(video_path)
+            self._hash_memo[memo_key] = digest
+            logger.debug(f"Hashed {video_path} in {time.perf_counter() - started:.2f}s")
+        return digest
+
+    def remember_hash(self, video_path: str, digest: str):
+        """Record a content hash computed elsewhere (e.g. while uploading)"""
+        stat = os.stat(video_path)
+        self._hash_memo[(str(Path(video_path).resolve()), stat.st_size, stat.st_mtime)] = digest
+
+    @staticmethod
+    def make_key(video_hash: str, agent: str, model_version: str,
+                 params: Dict[str, Any]) -> str:
+        """Build a cache key from everything that determines an analysis result"""
+        payload = json.dumps({
+            "video": video_hash,
+            "agent": agent,
+            "model": model_version,
+            "params": params
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result and mark it most recently used"""
+        with self._lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+
+        try:
+            with open(self.cache_dir / f"{key}.json", 'r') as f:
+                value = json.load(f)
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cache entry {key[:12]}: {e}")
+            with self._lock:
+                self._remove(key)
+                self._save_index()
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self._index_dirty = True
+            self.hits += 1
+            if self._index_dirty and time.monotonic() - self._index_saved_at >= self.index_flush_interval:
+                self._save_index()
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]):
+        """Store a result, evicting least recently used entries over the size limit"""
+        data = json.dumps(value).encode()
+        if len(data) > self.max_bytes:
+            logger.warning(f"Result too large to cache ({len(data)} bytes)")
+            return
+
+        entry_path = self.cache_dir / f"{key}.json"
+        tmp_path = entry_path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, entry_path)
+
+        with self._lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)
+            self.entries[key] = len(data)
+            self.total_bytes += len(data)
+
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                oldest = next(iter(self.entries))
+                logger.debug(f"Evicting analysis cache entry {oldest[:12]}")
+                self._remove(oldest)
+
+            self._save_index()
+
+    def flush(self):
+        """Write the index if hits have reordered it since the last save"""
+        with self._lock:
+            if self._index_dirty:
+                self._save_index()
+
+    def _remove(self, key: str):
+        """Delete an entry from the index and from disk"""
+        size = self.entries.pop(key, 0)
+        self.total_bytes -= size
+        try:
+            (self.cache_dir / f"{key}.json").unlink()
+        except FileNotFoundError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache occupancy and hit/miss counters"""
+        return {
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
@@ -0,0 +1,158 @@
+"""
+Artifact Store - Content-addressed storage of query and report artifacts
+Reports and JSON results are stored once under their SHA-256; responses
+carry only the ID, and clients download the bytes in ranges when they
+need them.
+"""
+from typing import Dict, Any, Iterator, Optional
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from .analysis_cache import hash_file
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+_ARTIFACT_ID_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    "json": "application/json",
+}
+
+
+class ArtifactStore:
+    """
+    Artifacts live at {root}/{sha256} with a {sha256}.json sidecar holding
+    name, type, media type and size. The artifact ID is the content hash,
+    so identical artifacts are stored once.
+
+    Storing an artifact again refreshes its mtime. prune() (run at most
+    every prune_interval seconds after a put) deletes artifacts not stored
+    for max_age_seconds, then the least recently stored ones until the
+    store fits in max_bytes; older chat messages may then point at
+    artifacts that are gone (404).
+    """
+
+    def __init__(self, root: str = "uploads/artifacts", max_bytes: int = 2 * 1024 ** 3,
+                 max_age_seconds: float = 30 * 24 * 3600, prune_interval: float = 60.0):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.prune_interval = prune_interval
+        self._lock = threading.Lock()  # a put and a prune must not interleave
+        self._pruned_at = 0.0
+        self.pruned = 0
+
+    def path(self, artifact_id: str) -> Path:
+        """Location of an artifact's bytes; raises ValueError for malformed IDs"""
+        if not _ARTIFACT_ID_PATTERN.match(artifact_id or ""):
+            raise ValueError(f"Invalid artifact_id: {artifact_id!r}")
+        return self.root / artifact_id
+
+    def _commit(self, artifact_id: str, write, name: str, artifact_type: str,
+                size: int) -> Dict[str, Any]:
+        ref = {
+            "artifact_id": artifact_id,
+            "type": artifact_type,
+            "name": name,
+            "media_type": MEDIA_TYPES.get(artifact_type, "application/octet-stream"),
+            "size": size
+        }
+        destination = self.path(artifact_id)
+        # Per-thread temporary names: the same artifact may be stored concurrently
+        tmp_suffix = f".{threading.get_ident()}.tmp"
+        with self._lock:
+            if destination.exists():
+                os.utime(destination)  # Recently stored: keep it longest
+            else:
+                tmp_path = destination.with_suffix(tmp_suffix)
+                write(tmp_path)
+                os.replace(tmp_path, destination)
+            meta_path = destination.with_suffix(".json")
+            if not meta_path.exists():
+                tmp_meta = meta_path.with_suffix(".json" + tmp_suffix)
+                with open(tmp_meta, 'w') as f:
+                    json.dump(ref, f)
+                os.replace(tmp_meta, meta_path)
+        if time.monotonic() - self._pruned_at >= self.prune_interval:
+            self.prune()
+        return ref
+
+    def put_bytes(self, data: bytes, name: str, artifact_type: str) -> Dict[str, Any]:
+        """Store bytes and return the artifact reference"""
+        artifact_id = hashlib.sha256(data).hexdigest()
+        return self._commit(artifact_id, lambda tmp: tmp.write_bytes(data),
+                            name, artifact_type, len(data))
+
+    def put_file(self, file_path: str, artifact_type: str) -> Dict[str, Any]:
+        """Copy a file (e.g. a generated report) into the store"""
+        artifact_id = hash_file(file_path)
+        return self._commit(artifact_id, lambda tmp: shutil.copyfile(file_path, tmp),
+                            Path(file_path).name, artifact_type, os.path.getsize(file_path))
+
+    def put_json(self, obj: Any, name: str) -> Dict[str, Any]:
+        """
+        Store a JSON-serializable result; unchanged results (e.g. a session's
+        transcription returned again) hash to the stored copy and aren't rewritten
+        """
+        return self.put_bytes(json.dumps(obj, default=str).encode(), name, "json")
+
+    def prune(self) -> int:
+        """Delete expired artifacts, then the oldest beyond max_bytes; returns how many"""
+        with self._lock:
+            self._pruned_at = time.monotonic()
+            artifacts = []
+            for path in self.root.iterdir():
+                if _ARTIFACT_ID_PATTERN.match(path.name):
+                    stat = path.stat()
+                    artifacts.append((stat.st_mtime, stat.st_size, path))
+            artifacts.sort()  # oldest first
+
+            total = sum(size for _, size, _ in artifacts)
+            cutoff = time.time() - self.max_age_seconds
+            removed = 0
+            for index, (mtime, size, path) in enumerate(artifacts):
+                # The newest artifact (just stored) is kept even if alone over the limit
+                over_size = total > self.max_bytes and index < len(artifacts) - 1
+                if mtime >= cutoff and not over_size:
+                    break
+                path.unlink(missing_ok=True)
+                path.with_suffix(".json").unlink(missing_ok=True)
+                total -= size
+                removed += 1
+        if removed:
+            self.pruned += removed
+            logger.info(f"Pruned {removed} artifacts ({total / 1024 / 1024:.1f} MB kept)")
+        return removed
+
+    def get(self, artifact_id: str) -> Optional[Dict[str, Any]]:
+        """Return an artifact's reference, or None if it is not stored"""
+        meta_path = self.path(artifact_id).with_suffix(".json")
+        if not meta_path.exists() or not self.path(artifact_id).exists():
+            return None
+        with open(meta_path, 'r') as f:
+            return json.load(f)
+
+    def read(self, artifact_id: str, offset: int = 0, length: int = 0,
+             chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> Iterator[bytes]:
+        """Yield the bytes of [offset, offset + length) in chunks (length 0 = to the end)"""
+        with open(self.path(artifact_id), 'rb') as f:
+            f.seek(offset)
+            remaining = length if length > 0 else None
+            while remaining is None or remaining > 0:
+                block = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not block:
+                    break
+                if remaining is not None:
+                    remaining -= len(block)
+                yield block
@@ -0,0 +1,226 @@
+"""
+Chat Store - Durable sessions and chat history
+Messages and per-session analysis results live in SQLite; only recently
+used sessions are kept in memory, so memory stays flat over long uptimes
+and history pages are read straight from the (session_id, timestamp) index.
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+import json
+import logging
+import time
+import uuid
+import weakref
+from pathlib import Path
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+
+class SessionResults(dict):
+    """A session's results dict; a dict subclass so the store can weakly reference it"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    video_id TEXT NOT NULL DEFAULT '',
+    results TEXT NOT NULL DEFAULT '{}',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    message_id TEXT NOT NULL UNIQUE,
+    session_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    artifacts TEXT NOT NULL DEFAULT '[]',
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_session_time ON messages (session_id, timestamp, id);
+"""
+
+
+class ChatStore:
+    """
+    Sessions hold the accumulated analysis results passed to the
+    orchestrator as context. A session's results dict is cached in an LRU
+    of at most max_sessions entries, each dropped after session_ttl seconds
+    unused; callers mutate it and persist it with save_results(). A dict
+    evicted while a query still holds it is handed out again instead of a
+    fresh copy from SQLite, so concurrent queries never update separate
+    copies of one session.
+    """
+
+    def __init__(self, db_path: str = "data/chat_history.db", max_sessions: int = 256,
+                 session_ttl: float = 3600.0):
+        self.db_path = Path(db_path)
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self._db: Optional[aiosqlite.Connection] = None
+        # session_id -> (results, last used), least recently used first
+        self._hot: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        # session_id -> results dict still referenced somewhere (e.g. an in-flight query)
+        self._live: "weakref.WeakValueDictionary[str, SessionResults]" = weakref.WeakValueDictionary()
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    async def initialize(self):
+        """Open the database and create tables"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = await aiosqlite.connect(str(self.db_path))
+        self._db.row_factory = aiosqlite.Row
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute("PRAGMA synchronous=NORMAL")
+        await self._db.executescript(_SCHEMA)
+        await self._db.commit()
+
+    async def close(self):
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+        self._hot.clear()
+
+    def _evict(self, now: float):
+        """Drop sessions idle longer than the TTL and any beyond max_sessions"""
+        while self._hot:
+            session_id, (_, last_used) = next(iter(self._hot.items()))
+            if now - last_used <= self.session_ttl and len(self._hot) <= self.max_sessions:
+                break
+            del self._hot[session_id]
+            self.evictions += 1
+
+    def _touch(self, session_id: str, results: Dict[str, Any]) -> Dict[str, Any]:
+        live = self._live.get(session_id)
+        if live is not None:
+            # Another caller loaded the session while we awaited SQLite; share its dict
+            results = live
+        elif not isinstance(results, SessionResults):
+            results = SessionResults(results)
+        self._live[session_id] = results
+        now = time.time()
+        self._hot[session_id] = (results, now)
+        self._hot.move_to_end(session_id)
+        self._evict(now)
+        return results
+
+    async def _load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        hot = self._hot.get(session_id)
+        # Evicted from the LRU but still held by a query: keep sharing that dict
+        results = hot[0] if hot is not None else self._live.get(session_id)
+        if results is not None:
+            self.hits += 1
+            return self._touch(session_id, results)
+        async with self._db.execute(
+            "SELECT results FROM sessions WHERE session_id = ?", (session_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        self.loads += 1
+        return self._touch(session_id, json.loads(row["results"]))
+
+    async def open_session(self, session_id: str, video_id: str = "") -> Dict[str, Any]:
+        """Return the session's results dict, creating the session on first use"""
+        results = await self._load(session_id)
+        if results is not None:
+            return results
+        now = time.time()
+        await self._db.execute(
+            "INSERT OR IGNORE INTO sessions (session_id, video_id, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?)",
+            (session_id, video_id, now, now)
+        )
+        await self._db.commit()
+        return self._touch(session_id, SessionResults())
+
+    async def get_results(self, session_id: str) -> Dict[str, Any]:
+        """Return the session's accumulated results ({} for unknown sessions)"""
+        results = await self._load(session_id)
+        return results if results is not None else {}
+
+    async def get_video_id(self, session_id: str) -> str:
+        """Return the video a session was opened for ("" if unknown)"""
+        async with self._db.execute(
+            "SELECT video_id FROM sessions WHERE session_id = ?", (session_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        return row["video_id"] if row else ""
+
+    async def save_results(self, session_id: str, results: Dict[str, Any]):
+        """Persist the session's results after a query updated them"""
+        live = self._live.get(session_id)
+        if live is not None and live is not results:
+            live.update(results)
+            results = live
+        await self._db.execute(
+            "UPDATE sessions SET results = ?, updated_at = ? WHERE session_id = ?",
+            (json.dumps(results, default=str), time.time(), session_id)
+        )
+        await self._db.commit()
+        self._touch(session_id, results)
+
+    async def add_message(self, session_id: str, role: str, content: str,
+                          artifacts: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Append a message to the session's history"""
+        message = {
+            "message_id": str(uuid.uuid4()),
+            "role": role,
+            "content": content,
+            "artifacts": artifacts or [],
+            "timestamp": time.time()
+        }
+        await self._db.execute(
+            "INSERT INTO messages (message_id, session_id, role, content, artifacts, timestamp) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (message["message_id"], session_id, role, content,
+             json.dumps(message["artifacts"]), message["timestamp"])
+        )
+        await self._db.commit()
+        return message
+
+    async def get_messages(self, session_id: str, limit: int = 50,
+                           before: str = "") -> Tuple[List[Dict[str, Any]], str]:
+        """
+        One page of history, oldest first, ending just before the cursor
+
+        Returns:
+            (messages, cursor for the previous page or "" at the beginning)
+        """
+        query = "SELECT * FROM messages WHERE session_id = ?"
+        params: list = [session_id]
+        if before:
+            timestamp, row_id = before.split(":", 1)
+            query += " AND (timestamp, id) < (?, ?)"
+            params += [float(timestamp), int(row_id)]
+        query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        async with self._db.execute(query, params) as cursor:
+            rows = await cursor.fetchall()
+        more = len(rows) > limit
+        rows = list(reversed(rows[:limit]))
+
+        messages = [
+            {
+                "message_id": row["message_id"],
+                "role": row["role"],
+                "content": row["content"],
+                "artifacts": json.loads(row["artifacts"]),
+                "timestamp": row["timestamp"]
+            }
+            for row in rows
+        ]
+        next_cursor = f"{rows[0]['timestamp']!r}:{rows[0]['id']}" if more else ""
+        return messages, next_cursor
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return in-memory session cache counters"""
+        return {
+            "hot_sessions": len(self._hot),
+            "hits": self.hits,
+            "loads": self.loads,
+            "evictions": self.evictions
+        }
@@ -0,0 +1,200 @@
+"""
+Upload Store - Resumable chunked uploads written straight to disk
+Chunks are appended to a partial file while a running SHA-256 is kept,
+so multi-GB recordings are uploaded with constant memory use. Completed
+uploads are stored once per content hash under uploads/blobs.
+"""
+from typing import Dict, Any, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import uuid
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+_UPLOAD_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class UploadError(ValueError):
+    """Raised for malformed or out-of-order chunked uploads"""
+    pass
+
+
+def safe_filename(filename: str) -> str:
+    """Strip any directory components from a client-supplied filename"""
+    name = Path(filename or "").name
+    return name or "video.mp4"
+
+
+class ChunkedUpload:
+    """An open partial upload accepting appended chunks"""
+
+    def __init__(self, upload_id: str, part_path: Path, meta: Dict[str, Any]):
+        self.upload_id = upload_id
+        self.part_path = part_path
+        self.meta = meta
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self._file = None
+
+    def _open(self, offset: int):
+        """Open the partial file at offset, rehashing any bytes already stored"""
+        existing = self.part_path.stat().st_size if self.part_path.exists() else 0
+        if offset > existing:
+            raise UploadError(
+                f"Cannot resume at offset {offset}: only {existing} bytes stored"
+            )
+
+        self._file = open(self.part_path, 'r+b' if self.part_path.exists() else 'w+b')
+        # Drop anything past the resume point (e.g. a half-written chunk)
+        self._file.truncate(offset)
+        self._file.seek(0)
+        remaining = offset
+        while remaining > 0:
+            block = self._file.read(min(UPLOAD_CHUNK_SIZE, remaining))
+            if not block:
+                break
+            self._digest.update(block)
+            remaining -= len(block)
+        self._file.seek(offset)
+        self.size = offset
+
+    def _write(self, data: bytes):
+        self._file.write(data)
+        self._digest.update(data)
+        self.size += len(data)
+
+    async def write(self, data: bytes, offset: Optional[int] = None):
+        """Append a chunk; offset must match the bytes committed so far"""
+        if offset is not None and offset != self.size:
+            raise UploadError(f"Expected chunk at offset {self.size}, got {offset}")
+        if data:
+            await asyncio.to_thread(self._write, data)
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    def close(self):
+        """Flush and close the partial file, keeping it for a later resume"""
+        if self._file:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    async def finish(self, destination: Path) -> Tuple[Path, str, int]:
+        """Complete the upload and move it to its final location"""
+        await asyncio.to_thread(self.close)
+        if destination.exists():
+            # Identical content is already stored there
+            self.part_path.unlink()
+        else:
+            os.replace(self.part_path, destination)
+        meta_path = self.part_path.with_suffix(".json")
+        if meta_path.exists():
+            meta_path.unlink()
+        return destination, self.sha256, self.size
+
+
+class UploadStore:
+    """
+    Manages partial uploads under uploads/.partial and content-addressed
+    blobs under uploads/blobs/{sha256}{ext}. Video IDs are aliases for a
+    blob, so re-uploading a file reuses its stored analyses.
+    """
+
+    def __init__(self, uploads_dir: str = "uploads"):
+        self.uploads_dir = Path(uploads_dir)
+        self.partial_dir = self.uploads_dir / ".partial"
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        self.blobs_dir = self.uploads_dir / "blobs"
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+
+    def find_blob(self, sha256: str) -> Optional[Path]:
+        """Return the stored blob with this content hash, if any"""
+        return next(self.blobs_dir.glob(f"{sha256}.*"), None)
+
+    def _new_blob_path(self, sha256: str, filename: str) -> Path:
+        # Keep the extension so tools that look at it still recognize the file
+        suffix = Path(safe_filename(filename)).suffix.lower() or ".mp4"
+        return self.blobs_dir / f"{sha256}{suffix}"
+
+    async def commit(self, upload: ChunkedUpload) -> Tuple[Path, str, int, bool]:
+        """
+        Complete a chunked upload into its blob
+
+        Returns:
+            (blob path, sha256, size, whether the content was already stored)
+        """
+        existing = self.find_blob(upload.sha256)
+        destination = existing or self._new_blob_path(upload.sha256, upload.meta["filename"])
+        path, sha256, size = await upload.finish(destination)
+        return path, sha256, size, existing is not None
+
+    def _store_bytes(self, content: bytes, filename: str) -> Tuple[Path, str, int, bool]:
+        sha256 = hashlib.sha256(content).hexdigest()
+        existing = self.find_blob(sha256)
+        if existing is not None:
+            return existing, sha256, len(content), True
+        # Unique temp name: identical uploads may be stored concurrently
+        tmp_path = self.partial_dir / f"{sha256}.{uuid.uuid4().hex}.tmp"
+        tmp_path.write_bytes(content)
+        # Another upload of the same content may have finished meanwhile
+        existing = self.find_blob(sha256)
+        if existing is not None:
+            tmp_path.unlink()
+            return existing, sha256, len(content), True
+        destination = self._new_blob_path(sha256, filename)
+        os.replace(tmp_path, destination)
+        return destination, sha256, len(content), False
+
+    async def store_bytes(self, content: bytes, filename: str) -> Tuple[Path, str, int, bool]:
+        """Store an in-memory upload as a blob; same return value as commit()"""
+        return await asyncio.to_thread(self._store_bytes, content, filename)
+
+    def _paths(self, upload_id: str) -> Tuple[Path, Path]:
+        if not _UPLOAD_ID_PATTERN.match(upload_id or ""):
+            raise UploadError(f"Invalid upload_id: {upload_id!r}")
+        return (self.partial_dir / f"{upload_id}.part",
+                self.partial_dir / f"{upload_id}.json")
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        """Return whether a partial upload exists and how many bytes it holds"""
+        part_path, meta_path = self._paths(upload_id)
+        if not part_path.exists():
+            return {"exists": False, "offset": 0}
+        meta = {}
+        if meta_path.exists():
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+        return {"exists": True, "offset": part_path.stat().st_size, **meta}
+
+    async def open(self, upload_id: str, filename: str = "", mime_type: str = "",
+                   offset: int = 0) -> ChunkedUpload:
+        """Start a new upload or resume an existing one at offset"""
+        part_path, meta_path = self._paths(upload_id)
+
+        meta = {}
+        if meta_path.exists():
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+        if filename:
+            meta["filename"] = safe_filename(filename)
+        if mime_type:
+            meta["mime_type"] = mime_type
+        if not meta.get("filename"):
+            raise UploadError("First chunk of an upload must carry a filename")
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+
+        upload = ChunkedUpload(upload_id, part_path, meta)
+        await asyncio.to_thread(upload._open, offset)
+        if offset:
+            logger.info(f"Resuming upload {upload_id} at {offset} bytes")
+        return upload
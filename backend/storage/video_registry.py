@@ -0,0 +1,150 @@
+"""
+Video Registry - Indexed SQLite store of uploaded videos
+Maps video IDs to their stored file together with the probed metadata,
+content hash and pre-analysis status. Each upload is one small
+transaction, so registering stays O(1) however large the library grows.
+"""
+from typing import Dict, Any, Optional
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+NOT_STARTED = "not_started"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    filename TEXT NOT NULL DEFAULT '',
+    sha256 TEXT NOT NULL DEFAULT '',
+    file_size INTEGER NOT NULL DEFAULT 0,
+    duration_seconds INTEGER NOT NULL DEFAULT 0,
+    width INTEGER NOT NULL DEFAULT 0,
+    height INTEGER NOT NULL DEFAULT 0,
+    fps REAL NOT NULL DEFAULT 0,
+    analysis_status TEXT NOT NULL DEFAULT 'not_started',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS videos_sha256 ON videos (sha256);
+"""
+
+
+class VideoRegistry:
+    """
+    One row per video ID. Several IDs may share a content hash (re-uploads
+    aliasing one blob); analysis status is kept in step across them since
+    analyses are cached per content.
+    """
+
+    def __init__(self, db_path: str = "data/videos.db",
+                 legacy_json: Optional[str] = "uploads/video_registry.json"):
+        self.db_path = Path(db_path)
+        self.legacy_json = Path(legacy_json) if legacy_json else None
+        self._db: Optional[aiosqlite.Connection] = None
+
+    async def initialize(self):
+        """Open the database, importing the old JSON registry on first run"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = await aiosqlite.connect(str(self.db_path))
+        self._db.row_factory = aiosqlite.Row
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute("PRAGMA synchronous=NORMAL")
+        await self._db.executescript(_SCHEMA)
+        await self._db.commit()
+        await self._migrate_legacy_json()
+        logger.info(f"Video registry ready with {await self.count()} videos")
+
+    async def _migrate_legacy_json(self):
+        """Import {video_id: path} from video_registry.json, then set it aside"""
+        if not self.legacy_json or not self.legacy_json.exists():
+            return
+        try:
+            with open(self.legacy_json, 'r') as f:
+                videos = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to read legacy video registry: {e}")
+            return
+
+        now = time.time()
+        rows = []
+        for video_id, path in videos.items():
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            rows.append((video_id, path, Path(path).name.split("_", 1)[-1], size, now, now))
+        await self._db.executemany(
+            "INSERT OR IGNORE INTO videos (video_id, path, filename, file_size, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        await self._db.commit()
+        os.replace(self.legacy_json, self.legacy_json.with_suffix(".json.migrated"))
+        logger.info(f"Migrated {len(rows)} videos from {self.legacy_json}")
+
+    async def close(self):
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    async def register(self, video_id: str, path: str, filename: str = "", sha256: str = "",
+                       metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Insert or replace a video
+
+        metadata holds the VideoMetadata fields (duration_seconds, width,
+        height, fps, file_size). A re-upload inherits the analysis status
+        of earlier videos with the same content.
+        """
+        metadata = metadata or {}
+        now = time.time()
+        await self._db.execute(
+            "INSERT OR REPLACE INTO videos (video_id, path, filename, sha256, file_size, "
+            "duration_seconds, width, height, fps, analysis_status, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, "
+            "COALESCE((SELECT analysis_status FROM videos WHERE sha256 = ? AND sha256 != '' "
+            "ORDER BY updated_at DESC LIMIT 1), ?), ?, ?)",
+            (video_id, path, filename, sha256, metadata.get("file_size", 0),
+             metadata.get("duration_seconds", 0), metadata.get("width", 0),
+             metadata.get("height", 0), metadata.get("fps", 0.0),
+             sha256, NOT_STARTED, now, now)
+        )
+        await self._db.commit()
+        return await self.get(video_id)
+
+    async def get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        async with self._db.execute("SELECT * FROM videos WHERE video_id = ?", (video_id,)) as cursor:
+            row = await cursor.fetchone()
+        return dict(row) if row else None
+
+    async def find_by_sha256(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """Return the most recently updated video with this content, if any"""
+        async with self._db.execute(
+            "SELECT * FROM videos WHERE sha256 = ? ORDER BY updated_at DESC LIMIT 1", (sha256,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        return dict(row) if row else None
+
+    async def get_path(self, video_id: str) -> Optional[str]:
+        """Return the stored file of a video, or None if unknown"""
+        async with self._db.execute("SELECT path FROM videos WHERE video_id = ?", (video_id,)) as cursor:
+            row = await cursor.fetchone()
+        return row["path"] if row else None
+
+    async def set_analysis_status(self, video_id: str, status: str):
+        """Set the status of a video and every other ID with the same content"""
+        await self._db.execute(
+            "UPDATE videos SET analysis_status = ?, updated_at = ? WHERE video_id = ? OR "
+            "sha256 IN (SELECT sha256 FROM videos WHERE video_id = ? AND sha256 != '')",
+            (status, time.time(), video_id, video_id)
+        )
+        await self._db.commit()
+
+    async def count(self) -> int:
+        async with self._db.execute("SELECT COUNT(*) FROM videos") as cursor:
+            row = await cursor.fetchone()
+        return row[0]
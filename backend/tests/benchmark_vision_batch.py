@@ -0,0 +1,76 @@
+"""
+Benchmark for batched vision inference
+Reports frames per second of YOLO detection + BLIP captioning per batch size
+Usage: python benchmark_vision_batch.py <video_file_path> [num_frames] [batch sizes...]
+"""
+import asyncio
+import sys
+import time
+import logging
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logging.basicConfig(level=logging.WARNING)
+
+from agents.vision_agent import VisionAgent
+
+
+async def benchmark(video_path: str, num_frames: int, batch_sizes):
+    """Time detection and captioning over the same frames at each batch size"""
+    if not Path(video_path).exists():
+        print(f"Error: Video file not found: {video_path}")
+        return
+
+    agent = VisionAgent()
+    print("\nInitializing vision models (BLIP + YOLOv8)...")
+    await agent.initialize()
+
+    frames = [info["frame"] for info in agent.iter_frames(video_path, num_frames)]
+    print(f"Decoded {len(frames)} frames from {video_path}")
+
+    # Warm up both models so the first batch size is not penalized
+    await agent.run_blocking(agent._detect_batch, frames[:1])
+    await agent.run_blocking(agent._caption_batch, frames[:1])
+
+    print("\n" + "=" * 60)
+    print(f"{'batch':>6} {'detect fps':>12} {'caption fps':>12} {'combined fps':>13}")
+    print("-" * 60)
+
+    for batch_size in batch_sizes:
+        detect_time = 0.0
+        caption_time = 0.0
+        for start in range(0, len(frames), batch_size):
+            batch = frames[start:start + batch_size]
+
+            started = time.perf_counter()
+            await agent.run_blocking(agent._detect_batch, batch)
+            detect_time += time.perf_counter() - started
+
+            started = time.perf_counter()
+            await agent.run_blocking(agent._caption_batch, batch)
+            caption_time += time.perf_counter() - started
+
+        print(f"{batch_size:>6} {len(frames) / detect_time:>12.2f} "
+              f"{len(frames) / caption_time:>12.2f} "
+              f"{len(frames) / (detect_time + caption_time):>13.2f}")
+
+    print("=" * 60)
+    await agent.cleanup()
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmark_vision_batch.py <video_file_path> [num_frames] [batch sizes...]")
+        print("\nExample:")
+        print("  python benchmark_vision_batch.py ../uploads/test_video.mp4 32 1 2 4 8 16")
+        sys.exit(1)
+
+    video_path = sys.argv[1]
+    num_frames = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    batch_sizes = [int(b) for b in sys.argv[3:]] or [1, 2, 4, 8, 16]
+    asyncio.run(benchmark(video_path, num_frames, batch_sizes))
+
+
+if __name__ == "__main__":
+    main()
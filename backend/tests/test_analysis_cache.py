@@ -0,0 +1,43 @@
+"""
+Test script for the persistent analysis cache
+Usage: python test_analysis_cache.py
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from storage.analysis_cache import AnalysisCache
+
+
+def test_cache_roundtrip_and_eviction():
+    """Entries survive a reload and the least recently used one is evicted first"""
+    with tempfile.TemporaryDirectory() as tmp:
+        video = Path(tmp) / "video.mp4"
+        video.write_bytes(b"fake video content")
+
+        cache = AnalysisCache(cache_dir=str(Path(tmp) / "cache"), max_bytes=250)
+        video_hash = cache.video_hash(str(video))
+
+        key_a = cache.make_key(video_hash, "Transcription Agent", "medium", {"language": None})
+        key_b = cache.make_key(video_hash, "Transcription Agent", "medium", {"language": "en"})
+        key_c = cache.make_key(video_hash, "Vision Agent", "blip", {"num_frames": 10})
+        assert len({key_a, key_b, key_c}) == 3
+
+        cache.put(key_a, {"transcription": "a" * 80})
+        cache.put(key_b, {"transcription": "b" * 80})
+        assert cache.get(key_a)["transcription"] == "a" * 80  # a is now most recent
+
+        cache.put(key_c, {"results": ["c" * 80]})
+        assert cache.get(key_b) is None, "least recently used entry should be evicted"
+
+        reloaded = AnalysisCache(cache_dir=str(Path(tmp) / "cache"), max_bytes=250)
+        assert reloaded.get(key_a) is not None
+        assert reloaded.get(key_c) is not None
+        print(f"Cache stats: {reloaded.get_stats()}")
+
+
+if __name__ == "__main__":
+    test_cache_roundtrip_and_eviction()
+    print("✓ Analysis cache test passed")
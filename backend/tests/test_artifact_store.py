@@ -0,0 +1,47 @@
+"""
+Test script for the content-addressed artifact store and its pruning
+Usage: python test_artifact_store.py
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from storage.artifact_store import ArtifactStore
+
+
+def test_artifact_store_is_bounded():
+    """Identical content is stored once; expired and least recently stored artifacts are pruned"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ArtifactStore(root=tmp, max_bytes=250, max_age_seconds=3600, prune_interval=3600)
+
+        first = store.put_json({"text": "a" * 80}, "a.json")
+        assert store.put_json({"text": "a" * 80}, "a.json")["artifact_id"] == first["artifact_id"]
+        second = store.put_json({"text": "b" * 80}, "b.json")
+        assert b"".join(store.read(second["artifact_id"], offset=2, length=4)) == b'text'
+
+        # Expired: not stored again for longer than max_age_seconds
+        stale = time.time() - 7200
+        os.utime(store.path(first["artifact_id"]), (stale, stale))
+        assert store.prune() == 1
+        assert store.get(first["artifact_id"]) is None
+        assert not store.path(first["artifact_id"]).with_suffix(".json").exists()
+
+        # Over max_bytes: the least recently stored go first
+        third = store.put_json({"text": "c" * 80}, "c.json")
+        newest = store.put_json({"text": "d" * 80}, "d.json")
+        now = time.time()
+        for offset, ref in ((30, third), (20, second), (10, newest)):
+            os.utime(store.path(ref["artifact_id"]), (now - offset, now - offset))
+        assert store.prune() == 1
+        assert store.get(third["artifact_id"]) is None
+        assert store.get(second["artifact_id"]) is not None
+        assert store.get(newest["artifact_id"]) is not None
+        print(f"Artifact store pruned {store.pruned} artifacts")
+
+if __name__ == "__main__":
+    test_artifact_store_is_bounded()
+    print("✓ Artifact store test passed")
@@ -88,7 +88,7 @@ async def test_query_video(stub, video_id: str, session_id: str, query: str):
     if response.artifacts:
         console.print("\n[bold]Artifacts:[/bold]")
         for artifact in response.artifacts:
-            console.print(f"  • {artifact.type}: {artifact.path} ({len(artifact.data)} bytes)")
+            console.print(f"  • {artifact.type}: {artifact.path} ({artifact.size} bytes, id {artifact.artifact_id[:12]})")
 
 
 async def test_stream_query(stub, video_id: str, session_id: str, query: str):
@@ -153,7 +153,13 @@ async def test_generate_report(stub, session_id: str, format: str = "pdf"):
     
     if response.status == "success":
         console.print(f"[green]✓ Report generated: {response.file_path}[/green]")
-        console.print(f"  Size: {len(response.file_data) / 1024:.2f} KB")
+        # The response only references the report; download it in chunks
+        downloaded = 0
+        async for chunk in stub.DownloadArtifact(
+            video_analysis_pb2.ArtifactRequest(artifact_id=response.artifact_id)
+        ):
+            downloaded += len(chunk.data)
+        console.print(f"  Size: {response.size / 1024:.2f} KB (downloaded {downloaded / 1024:.2f} KB)")
     else:
         console.print(f"[red]✗ Report generation failed: {response.message}[/red]")
 
@@ -0,0 +1,63 @@
+"""
+Test script for the embedding intent router
+Loads the sentence-transformers model (no Llama model or video needed)
+Usage: python test_intent_router.py
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.embeddings import TextEmbedder
+from agents.intent_router import IntentRouter
+
+
+# Clear requests: these must be routed without the LLM
+ROUTINE_QUERIES = {
+    "Can you transcribe this for me?": "transcribe",
+    "Please transcribe the video": "transcribe",
+    "Detect the objects in the video": "detect_objects",
+    "Describe the scenes in this video": "describe_scenes",
+    "Give me a quick summary": "summarize",
+}
+
+# Looser phrasings: may be deferred to the LLM, but never misrouted
+AMBIGUOUS_QUERIES = {
+    "What did the presenter say at the start?": "transcribe",
+    "Which objects can you find in the footage?": "detect_objects",
+    "What is going on in this clip?": "describe_scenes",
+}
+
+
+async def run_router_test():
+    """Routine queries route without the LLM; no query routes to the wrong action"""
+    embedder = TextEmbedder()
+    await embedder.initialize()
+    router = IntentRouter(embedder)
+    await router.initialize()
+
+    for queries, must_route in ((ROUTINE_QUERIES, True), (AMBIGUOUS_QUERIES, False)):
+        for query, expected in queries.items():
+            started = time.perf_counter()
+            intent = await router.route(query)
+            elapsed = (time.perf_counter() - started) * 1000
+            action = intent["primary_action"] if intent else "(deferred to LLM)"
+            print(f"{elapsed:6.1f} ms  {action:<20} {query}")
+            if intent is None:
+                assert not must_route, f"routine query deferred to LLM: {query}"
+            else:
+                assert intent["primary_action"] == expected, f"misrouted: {query}"
+
+    print(f"Router stats: {router.get_stats()}")
+    embedder.cleanup()
+
+
+def test_intent_router():
+    asyncio.run(run_router_test())
+
+
+if __name__ == "__main__":
+    test_intent_router()
+    print("✓ Intent router test passed")
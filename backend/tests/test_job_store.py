@@ -0,0 +1,65 @@
+"""
+Test script for the durable analysis job table and its worker
+Usage: python test_job_store.py
+"""
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.progress import report_progress
+from jobs.job_store import JobStore
+from jobs.worker import JobWorker
+
+
+async def fake_job(job):
+    """Stand-in for the orchestrator: reports progress, then answers"""
+    for step in range(3):
+        report_progress("actions", step, 3, "actions", f"Step {step + 1}/3")
+        await asyncio.sleep(2.0 if job["query"] == "slow" else 0.05)
+    return {"response": f"answer to {job['query']}", "actions_taken": ["respond"]}
+
+
+async def check_job_lifecycle():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "jobs.db")
+        store = JobStore(db_path=db_path)
+        await store.initialize()
+        worker = JobWorker(store, fake_job, progress_interval=0.0)
+        worker.start()
+
+        job = await worker.submit("session", "video", "/tmp/video.mp4", "hello")
+        updates = [update async for update in worker.watch(job["job_id"])]
+        assert updates[-1]["status"] == "completed"
+        assert updates[-1]["result"]["response"] == "answer to hello"
+        assert any(u["progress"].get("stage") == "actions" for u in updates)
+
+        slow = await worker.submit("session", "video", "/tmp/video.mp4", "slow")
+        queued = await worker.submit("session", "video", "/tmp/video.mp4", "queued")
+        await asyncio.sleep(0.2)
+        assert (await worker.cancel(queued["job_id"]))["status"] == "cancelled"
+        assert (await worker.cancel(slow["job_id"]))["status"] == "cancelled"
+
+        # A job left running by a shutdown is queued again on the next start
+        pending = await worker.submit("session", "video", "/tmp/video.mp4", "slow")
+        await asyncio.sleep(0.2)
+        await worker.stop()
+        await store.close()
+
+        reopened = JobStore(db_path=db_path)
+        await reopened.initialize()
+        assert (await reopened.get(pending["job_id"]))["status"] == "queued"
+        print(f"Job counts: {await reopened.get_stats()}")
+        await reopened.close()
+
+
+def test_job_lifecycle():
+    """Jobs complete with progress, can be cancelled, and survive a restart"""
+    asyncio.run(check_job_lifecycle())
+
+
+if __name__ == "__main__":
+    test_job_lifecycle()
+    print("✓ Job store test passed")
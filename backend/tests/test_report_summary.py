@@ -0,0 +1,88 @@
+"""
+Test script for reports reusing the stored summary tree
+Resolves a session's video the way GenerateReport does and checks the
+report content carries the stored summary (fake LLM, no models or video)
+Usage: python test_report_summary.py
+"""
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.orchestrator_agent import OrchestratorAgent
+from storage.analysis_cache import AnalysisCache
+from storage.chat_store import ChatStore
+from storage.video_registry import VideoRegistry
+
+
+class RecordingGeneration:
+    """Stand-in for the generation MCP server: records the report content"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def handle_tool_call(self, tool_name, arguments):
+        self.calls.append((tool_name, arguments))
+        return {"status": "success", "output_path": "report.pdf"}
+
+
+async def fake_complete(prompt: str, max_tokens: int) -> str:
+    return "Stored summary of the talk."
+
+
+async def check_report_uses_stored_summary():
+    with tempfile.TemporaryDirectory() as tmp:
+        video = Path(tmp) / "video.mp4"
+        video.write_bytes(b"fake video content")
+        transcription = {"segments": [
+            {"start": 0.0, "end": 5.0, "text": "Welcome to the talk."},
+            {"start": 5.0, "end": 9.0, "text": "Today we cover caching."}
+        ]}
+
+        chat_store = ChatStore(db_path=str(Path(tmp) / "chat.db"))
+        await chat_store.initialize()
+        registry = VideoRegistry(db_path=str(Path(tmp) / "videos.db"), legacy_json=None)
+        await registry.initialize()
+        await registry.register("video-1", str(video))
+        session_results = await chat_store.open_session("session-1", "video-1")
+        session_results["transcription"] = transcription
+        await chat_store.save_results("session-1", session_results)
+
+        generation = RecordingGeneration()
+        orchestrator = OrchestratorAgent(
+            model_path="unused.gguf", generation_mcp=generation,
+            cache=AnalysisCache(cache_dir=str(Path(tmp) / "cache"))
+        )
+        orchestrator.summarizer.complete = fake_complete
+        orchestrator.summarizer.summary_dir = Path(tmp) / "summaries"
+        tree = await orchestrator.summarizer.summarize(str(video), transcription)
+
+        # GenerateReport: session -> video_id -> stored file
+        video_id = await chat_store.get_video_id("session-1")
+        video_path = await registry.get_path(video_id)
+        assert video_path == str(video)
+
+        context = await chat_store.get_results("session-1")
+        results = {}
+        await orchestrator._execute_action("generate_pdf", video_path, context, results)
+
+        tool_name, arguments = generation.calls[-1]
+        assert tool_name == "generate_pdf"
+        assert arguments["content"]["summary"] == tree["summary"]
+        assert orchestrator.summarizer.builds == 1, "report must not rebuild the summary"
+        print(f"Report summary: {arguments['content']['summary']}")
+
+        await chat_store.close()
+        await registry.close()
+
+
+def test_report_uses_stored_summary():
+    """A report for a session reads the summary tree stored for its video"""
+    asyncio.run(check_report_uses_stored_summary())
+
+
+if __name__ == "__main__":
+    test_report_uses_stored_summary()
+    print("✓ Report summary test passed")
@@ -1,29 +1,59 @@
 #!/usr/bin/env python3
 """Create video registry from existing uploads"""
 
-import json
-from pathlib import Path
+import asyncio
 import re
+import sys
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from storage.video_registry import VideoRegistry
 
 uploads_dir = Path("uploads")
-videos = {}
-
-# Pattern to extract video_id from filename: {video_id}_{original_name}
-pattern = r'^([a-f0-9-]+)_(.+)$'
-
-for video_file in uploads_dir.glob("*.mp4"):
-    filename = video_file.name
-    match = re.match(pattern, filename)
-    
-    if match:
-        video_id = match.group(1)
-        videos[video_id] = str(video_file.absolute())
-        print(f"Added: {video_id} -> {video_file.name}")
-
-# Save registry
-registry_path = uploads_dir / "video_registry.json"
-with open(registry_path, 'w') as f:
-    json.dump(videos, f, indent=2)
-
-print(f"\nCreated registry with {len(videos)} videos")
-print(f"Saved to: {registry_path}")
+blobs_dir = uploads_dir / "blobs"
+
+# Content-addressed blobs: uploads/blobs/{sha256}{ext}
+blob_pattern = r'^([0-9a-f]{64})\.\w+$'
+# Uploads stored before deduplication: {video_id}_{original_name}
+legacy_pattern = r'^([a-f0-9-]+)_(.+)$'
+
+
+async def main():
+    # Rebuilding from files only; don't import a leftover JSON registry
+    registry = VideoRegistry(db_path="data/videos.db", legacy_json=None)
+    await registry.initialize()
+
+    added = 0
+    # Blobs have no video ID of their own; give unregistered content a new one
+    for blob in sorted(blobs_dir.glob("*")):
+        match = re.match(blob_pattern, blob.name)
+
+        if match and await registry.find_by_sha256(match.group(1)) is None:
+            video_id = str(uuid.uuid4())
+            await registry.register(
+                video_id, str(blob.absolute()), filename=blob.name, sha256=match.group(1),
+                metadata={"file_size": blob.stat().st_size}
+            )
+            added += 1
+            print(f"Added: {video_id} -> blobs/{blob.name}")
+
+    for video_file in uploads_dir.glob("*.mp4"):
+        match = re.match(legacy_pattern, video_file.name)
+
+        if match and await registry.get(match.group(1)) is None:
+            video_id = match.group(1)
+            await registry.register(
+                video_id, str(video_file.absolute()), filename=match.group(2),
+                metadata={"file_size": video_file.stat().st_size}
+            )
+            added += 1
+            print(f"Added: {video_id} -> {video_file.name}")
+
+    print(f"\nAdded {added} videos, registry holds {await registry.count()}")
+    print(f"Saved to: {registry.db_path}")
+    await registry.close()
+
+
+asyncio.run(main())